@@ -0,0 +1,31 @@
+"""results: keyset 페이지네이션용 복합 인덱스
+
+- idx_class_created_id (class_name, created_at, id): class_name 필터 + 정렬 + 커서 범위 조건을 한 인덱스로
+- idx_created_id (created_at, id): 필터 없는 목록
+- 기존 단일 컬럼 인덱스(idx_class_name, idx_created_at)는 위 인덱스의 접두라 제거
+
+Revision ID: 0001_keyset_idx
+Revises:
+"""
+from alembic import op
+
+revision = "0001_keyset_idx"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLE = "final_project_results"
+
+
+def upgrade():
+    op.create_index("idx_class_created_id", TABLE, ["class_name", "created_at", "id"])
+    op.create_index("idx_created_id", TABLE, ["created_at", "id"])
+    op.drop_index("idx_class_name", table_name=TABLE)
+    op.drop_index("idx_created_at", table_name=TABLE)
+
+
+def downgrade():
+    op.create_index("idx_created_at", TABLE, ["created_at"])
+    op.create_index("idx_class_name", TABLE, ["class_name"])
+    op.drop_index("idx_created_id", table_name=TABLE)
+    op.drop_index("idx_class_created_id", table_name=TABLE)
@@ -0,0 +1,141 @@
+"""results: class_info JSON → 구조화 컬럼 + 상세 테이블
+
+- final_project_results 에 confidence / picked_model / reason / mn_* / rn_* / leaf_area / gy / sat / inference_ms 추가 + 분석용 인덱스
+- final_project_result_details(result_id PK/FK, payload) 생성 — 질의어/출처/detailed_prediction 원본
+- 백필: 기존 class_info 를 id 순 배치로 읽어 컬럼을 채우고 payload 를 상세 테이블로 복사
+  (class_info 는 그대로 둠 — 조회는 상세 행이 없을 때 class_info 로 대체, downgrade 시 손실 없음)
+
+Revision ID: 0002_structured
+Revises: 0001_keyset_idx
+"""
+import json
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_structured"
+down_revision = "0001_keyset_idx"
+branch_labels = None
+depends_on = None
+
+TABLE = "final_project_results"
+DETAIL = "final_project_result_details"
+BATCH = 1000
+
+COLUMNS = [
+    ("confidence", sa.Float()),
+    ("picked_model", sa.String(32)),
+    ("reason", sa.String(64)),
+    ("mn_label", sa.String(255)),
+    ("mn_conf", sa.Float()),
+    ("rn_label", sa.String(255)),
+    ("rn_conf", sa.Float()),
+    ("leaf_area", sa.Float()),
+    ("gy", sa.Float()),
+    ("sat", sa.Float()),
+    ("inference_ms", sa.Float()),
+]
+INDEXES = [
+    ("idx_created_class_reason", ["created_at", "class_name", "reason"]),
+    ("idx_reason_created", ["reason", "created_at"]),
+    ("idx_class_confidence", ["class_name", "confidence"]),
+]
+
+# 마이그레이션 시점 스냅샷 (services.metrics.normalize_reason / crud.prediction_columns 와 같은 규칙)
+_GUARD_REASONS = (("both<=gate_min", "Guard:GateMin"), ("delta>=delta_max", "Guard:DeltaMax"))
+_REASON_RE = re.compile(r"([A-Za-z][A-Za-z0-9_]*)(?:\[([A-Za-z0-9_]+))?")
+
+
+def _reason(raw):
+    if not raw:
+        return "Ensemble"
+    guard = [name for prefix, name in _GUARD_REASONS if prefix in raw]
+    if guard:
+        return "+".join(guard)
+    m = _REASON_RE.match(raw.strip())
+    if not m:
+        return "other"
+    return (f"{m.group(1)}:{m.group(2)}" if m.group(2) else m.group(1))[:64]
+
+
+def _num(v):
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _columns(d):
+    d = d or {}
+    picked, meta = d.get("picked") or {}, d.get("meta") or {}
+    mn, rn = d.get("mobilenet") or {}, d.get("resnet50") or {}
+    sig = meta.get("signals") or {}
+    return {
+        "confidence": _num(picked.get("confidence")),
+        "picked_model": (picked.get("model") or None) and str(picked["model"])[:32],
+        "reason": _reason(picked.get("reason") or meta.get("reason")),
+        "mn_label": mn.get("label"),
+        "mn_conf": _num(mn.get("confidence")),
+        "rn_label": rn.get("label"),
+        "rn_conf": _num(rn.get("confidence")),
+        "leaf_area": _num(sig.get("leaf")),
+        "gy": _num(sig.get("gy")),
+        "sat": _num(sig.get("sat")),
+        "inference_ms": _num(meta.get("inference_ms")),
+    }
+
+
+def _backfill(bind):
+    results = sa.table(TABLE, sa.column("id", sa.Integer), sa.column("class_info", sa.Text),
+                       *[sa.column(name, type_) for name, type_ in COLUMNS])
+    details = sa.table(DETAIL, sa.column("result_id", sa.Integer), sa.column("payload", sa.Text))
+    upd = (results.update().where(results.c.id == sa.bindparam("_id"))
+           .values({name: sa.bindparam(name) for name, _ in COLUMNS}))
+    last = 0
+    while True:
+        rows = bind.execute(
+            sa.select(results.c.id, results.c.class_info)
+            .where(results.c.id > last, results.c.class_info.isnot(None))
+            .order_by(results.c.id).limit(BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        updates, payloads = [], []
+        for rid, raw in rows:
+            try:
+                info = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            updates.append({"_id": rid, **_columns((info or {}).get("detailed_prediction"))})
+            payloads.append({"result_id": rid, "payload": raw})
+        if updates:
+            bind.execute(upd, updates)
+            bind.execute(details.insert(), payloads)
+        last = rows[-1][0]
+
+
+def upgrade():
+    for name, type_ in COLUMNS:
+        op.add_column(TABLE, sa.Column(name, type_, nullable=True))
+    op.create_table(
+        DETAIL,
+        sa.Column("result_id", sa.Integer(), sa.ForeignKey(f"{TABLE}.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+    )
+    _backfill(op.get_bind())
+    for name, cols in INDEXES:
+        op.create_index(name, TABLE, cols)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=TABLE)
+    # 마이그레이션 이후 행(class_info NULL)의 상세를 class_info 로 되돌린 뒤 삭제
+    op.execute(sa.text(
+        f"UPDATE {TABLE} SET class_info = (SELECT d.payload FROM {DETAIL} d WHERE d.result_id = {TABLE}.id) "
+        f"WHERE class_info IS NULL"
+    ))
+    op.drop_table(DETAIL)
+    for name, _ in reversed(COLUMNS):
+        op.drop_column(TABLE, name)
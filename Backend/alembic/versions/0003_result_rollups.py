@@ -0,0 +1,39 @@
+"""result_rollups: 일 × 클래스 × 결정 사유 집계 테이블 (/api/stats)
+
+- 기본키 (day, class_name, reason) — 기간 조회는 기본키 범위 스캔
+- 기존 결과로 초기 집계 (Unknown 은 결과 행이 없으므로 이후부터 집계)
+
+Revision ID: 0003_rollups
+Revises: 0002_structured
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_rollups"
+down_revision = "0002_structured"
+branch_labels = None
+depends_on = None
+
+TABLE = "result_rollups"
+RESULTS = "final_project_results"
+
+
+def upgrade():
+    op.create_table(
+        TABLE,
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("class_name", sa.String(255), primary_key=True),
+        sa.Column("reason", sa.String(64), primary_key=True),
+        sa.Column("n", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("conf_sum", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.execute(sa.text(
+        f"INSERT INTO {TABLE} (day, class_name, reason, n, conf_sum) "
+        f"SELECT DATE(created_at), class_name, COALESCE(reason, 'Ensemble'), COUNT(id), COALESCE(SUM(confidence), 0) "
+        f"FROM {RESULTS} WHERE created_at IS NOT NULL "
+        f"GROUP BY DATE(created_at), class_name, COALESCE(reason, 'Ensemble')"
+    ))
+
+
+def downgrade():
+    op.drop_table(TABLE)
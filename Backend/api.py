@@ -1,13 +1,20 @@
 # Backend/api.py
 from __future__ import annotations
-import os
 import json
+import secrets
+import time
+import asyncio
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Any, Dict, Optional
-from datetime import datetime
+from datetime import date, timedelta
+from typing import List, Any, Dict, Optional, Tuple
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Path as FPath
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Header, Path as FPath
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+from . import crud
 from .config import settings
 from .database import SessionLocal
 from .models import FinalProjectResult
@@ -17,43 +24,22 @@ from .schemas import (
     ResultItem,
     ResultDetail,
     DeleteResult,
+    StatsResponse,
 )
 from .services.classifier import classifier
-from .services.synonyms import class_to_query_terms, as_boolean_query
-from .services.rag_service import rag, Retrieved
+from .services.model_registry import ReloadInProgress
+from .services.rag_service import get_rag, peek_rag, rag_error
+from .services.executors import ExecutorBusy, infer_executor, rag_executor, executor_stats
+from .services.prediction_cache import prediction_cache, image_digest
+from .services.upload_store import ALLOWED_EXTS, SpooledUpload, UploadTooLarge, upload_store
+from .services.metrics import Timings, observe_prediction
+from .services.result_counts import result_counts
+from .services.write_behind import result_writer
 
 from .schemas import PredictResponse, SourceItem
 
 router = APIRouter()
 
-def generate_unique_filename(original_filename: str, upload_dir: Path) -> str:
-    """
-    파일명을 "파일이름_YYMMDD_000.jpg" 형태로 생성하고 숫자를 000~999까지 순차적으로 증가시킴
-    """
-    # 파일 확장자 분리
-    name, ext = os.path.splitext(original_filename)
-    if not ext:
-        ext = ".jpg"  # 기본 확장자
-    
-    # 현재 날짜 (YYMMDD 형식)
-    current_date = datetime.now().strftime("%y%m%d")
-    
-    # 기본 파일명 생성
-    base_filename = f"{name}_{current_date}"
-    
-    # 000부터 999까지 순차적으로 확인하여 사용 가능한 번호 찾기
-    for i in range(1000):
-        number_str = f"{i:03d}"  # 000, 001, 002, ..., 999
-        filename = f"{base_filename}_{number_str}{ext}"
-        file_path = upload_dir / filename
-        
-        # 파일이 존재하지 않으면 해당 파일명 사용
-        if not file_path.exists():
-            return filename
-    
-    # 999까지 모두 사용된 경우 (극히 드문 경우)
-    raise HTTPException(status_code=500, detail="파일 저장 공간이 가득 찼습니다. (999개 파일 초과)")
-
 def _to_source_item(hit) -> dict:
     meta = getattr(hit, "meta", {}) or {}
     score = getattr(hit, "score", None)
@@ -73,82 +59,167 @@ def _to_source_item(hit) -> dict:
         "title": title,
     }
 
+async def _offload(executor, fn, *args, **kwargs):
+    """블로킹 작업을 전용 실행기로 넘김. 대기열 초과 시 503 + Retry-After"""
+    try:
+        return await executor.run(fn, *args, **kwargs)
+    except ExecutorBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail=f"서버가 혼잡합니다. 잠시 후 다시 시도해주세요. ({busy.name})",
+            headers={"Retry-After": str(busy.retry_after)},
+        )
+
+async def _write_results(rows: List[Dict[str, Any]]) -> List[int]:
+    """write-behind 큐로 INSERT (다른 요청의 행과 함께 다중 VALUES 한 번). 큐 초과 시 503"""
+    try:
+        return await result_writer.submit_many(rows)
+    except ExecutorBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail=f"서버가 혼잡합니다. 잠시 후 다시 시도해주세요. ({busy.name})",
+            headers={"Retry-After": str(busy.retry_after)},
+        )
+
+class RagUnavailable(RuntimeError):
+    pass
+
+def _rag_explain(class_name: str, timings: Optional[Timings] = None):
+    rag = get_rag()  # 백그라운드 로드 중이면 완료까지 대기 (rag 실행기 스레드에서)
+    if rag is None:
+        raise RagUnavailable(rag_error() or "unknown")
+    return rag.explain_class(class_name, 4, timings=timings)
+
+def _too_large(e: UploadTooLarge) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"파일이 너무 큽니다. (최대 {e.limit // (1024 * 1024)}MB)")
+
+async def _receive_upload(file: UploadFile) -> SpooledUpload:
+    """청크 단위로 임시 파일에 기록 (sha256 + 크기 상한, 전체를 메모리에 올리지 않음)"""
+    try:
+        return await run_in_threadpool(upload_store.receive, file.file, file.filename)
+    except UploadTooLarge as e:
+        raise _too_large(e)
+
+def _digest_and_version(up: SpooledUpload):
+    digest, image = image_digest(up.open())  # 기록한 임시 파일 핸들에서 바로 디코드
+    return digest, image, classifier.model_version()
+
+def _result_key(digest: str, version: str, detailed: Dict[str, Any]) -> str:
+    """결과를 만든 스냅샷 버전(meta.model_version)으로 캐시 키 — 조회 후 모델이 교체된 경우 대비"""
+    return prediction_cache.make_key(digest, classifier.result_version(detailed, version))
+
+UNKNOWN_WARNING = (
+    "⚠️ 신뢰도 부족으로 인한 분류 실패\n\n"
+    "분류 모델의 신뢰도가 낮거나 모델 간 결과 차이가 커서 정확한 분류를 수행할 수 없습니다.\n\n"
+    "권장사항:\n"
+    "- 더 선명하고 품질이 좋은 이미지를 사용해주세요\n"
+    "- 잎사귀가 이미지 중앙에 잘 보이도록 촬영해주세요\n"
+    "- 다른 각도에서 촬영해보세요"
+)
+
+def _unknown_response(image_path: str, detailed: Dict[str, Any]) -> PredictResponse:
+    return PredictResponse(
+        id=0,
+        class_name="Unknown",
+        confidence=0.0,
+        recomm=UNKNOWN_WARNING,
+        image_path=image_path,
+        sources=[],
+        detailed_prediction=detailed,
+    )
+
+def _finish_timings(detailed: Dict[str, Any], tm: Timings, t0: float, path: Optional[str] = None):
+    """요청 단계 시간을 meta.timings 에 반영하고 /metrics 히스토그램에 기록"""
+    total_ms = (time.perf_counter() - t0) * 1000.0
+    tm.spans["total"] = total_ms
+    if isinstance(detailed, dict):
+        detailed.setdefault("meta", {})["timings"] = tm.as_dict()
+    observe_prediction(tm.spans, detailed, path=path, total_ms=total_ms)
+
 @router.post("/predict", response_model=PredictResponse, tags=["predict"])
 async def predict(file: UploadFile = File(...)):
-    # 1) 이미지 저장
-    save_name = generate_unique_filename(file.filename, Path(settings.UPLOAD_DIR))
-    save_path = Path(settings.UPLOAD_DIR) / save_name
-    data = await file.read()
-    save_path.write_bytes(data)
+    t0 = time.perf_counter()
+    tm = Timings()
+    # 0) 스트리밍 기록 → 디코드 + 픽셀 해시 → 결과 캐시 조회 (재업로드는 추론/RAG/DB/파일 보관 모두 생략)
+    with tm.span("upload"):
+        up = await _receive_upload(file)
+    try:
+        with tm.span("decode"):
+            digest, image, version = await _offload(infer_executor, _digest_and_version, up)
+    except HTTPException:
+        up.discard()
+        raise
+    except Exception as e:
+        up.discard()
+        raise HTTPException(status_code=400, detail=f"이미지를 읽을 수 없습니다: {e}")
+    cache_key = prediction_cache.make_key(digest, version)
+    cached = await prediction_cache.aget(cache_key)
+    if cached is not None:
+        up.discard()
+        # 캐시 응답의 meta.timings 는 최초 요청 기준 — 지표에는 이번 요청 시간만 path="cache" 로 기록
+        observe_prediction({}, cached.get("detailed_prediction"), path="cache", total_ms=(time.perf_counter() - t0) * 1000.0)
+        return PredictResponse(**cached)
+
+    # 1) 이미지 보관 (콘텐츠 주소 경로로 원자적 rename)
+    with tm.span("store"):
+        save_path = upload_store.commit(up)
 
     # 2) 분류
     try:
-        class_name, confidence = classifier.classify(str(save_path))
-        detailed_result = classifier.classify_with_details(str(save_path))
+        # ✅ 디코드·앙상블 추론 1회 (classify/classify_with_details 이중 실행 제거)
+        # 추론 전용 실행기에서 실행 (이벤트 루프 비차단, 동시 요청은 MicroBatcher에서 배치로 모임)
+        t_inf = time.perf_counter()
+        analysis = await _offload(infer_executor, classifier.analyze, str(save_path), image, tm)
+        # 실행기 대기열 + 스레드 전환 시간 (classify 는 분류기 안에서 측정)
+        tm.add("infer_queue", max(0.0, (time.perf_counter() - t_inf) * 1000.0 - tm.spans.get("classify", 0.0)))
+        class_name, confidence = analysis["label"], analysis["confidence"]
+        detailed_result = analysis["detailed"]
+        cache_key = _result_key(digest, version, detailed_result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"classifier error: {e}")
 
     # 3) Unknown 처리 (RAG 생략)
+    # 예측 실패 폴백(meta.fallback)은 모델 판정이 아니므로 캐시/Unknown 집계 제외 (재업로드 시 다시 추론)
+    fallback = classifier.is_fallback(detailed_result)
     if class_name == "Unknown":
-        warning_message = (
-            "⚠️ 신뢰도 부족으로 인한 분류 실패\n\n"
-            "분류 모델의 신뢰도가 낮거나 모델 간 결과 차이가 커서 정확한 분류를 수행할 수 없습니다.\n\n"
-            "권장사항:\n"
-            "- 더 선명하고 품질이 좋은 이미지를 사용해주세요\n"
-            "- 잎사귀가 이미지 중앙에 잘 보이도록 촬영해주세요\n"
-            "- 다른 각도에서 촬영해보세요"
-        )
-        return PredictResponse(
-            id=0,
-            class_name="Unknown",
-            confidence=0.0,
-            recomm=warning_message,
-            image_path=str(save_path),
-            sources=[],
-            detailed_prediction=detailed_result,
-        )
-
-    # 4) 클래스 질의어 생성
-    terms = class_to_query_terms(class_name)
-    boolean_query = as_boolean_query(terms)
+        _finish_timings(detailed_result, tm, t0)
+        response = _unknown_response(str(save_path), detailed_result)
+        if not fallback:
+            result_writer.record_unknown(crud.prediction_columns(detailed_result)["reason"])
+            await prediction_cache.aput(cache_key, response.model_dump())
+        return response
 
-    # 5) RAG (인덱스 필수)
-    if not rag:
-        raise HTTPException(status_code=500, detail="RAG 서비스가 초기화되지 않았습니다. 인덱스를 먼저 생성하세요.")
-    retrieved: List[Retrieved] = rag.search(boolean_query, k=4)
-    explanation = rag.generate_explanation(boolean_query, retrieved)
+    # 4~5) 클래스 질의어 생성 + RAG (인덱스 필수) — 클래스별 설명 캐시 적중 시 임베딩/LLM 호출 없음
+    try:
+        with tm.span("rag"):
+            terms, boolean_query, retrieved, explanation = await _offload(rag_executor, _rag_explain, class_name, tm)
+    except RagUnavailable as e:
+        raise HTTPException(status_code=500, detail=f"RAG 서비스가 초기화되지 않았습니다. 인덱스를 먼저 생성하세요. ({e})")
 
     sources_dicts = [_to_source_item(h) for h in retrieved[:4]]
     sources_items = [SourceItem(**d) for d in sources_dicts]
 
     # 6) DB 저장
-    class_info_obj = {
-        "query_terms": terms,
-        "boolean_query": boolean_query,
-        "sources": sources_dicts,
-        "detailed_prediction": detailed_result,   # ← 디버깅에 유용
-    }
-    class_info = json.dumps(class_info_obj, ensure_ascii=False)
+    detail = crud.detail_payload(terms, boolean_query, sources_dicts, detailed_result)
 
-    db = SessionLocal()
     try:
-        row = FinalProjectResult(
-            class_name=class_name,
-            class_info=class_info,
-            recomm=explanation,
-            image_path=str(save_path),
-        )
-        db.add(row)
-        db.commit()
-        db.refresh(row)
-        row_id = row.id
+        with tm.span("db"):
+            (row_id,) = await _write_results([{
+                "class_name": class_name,
+                "recomm": explanation,
+                "image_path": str(save_path),
+                **crud.prediction_columns(detailed_result, confidence),
+                "detail": detail,
+            }])
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"DB 저장 실패: {e}")
-    finally:
-        db.close()
 
-    return PredictResponse(
+    _finish_timings(detailed_result, tm, t0)
+    response = PredictResponse(
         id=row_id,
         class_name=class_name,
         confidence=confidence,
@@ -157,37 +228,276 @@ async def predict(file: UploadFile = File(...)):
         sources=sources_items,
         detailed_prediction=detailed_result,
     )
+    if not fallback:
+        await prediction_cache.aput(cache_key, response.model_dump())
+    return response
+
+# ---------- 다중 이미지 배치 예측 ----------
+_decode_pool = ThreadPoolExecutor(max_workers=max(1, settings.BATCH_DECODE_WORKERS), thread_name_prefix="decode")
+
+def _too_many() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"한 번에 최대 {settings.BATCH_MAX_FILES}장까지 업로드할 수 있습니다.")
+
+def _is_zip(f: UploadFile) -> bool:
+    return (f.filename or "").lower().endswith(".zip") or f.content_type in ("application/zip", "application/x-zip-compressed")
+
+def _spool_batch(files: List[UploadFile]) -> List[SpooledUpload]:
+    """multipart 파일들(+ zip 멤버)을 각각 임시 파일로 스트리밍 기록 (블로킹 — 스레드에서 호출)"""
+    ups: List[SpooledUpload] = []
+    try:
+        for f in files:
+            if not _is_zip(f):
+                if len(ups) >= settings.BATCH_MAX_FILES:
+                    raise _too_many()
+                ups.append(upload_store.receive(f.file, f.filename))
+                continue
+            try:
+                with zipfile.ZipFile(f.file) as zf:
+                    members = [i for i in zf.infolist()
+                               if not i.is_dir() and Path(i.filename).suffix.lower() in ALLOWED_EXTS]
+                    if len(ups) + len(members) > settings.BATCH_MAX_FILES:
+                        raise _too_many()
+                    for i in members:
+                        with zf.open(i) as src:
+                            ups.append(upload_store.receive(src, Path(i.filename).name))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"zip 파일을 읽을 수 없습니다: {f.filename}")
+    except BaseException:
+        for u in ups:
+            u.discard()
+        raise
+    return ups
+
+def _decode_one(up: SpooledUpload) -> Tuple[Optional[str], Any, Optional[str]]:
+    try:
+        digest, image = image_digest(up.open())
+        return digest, image, None
+    except Exception as e:
+        return None, None, str(e)
+
+def _decode_many(ups: List[SpooledUpload]):
+    """병렬 디코드 + 픽셀 해시. 항목별 (digest, image, error) 와 현재 모델 버전"""
+    return list(_decode_pool.map(_decode_one, ups)), classifier.model_version()
+
+def _save_and_analyze(ups: List[SpooledUpload], images: List) -> Tuple[List[str], List[Dict]]:
+    """청크 단위 보관(rename) + 텐서 배치 추론"""
+    paths = [str(upload_store.commit(u)) for u in ups]
+    return paths, classifier.analyze_many(paths, images)
+
+def _ndjson(obj: Dict[str, Any]) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+async def _predict_chunk(part: List[Tuple[int, str, SpooledUpload, Any, str]],
+                         rag_tasks: Dict[str, "asyncio.Future"], version: str) -> List[Dict[str, Any]]:
+    """한 청크: 추론 1회 → 클래스별 RAG(요청 내 중복 제거) → INSERT 1회 → NDJSON 항목 목록"""
+    paths, analyses = await _offload(
+        infer_executor, _save_and_analyze, [p[2] for p in part], [p[3] for p in part]
+    )
+    for a in analyses:  # 모델 단계 시간만 (RAG/DB 는 청크 단위로 공유되어 항목별 분리 불가)
+        observe_prediction((a["detailed"].get("meta") or {}).get("timings") or {}, a["detailed"])
+
+    known = sorted({a["label"] for a in analyses if a["label"] != "Unknown"})
+    for cls in known:
+        if cls not in rag_tasks:
+            rag_tasks[cls] = asyncio.ensure_future(_offload(rag_executor, _rag_explain, cls))
+    explained: Dict[str, Any] = {}
+    for cls in known:
+        try:
+            explained[cls] = await rag_tasks[cls]
+        except RagUnavailable as e:
+            explained[cls] = HTTPException(status_code=500, detail=f"RAG 서비스가 초기화되지 않았습니다. ({e})")
+        except HTTPException as e:
+            explained[cls] = e
+
+    lines: List[Dict[str, Any]] = [None] * len(part)  # type: ignore[list-item]
+    rows, pending = [], []
+    for j, ((idx, name, _, _, digest), path, a) in enumerate(zip(part, paths, analyses)):
+        # 폴백 결과는 캐시 키 없음 (캐시/Unknown 집계 제외)
+        key = None if classifier.is_fallback(a["detailed"]) else _result_key(digest, version, a["detailed"])
+        if a["label"] == "Unknown":
+            response = _unknown_response(path, a["detailed"])
+            if key is not None:
+                result_writer.record_unknown(crud.prediction_columns(a["detailed"])["reason"])
+                await prediction_cache.aput(key, response.model_dump())
+            lines[j] = {"index": idx, "filename": name, "result": response.model_dump()}
+            continue
+        rag_out = explained[a["label"]]
+        if isinstance(rag_out, HTTPException):
+            lines[j] = {"index": idx, "filename": name, "error": rag_out.detail}
+            continue
+        terms, boolean_query, retrieved, explanation = rag_out
+        sources_dicts = [_to_source_item(h) for h in retrieved[:4]]
+        rows.append({
+            "class_name": a["label"],
+            "recomm": explanation,
+            "image_path": path,
+            **crud.prediction_columns(a["detailed"], a["confidence"]),
+            "detail": crud.detail_payload(terms, boolean_query, sources_dicts, a["detailed"]),
+        })
+        pending.append((j, idx, name, key, a, path, explanation, sources_dicts))
+
+    if rows:
+        try:
+            ids = await _write_results(rows)
+        except HTTPException as e:
+            ids, err = None, e.detail
+        except Exception as e:
+            ids, err = None, f"DB 저장 실패: {e}"
+        for n, (j, idx, name, key, a, path, explanation, sources_dicts) in enumerate(pending):
+            if ids is None:
+                lines[j] = {"index": idx, "filename": name, "error": err}
+                continue
+            response = PredictResponse(
+                id=ids[n],
+                class_name=a["label"],
+                confidence=a["confidence"],
+                recomm=explanation,
+                image_path=path,
+                sources=[SourceItem(**d) for d in sources_dicts],
+                detailed_prediction=a["detailed"],
+            )
+            if key is not None:
+                await prediction_cache.aput(key, response.model_dump())
+            lines[j] = {"index": idx, "filename": name, "result": response.model_dump()}
+    return lines
+
+@router.post("/predict/batch", tags=["predict"])
+async def predict_batch(files: List[UploadFile] = File(...)):
+    """
+    여러 장(또는 zip)을 한 번에 예측하고 NDJSON 으로 스트리밍.
+    줄 형식: {"index","filename","result"|"error"[,"cached"]} … 마지막 {"done": true, ...}
+    """
+    try:
+        ups = await run_in_threadpool(_spool_batch, files)
+    except UploadTooLarge as e:
+        raise _too_large(e)
+    if not ups:
+        raise HTTPException(status_code=400, detail="업로드된 이미지가 없습니다.")
+    try:
+        decoded, version = await _offload(infer_executor, _decode_many, ups)
+    except BaseException:
+        for u in ups:
+            u.discard()
+        raise
+
+    async def stream():
+        try:
+            t0 = time.perf_counter()
+            pending = []
+            errors = 0
+            # 디코드 실패·캐시 적중은 즉시 내보냄 (임시 파일 제거)
+            for idx, (up, (digest, image, err)) in enumerate(zip(ups, decoded)):
+                name = up.filename
+                if err is not None:
+                    errors += 1
+                    up.discard()
+                    yield _ndjson({"index": idx, "filename": name, "error": f"이미지를 읽을 수 없습니다: {err}"})
+                    continue
+                key = prediction_cache.make_key(digest, version)
+                cached = await prediction_cache.aget(key)
+                if cached is not None:
+                    up.discard()
+                    yield _ndjson({"index": idx, "filename": name, "cached": True, "result": cached})
+                    continue
+                pending.append((idx, name, up, image, digest))
+
+            rag_tasks: Dict[str, asyncio.Future] = {}
+            chunk = max(1, settings.BATCH_CHUNK_SIZE)
+            for c in range(0, len(pending), chunk):
+                part = pending[c:c + chunk]
+                try:
+                    lines = await _predict_chunk(part, rag_tasks, version)
+                except HTTPException as e:
+                    lines = [{"index": p[0], "filename": p[1], "error": e.detail} for p in part]
+                except Exception as e:
+                    lines = [{"index": p[0], "filename": p[1], "error": f"classifier error: {e}"} for p in part]
+                for line in lines:
+                    errors += "error" in line
+                    yield _ndjson(line)
+
+            yield _ndjson({
+                "done": True,
+                "count": len(ups),
+                "errors": errors,
+                "rag_lookups": len(rag_tasks),
+                "elapsed_ms": (time.perf_counter() - t0) * 1000.0,
+            })
+        finally:
+            # 클라이언트 중단 등으로 처리되지 않은 임시 파일 정리 (보관된 항목은 영향 없음)
+            for u in ups:
+                u.discard()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @router.get("/model/status", tags=["predict"])
 async def get_model_status():
+    rag = peek_rag()
     return {
         "model_loaded": getattr(classifier, "loaded", False),
         "model_available": getattr(classifier, "model_available", False),
         "status": "ready" if getattr(classifier, "loaded", False) else "not_loaded",
+        "backends": getattr(classifier.model, "backends", None),
+        "snapshots": classifier.registry.stats(),
+        "batching": classifier.batch_stats(),
+        "executors": executor_stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "result_writer": result_writer.stats(),
+        "explain_cache": rag.explain_cache.stats() if rag else None,
+        "rag": {
+            "loaded": rag is not None,
+            "query_vectors": len(rag.qvec) if (rag and rag.qvec is not None) else 0,
+            "encoder_loaded": bool(rag and rag.emb.loaded),
+        },
     }
 
+@router.post("/model/reload", tags=["predict"])
+async def reload_model(
+    wait: bool = Query(False, description="true → 새 스냅샷 교체까지 기다렸다가 응답"),
+    x_reload_token: Optional[str] = Header(None),
+):
+    """
+    가중치/보정(T)/cascade 설정 파일을 다시 읽은 스냅샷을 백그라운드로 로드·워밍업 후 교체.
+    진행 중 요청은 이전 스냅샷으로 끝나고, 이후 요청/캐시 키는 새 버전 (meta.model_version)
+    """
+    token = settings.MODEL_RELOAD_TOKEN
+    if not token:
+        # 토큰 미설정 = 원격 리로드 비활성 (파일 감시 MODEL_WATCH_SEC 는 별개로 동작)
+        raise HTTPException(status_code=403, detail="model reload disabled (MODEL_RELOAD_TOKEN not set)")
+    if not secrets.compare_digest(x_reload_token or "", token):
+        raise HTTPException(status_code=403, detail="reload token mismatch")
+    try:
+        stats = await run_in_threadpool(classifier.reload, wait)
+    except ReloadInProgress:
+        raise HTTPException(status_code=409, detail="이미 모델을 다시 로드하는 중입니다.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"모델 리로드 실패 (기존 모델 유지): {e}")
+    return JSONResponse(status_code=200 if wait else 202, content=stats)
+
 @router.get("/results", response_model=ResultsPage, tags=["results"])
 def list_results(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=200),
     class_name: Optional[str] = Query(None),
     order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor 값 (지정 시 page 무시)"),
+    with_total: bool = Query(True),
 ):
-    offset = (page - 1) * size
+    """
+    cursor 지정 → (created_at, id) keyset 페이지, 없으면 기존 page/size offset.
+    total 은 클래스별 캐시(RESULTS_COUNT_TTL_SEC) 값 — 매 요청 COUNT(*) 하지 않음
+    """
+    order = order.lower()
     db = SessionLocal()
     try:
-        q = db.query(FinalProjectResult)
-        if class_name:
-            q = q.filter(FinalProjectResult.class_name == class_name)
-
-        total = q.count()
-
-        if order.lower() == "asc":
-            q = q.order_by(FinalProjectResult.created_at.asc())
-        else:
-            q = q.order_by(FinalProjectResult.created_at.desc())
+        try:
+            rows, next_cursor, prev_cursor = crud.list_results_page(
+                db, size=size, order=order, class_name=class_name,
+                cursor=cursor, offset=0 if cursor else (page - 1) * size,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        rows = q.offset(offset).limit(size).all()
+        total = result_counts.get(class_name, lambda c: crud.count_results(db, c)) if with_total else None
 
         items: List[ResultItem] = []
         for r in rows:
@@ -197,10 +507,30 @@ def list_results(
                     class_name=r.class_name,
                     image_path=r.image_path,
                     created_at=r.created_at.isoformat() if r.created_at else "",
+                    confidence=r.confidence,
+                    reason=r.reason,
                 )
             )
 
-        return ResultsPage(total=total, page=page, size=size, items=items)
+        return ResultsPage(total=total, page=None if cursor else page, size=size, items=items,
+                           next_cursor=next_cursor, prev_cursor=prev_cursor)
+    finally:
+        db.close()
+
+@router.get("/stats", response_model=StatsResponse, tags=["results"])
+def get_stats(
+    start: Optional[date] = Query(None, description="시작일 (기본: end 6일 전)"),
+    end: Optional[date] = Query(None, description="종료일, 포함 (기본: 오늘)"),
+    class_name: Optional[str] = Query(None),
+):
+    """일 × 클래스 × 결정 사유 집계 테이블 기반 — 기간 길이만큼의 행만 읽음"""
+    end = end or date.today()
+    start = start or (end - timedelta(days=6))
+    if start > end:
+        raise HTTPException(status_code=400, detail="start 는 end 보다 늦을 수 없습니다")
+    db = SessionLocal()
+    try:
+        return StatsResponse(**crud.get_stats(db, start, end, class_name))
     finally:
         db.close()
 
@@ -211,11 +541,6 @@ def get_result(id: int = FPath(..., ge=1)):
         r = db.query(FinalProjectResult).get(id)
         if not r:
             raise HTTPException(status_code=404, detail="Not Found")
-        try:
-            info = json.loads(r.class_info) if r.class_info else None
-        except json.JSONDecodeError:
-            info = None
-
         return ResultDetail(
             id=r.id,
             class_name=r.class_name,
@@ -223,7 +548,18 @@ def get_result(id: int = FPath(..., ge=1)):
             image_path=r.image_path,
             created_at=r.created_at.isoformat() if r.created_at else "",
             updated_at=r.updated_at.isoformat() if r.updated_at else "",
-            class_info=info,
+            confidence=r.confidence,
+            picked_model=r.picked_model,
+            reason=r.reason,
+            mn_label=r.mn_label,
+            mn_conf=r.mn_conf,
+            rn_label=r.rn_label,
+            rn_conf=r.rn_conf,
+            leaf_area=r.leaf_area,
+            gy=r.gy,
+            sat=r.sat,
+            inference_ms=r.inference_ms,
+            class_info=crud.result_detail(r),  # 상세 테이블 지연 로드 (구 행은 class_info)
         )
     finally:
         db.close()
@@ -235,8 +571,16 @@ def delete_result(id: int = FPath(..., ge=1)):
         r = db.query(FinalProjectResult).get(id)
         if not r:
             return DeleteResult(id=id, deleted=False)
+        class_name = r.class_name
+        if r.created_at is not None:
+            crud.apply_rollups(db, crud.rollup_deltas(
+                [{"class_name": r.class_name, "reason": r.reason, "confidence": r.confidence}],
+                day=r.created_at.date(), sign=-1))
         db.delete(r)
         db.commit()
+        # 삭제된 행을 가리키는 캐시 응답 제거
+        prediction_cache.discard_result_id(id)
+        result_counts.adjust(class_name, -1)
         return DeleteResult(id=id, deleted=True)
     except Exception as e:
         db.rollback()
@@ -0,0 +1,200 @@
+# Backend/bench_api.py
+"""
+/api/predict 종단간 부하 테스트 (오프라인)
+- 로컬 SQLite(임시 디렉터리) + 스텁 RAG(고정 설명, 선택 지연) + 무작위 가중치(체크포인트 없을 때)로
+  앱을 프로세스 안에서 띄우고(httpx ASGITransport, lifespan 포함) 동시 요청을 보냄
+- 요청 지연(클라이언트) / 서버 처리 시간(X-Process-Time) p50/p95/p99 + 처리량(req/s)
+- 기준선 JSON 저장/비교는 Model/bench_infer.py 와 같은 형식
+- --url 을 주면 이미 떠 있는 서버에 요청 (그 서버의 DB/RAG/캐시 설정 그대로)
+- 사용:
+    python -m Backend.bench_api --requests 200 --concurrency 8 --out bench/api_base.json
+    python -m Backend.bench_api --compare bench/api_base.json --fail-on-regression
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Model.bench_infer import (SIZES, compare_reports, env_info, print_compare, print_stages,
+                               save_report, summarize, synthetic_corpus)
+
+
+class StubRag:
+    """RagService 자리 표시 — 인덱스/임베딩/LLM 없이 클래스별 고정 설명 (latency_ms 만큼 대기)"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self.vs = None
+        self.qvec = None
+        self.emb = SimpleNamespace(loaded=False)
+        self.explain_cache = SimpleNamespace(stats=lambda: {"stub": True})
+
+    def explain_class(self, class_name: str, k: int = 4, use_cache: bool = True, timings=None):
+        from .services.rag_service import Retrieved
+        from .services.synonyms import class_to_query_terms, as_boolean_query
+
+        terms = class_to_query_terms(class_name)
+        if self.latency:
+            t0 = time.perf_counter()
+            time.sleep(self.latency)
+            if timings is not None:  # 실제 RagService 처럼 대기 시간을 llm 단계로 기록
+                timings.add("llm", (time.perf_counter() - t0) * 1000.0)
+        retrieved = [Retrieved(text="stub", meta={"source": "stub.pdf", "page": 1}, score=0.0)]
+        return terms, as_boolean_query(terms), retrieved, f"[stub] {class_name}"
+
+
+def build_local_app(workdir: Path, rag_latency_ms: float, cache: bool):
+    """임시 SQLite/업로드 디렉터리 + 스텁 RAG 로 구성한 앱 (설정은 Backend 모듈 import 전에 덮어씀)"""
+    os.environ.setdefault("ALLOW_RANDOM_WEIGHTS", "1")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    from .config import settings
+
+    settings.DATABASE_URL = os.environ["DATABASE_URL"]  # database.py 의 load_dotenv(override) 보다 우선
+    settings.UPLOAD_DIR = workdir / "uploads"
+    settings.RAG_INDEX_DIR = workdir / "rag_index"
+    settings.DOCS_DIR = workdir / "rag_docs"
+    settings.PRED_CACHE_DIR = None
+    if not cache:
+        settings.PRED_CACHE_SIZE = 0
+
+    from .database import Base, engine, sqlite_ddl_compat
+    from . import models  # noqa: F401  (테이블 등록)
+    sqlite_ddl_compat()
+    Base.metadata.create_all(engine)
+
+    from .services import rag_service
+    rag_service._rag = StubRag(rag_latency_ms)
+
+    from .main import app
+    return app
+
+
+async def _wait_ready(client, timeout: float) -> Dict:
+    t0 = time.perf_counter()
+    while True:
+        r = await client.get("/ready")
+        if r.status_code == 200:
+            return r.json()
+        if time.perf_counter() - t0 > timeout:
+            raise SystemExit(f"[bench_api] 준비 시간 초과: {r.text}")
+        await asyncio.sleep(0.2)
+
+
+async def _drive(client, corpus: List[Dict], n: int, concurrency: int, warmup: int) -> Dict:
+    async def one(item) -> Tuple[int, float, Optional[float]]:
+        files = {"file": (item["name"], item["data"], "image/jpeg")}
+        t0 = time.perf_counter()
+        r = await client.post("/api/predict", files=files)
+        lat = (time.perf_counter() - t0) * 1000.0
+        srv = r.headers.get("X-Process-Time")
+        return r.status_code, lat, float(srv) * 1000.0 if srv else None
+
+    for i in range(warmup):
+        await one(corpus[i % len(corpus)])
+
+    lat_ok, srv_ok, status = [], [], Counter()
+    next_i = 0
+
+    async def worker():
+        nonlocal next_i
+        while next_i < n:
+            i = next_i; next_i += 1
+            code, lat, srv = await one(corpus[i % len(corpus)])
+            status[code] += 1
+            if code == 200:
+                lat_ok.append(lat)
+                if srv is not None:
+                    srv_ok.append(srv)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    return {"lat": lat_ok, "srv": srv_ok, "status": status, "wall": wall}
+
+
+async def run(args) -> Dict:
+    import httpx
+
+    corpus = synthetic_corpus(args.images, args.sizes, args.seed)
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=timeout)
+        async with client:
+            await _wait_ready(client, args.ready_timeout)
+            res = await _drive(client, corpus, args.requests, args.concurrency, args.warmup)
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix="bench_api_"))
+        app = build_local_app(workdir, args.rag_latency_ms, args.cache)
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                await _wait_ready(client, args.ready_timeout)
+                res = await _drive(client, corpus, args.requests, args.concurrency, args.warmup)
+        print(f"[bench_api] workdir: {workdir}")
+
+    ok = res["status"].get(200, 0)
+    return {
+        "kind": "api",
+        "env": env_info(),
+        "config": {"url": args.url, "requests": args.requests, "concurrency": args.concurrency,
+                   "warmup": args.warmup, "images": args.images, "sizes": [f"{w}x{h}" for w, h in args.sizes],
+                   "seed": args.seed, "rag_latency_ms": None if args.url else args.rag_latency_ms,
+                   "cache": None if args.url else args.cache},
+        "stages": {"request": summarize(res["lat"]), "server": summarize(res["srv"])},
+        "throughput": {"rps": ok / res["wall"] if res["wall"] > 0 else 0.0},
+        "status": {str(k): v for k, v in sorted(res["status"].items())},
+        "errors": args.requests - ok,
+    }
+
+
+def _parse_size(s: str) -> Tuple[int, int]:
+    w, h = s.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--warmup", type=int, default=4)
+    ap.add_argument("--images", type=int, default=14, help="합성 코퍼스 크기 (요청은 순환)")
+    ap.add_argument("--sizes", type=_parse_size, nargs="+", default=SIZES)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rag-latency-ms", type=float, default=0.0, help="스텁 RAG 응답 지연")
+    ap.add_argument("--cache", action="store_true", help="예측 결과 캐시 사용 (기본: 끔 — 매 요청 추론)")
+    ap.add_argument("--url", default=None, help="외부 서버 주소 (지정 시 로컬 앱 구성 생략)")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--ready-timeout", type=float, default=300.0)
+    ap.add_argument("--out", type=Path, default=None)
+    ap.add_argument("--compare", type=Path, default=None)
+    ap.add_argument("--tolerance", type=float, default=0.10)
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_stages(report)
+    print(f"status: {report['status']}")
+    if args.out:
+        save_report(report, args.out)
+    if args.compare:
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        rows = compare_reports(base, report, args.tolerance)
+        print_compare(rows, base, report)
+        if args.fail_on_regression and any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
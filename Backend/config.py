@@ -10,15 +10,67 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     OPENAI_API_KEY: str | None = None
     EMBEDDING_MODEL_NAME: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    LLM_MODEL: str = "gpt-4o-mini"
+
+    # ✅ 클래스별 RAG 설명 캐시 (인덱스 지문/프롬프트 버전/LLM 모델 단위로 버전 관리)
+    EXPLAIN_CACHE_TTL_SEC: int = 7 * 24 * 3600
+    EXPLAIN_CACHE_SIZE: int = 256
 
     # ✅ 기본값은 반드시 BASE_DIR 기준 상대경로(루트명 제거)
     RAG_INDEX_DIR: Path = Path("rag/indexes/faiss")
     DOCS_DIR: Path      = Path("rag/docs")
     UPLOAD_DIR: Path    = Path("uploads")
+    UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024   # 업로드 1건 상한 (초과 시 413)
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024       # 스트리밍 기록 청크
+
+    # ✅ 이미지 디코드/보조 처리 (image_utils). 분류기 입력 축소 디코드는 Model 쪽 DECODE_MIN_SIDE
+    MAX_IMAGE_SIZE: int = 2048                 # read_image 긴 변 상한
+    JPEG_QUALITY: int = 90
+    SUPPORTED_FORMATS: list[str] = [".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"]
+    IMAGE_CLEANUP_DAYS: int = 30
+
+    # ✅ 블로킹 작업 전용 실행기 (워커 수 / 대기열 상한). INFER_WORKERS=0 → torch intra-op 스레드 기준 자동
+    INFER_WORKERS: int = 0
+    INFER_QUEUE_MAX: int = 8
+    RAG_WORKERS: int = 4
+    RAG_QUEUE_MAX: int = 16
+    BUSY_RETRY_AFTER_SEC: int = 2
+
+    # ✅ 다중 이미지 배치 예측 (/api/predict/batch)
+    BATCH_MAX_FILES: int = 64
+    BATCH_CHUNK_SIZE: int = 8      # MN/RN 텐서 배치 크기 (청크 단위로 결과 스트리밍)
+    BATCH_DECODE_WORKERS: int = 4
+
+    # ✅ 동일 이미지 재업로드용 결과 캐시 (메모리 LRU + 선택적 디스크 계층)
+    PRED_CACHE_SIZE: int = 1024
+    PRED_CACHE_DIR: Path | None = None  # 멀티 워커는 지정 권장 (공유 디스크 계층만 id 응답 보관 → 삭제가 모든 워커에 반영)
+
+    # ✅ DB 커넥션 풀 (동기/비동기 엔진 공통). ASYNC_DATABASE_URL 미지정 → DATABASE_URL 드라이버만 교체
+    ASYNC_DATABASE_URL: str | None = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+
+    # ✅ 결과 저장 write-behind (요청들의 INSERT 를 모아 다중 VALUES INSERT 한 번으로)
+    WRITE_BEHIND_FLUSH_MS: float = 5.0
+    WRITE_BEHIND_MAX_BATCH: int = 128
+    WRITE_BEHIND_QUEUE_MAX: int = 2048
+
+    # ✅ GET /api/results — 클래스별 total 캐시 TTL (0 → 매 요청 COUNT)
+    RESULTS_COUNT_TTL_SEC: float = 30.0
+
+    # ✅ 모델 스냅샷 핫 리로드 (가중치/보정(T)/cascade 설정을 재시작 없이 교체)
+    MODEL_WARMUP_IMAGES: int = 2             # 교체 전 더미 배치 크기 (0 → 워밍업 생략)
+    MODEL_DRAIN_TIMEOUT_SEC: float = 60.0    # 이전 스냅샷의 진행 중 요청 대기 상한
+    MODEL_WATCH_SEC: float = 0.0             # >0 → 주기적으로 파일 지문 확인, 바뀌면 자동 리로드
+    MODEL_RELOAD_TOKEN: str | None = None    # POST /api/model/reload 의 X-Reload-Token (미설정 시 엔드포인트 403)
 
-    @field_validator("RAG_INDEX_DIR", "DOCS_DIR", "UPLOAD_DIR", mode="before")
+    @field_validator("RAG_INDEX_DIR", "DOCS_DIR", "UPLOAD_DIR", "PRED_CACHE_DIR", mode="before")
     @classmethod
     def make_abs(cls, v):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return None
         p = Path(v) if not isinstance(v, Path) else v
         if p.is_absolute():
             return p
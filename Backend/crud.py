@@ -1,12 +1,125 @@
 # backend/crud.py
+import base64
+import json
 import logging
-from typing import List, Optional
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from models import finalprojectresults
+from sqlalchemy import and_, case, delete, desc, func, insert, or_, select, text
+from .models import FinalProjectResult as finalprojectresults
+from .models import FinalProjectResultDetail, ResultRollup
+from .services.metrics import normalize_reason
 
 logger = logging.getLogger(__name__)
 
+def _num(v) -> Optional[float]:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
+
+def prediction_columns(detailed: Optional[Dict[str, Any]], confidence: Optional[float] = None) -> Dict[str, Any]:
+    """
+    detailed_prediction → FinalProjectResult 구조화 컬럼 값 (없는 항목은 None)
+    """
+    d = detailed or {}
+    picked, meta = d.get("picked") or {}, d.get("meta") or {}
+    mn, rn = d.get("mobilenet") or {}, d.get("resnet50") or {}
+    sig = meta.get("signals") or {}
+    raw_reason = picked.get("reason") or meta.get("reason")
+    return {
+        "confidence": _num(confidence if confidence is not None else picked.get("confidence")),
+        "picked_model": (picked.get("model") or None) and str(picked["model"])[:32],
+        "reason": normalize_reason(raw_reason)[:64],
+        "mn_label": mn.get("label"),
+        "mn_conf": _num(mn.get("confidence")),
+        "rn_label": rn.get("label"),
+        "rn_conf": _num(rn.get("confidence")),
+        "leaf_area": _num(sig.get("leaf")),
+        "gy": _num(sig.get("gy")),
+        "sat": _num(sig.get("sat")),
+        "inference_ms": _num(meta.get("inference_ms")),
+    }
+
+def detail_payload(terms, boolean_query, sources: List[dict], detailed: Optional[Dict[str, Any]]) -> str:
+    """FinalProjectResultDetail.payload (구 class_info 와 같은 JSON 구조)"""
+    return json.dumps({
+        "query_terms": terms,
+        "boolean_query": boolean_query,
+        "sources": sources,
+        "detailed_prediction": detailed,   # ← 디버깅에 유용
+    }, ensure_ascii=False, default=str)
+
+def _split_details(results: List[dict]) -> Tuple[List[dict], List[Optional[str]]]:
+    """행 dict 의 'detail'(payload JSON) 을 떼어 본 테이블 행과 분리"""
+    rows, details = [], []
+    for r in results:
+        r = dict(r)
+        details.append(r.pop("detail", None))
+        rows.append(r)
+    return rows, details
+
+def _detail_rows(ids: List[int], details: List[Optional[str]]) -> List[dict]:
+    return [{"result_id": i, "payload": p} for i, p in zip(ids, details) if p is not None]
+
+UNKNOWN_CLASS = "Unknown"
+
+def rollup_deltas(rows: List[dict], day: date, sign: int = 1) -> List[dict]:
+    """
+    결과 행(class_name / reason / confidence) 목록 → (day, class_name, reason) 별 증감분.
+    day 는 created_at 과 같은 시계(DB CURRENT_TIMESTAMP) 기준 날짜 — 삭제/재계산의 DATE(created_at) 와 일치해야 함
+    """
+    acc: Dict[Tuple[str, str], List[float]] = {}
+    for r in rows:
+        d = acc.setdefault((r.get("class_name") or UNKNOWN_CLASS, r.get("reason") or "Ensemble"), [0, 0.0])
+        d[0] += sign
+        d[1] += sign * float(r.get("confidence") or 0.0)
+    return [{"day": day, "class_name": c, "reason": rs, "n": n, "conf_sum": cs} for (c, rs), (n, cs) in acc.items()]
+
+_DB_NOW = select(func.current_timestamp())
+
+def _as_datetime(v: Any) -> datetime:
+    # 드라이버에 따라 CURRENT_TIMESTAMP 가 문자열로 올 수 있음 (SQLite)
+    return datetime.fromisoformat(str(v)) if not isinstance(v, datetime) else v
+
+def _stamp(rows: List[dict], now: datetime) -> List[dict]:
+    """
+    created_at 을 배치 시작 시 DB 시계 1회 조회값으로 명시 (server_default 와 같은 시계).
+    증분 집계 day(now.date()) 와 삭제/재계산의 DATE(created_at) 가 앱 프로세스 TZ 와 무관하게 같은 날짜
+    """
+    return [{**r, "created_at": r.get("created_at") or now} for r in rows]
+
+_AUTOINC_STEP = text("SELECT @@auto_increment_increment")
+
+def _id_range(first: int, n: int, step: int) -> List[int]:
+    """
+    RETURNING 미지원(MySQL) 다중 VALUES INSERT 의 id 목록 — lastrowid 는 첫 행 id.
+    한 문장의 행은 연속 할당(innodb_autoinc_lock_mode 1/2 의 단일 INSERT)되지만 간격은 auto_increment_increment
+    """
+    return list(range(first, first + n * step, step))
+
+def _rollup_upsert(dialect_name: str):
+    """n/conf_sum 누적 upsert (MySQL: ON DUPLICATE KEY UPDATE, SQLite/PostgreSQL: ON CONFLICT DO UPDATE)"""
+    t = ResultRollup.__table__
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(t)
+        return stmt.on_duplicate_key_update(n=t.c.n + stmt.inserted.n, conf_sum=t.c.conf_sum + stmt.inserted.conf_sum)
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(t)
+    return stmt.on_conflict_do_update(
+        index_elements=[t.c.day, t.c.class_name, t.c.reason],
+        set_={"n": t.c.n + stmt.excluded.n, "conf_sum": t.c.conf_sum + stmt.excluded.conf_sum},
+    )
+
+def apply_rollups(db: Session, deltas: List[dict]) -> None:
+    """집계 증감 (커밋은 호출 측 트랜잭션에서)"""
+    if deltas:
+        db.execute(_rollup_upsert(db.get_bind().dialect.name), deltas)
+
 def save_result(db: Session, *, class_name: str, class_info: Optional[str] = None,
                 recomm: Optional[str] = None, image_path: str) -> finalprojectresults:
     """
@@ -72,29 +185,68 @@ def save_result(db: Session, *, class_name: str, class_info: Optional[str] = Non
         
         raise
 
-def save_results_batch(db: Session, results: List[dict]) -> List[finalprojectresults]:
+def save_results_batch(db: Session, results: List[dict], rollup_only: Optional[List[dict]] = None) -> List[int]:
     """
-    여러 예측 결과를 배치로 저장합니다.
+    여러 예측 결과를 INSERT 한 문장으로 저장하고, 입력 순서대로 id 목록을 반환합니다.
+    - RETURNING 지원 DB(SQLite/MariaDB/PostgreSQL): insert ... returning id
+    - MySQL: 다중 VALUES INSERT 후 LAST_INSERT_ID() 부터 @@auto_increment_increment 간격의 id
+      (InnoDB 는 행 수가 정해진 simple insert 에 연속 auto-increment 를 보장)
+    - 행의 'detail'(detail_payload) 은 같은 트랜잭션에서 상세 테이블에 다중 INSERT
+    - 일별 집계(result_rollups)도 같은 트랜잭션에서 증가 (rollup_only: 행 없이 집계만 — Unknown)
     """
+    if not results and not rollup_only:
+        return []
     try:
-        # bulk_insert_mappings 사용으로 대량 삽입 최적화
-        db.bulk_insert_mappings(finalprojectresults, results)
+        table = finalprojectresults.__table__
+        now = _as_datetime(db.execute(_DB_NOW).scalar())
+        rows, details = _split_details(results)
+        rows = _stamp(rows, now)
+        ids: List[int] = []
+        if rows and db.get_bind().dialect.insert_returning:
+            ids = list(db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).scalars())
+        elif rows:
+            step = int(db.execute(_AUTOINC_STEP).scalar() or 1) if db.get_bind().dialect.name == "mysql" else 1
+            res = db.execute(insert(table).values(rows))
+            ids = _id_range(int(res.lastrowid), len(rows), step)
+        drows = _detail_rows(ids, details)
+        if drows:
+            db.execute(insert(FinalProjectResultDetail.__table__), drows)
+        apply_rollups(db, rollup_deltas(rows + list(rollup_only or []), now.date()))
         db.commit()
-        # 삽입된 레코드 조회
-        inserted = (
-            db.query(finalprojectresults)
-            .filter(finalprojectresults.image_path == results[0]["image_path"])
-            .order_by(finalprojectresults.created_at.desc())
-            .limit(len(results))
-            .all()
-        )
-        logger.info(f"배치 저장 완료: {len(inserted)}개 결과")
-        return inserted
+        logger.info(f"배치 저장 완료: {len(ids)}개 결과")
+        return ids
     except Exception as e:
         logger.error(f"배치 저장 실패: {str(e)}")
         db.rollback()
         raise
 
+async def save_results_batch_async(engine, results: List[dict], rollup_only: Optional[List[dict]] = None) -> List[int]:
+    """
+    save_results_batch 의 비동기 엔진 버전 (write-behind 플러시용) — 한 트랜잭션, INSERT 한 문장, 입력 순서대로 id
+    """
+    if not results and not rollup_only:
+        return []
+    table = finalprojectresults.__table__
+    rows, details = _split_details(results)
+    ids: List[int] = []
+    async with engine.begin() as conn:
+        now = _as_datetime((await conn.execute(_DB_NOW)).scalar())
+        rows = _stamp(rows, now)
+        if rows and conn.dialect.insert_returning:
+            res = await conn.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+            ids = list(res.scalars())
+        elif rows:
+            step = int((await conn.execute(_AUTOINC_STEP)).scalar() or 1) if conn.dialect.name == "mysql" else 1
+            res = await conn.execute(insert(table).values(rows))
+            ids = _id_range(int(res.lastrowid), len(rows), step)
+        drows = _detail_rows(ids, details)
+        if drows:
+            await conn.execute(insert(FinalProjectResultDetail.__table__), drows)
+        deltas = rollup_deltas(rows + list(rollup_only or []), now.date())
+        if deltas:
+            await conn.execute(_rollup_upsert(conn.dialect.name), deltas)
+    return ids
+
 def get_result_by_id(db: Session, result_id: int) -> Optional[finalprojectresults]:
     """
     ID로 예측 결과를 조회합니다.
@@ -105,6 +257,18 @@ def get_result_by_id(db: Session, result_id: int) -> Optional[finalprojectresult
         logger.error(f"예측 결과 조회 실패 (ID: {result_id}): {str(e)}")
         raise
 
+def result_detail(row: finalprojectresults) -> Optional[Dict[str, Any]]:
+    """
+    상세 payload (지연 로드). 상세 테이블이 없으면 구 class_info JSON 으로 대체
+    """
+    raw = row.detail.payload if row.detail is not None else row.class_info
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+
 def get_results_by_image_path(db: Session, image_path: str) -> List[finalprojectresults]:
     """
     이미지 경로로 예측 결과들을 조회합니다.
@@ -141,6 +305,85 @@ def get_results_by_class(db: Session, class_name: str, limit: int = 100) -> List
         logger.error(f"클래스별 예측 결과 조회 실패 ({class_name}): {str(e)}")
         raise
 
+def encode_cursor(row: finalprojectresults, direction: str, order: str, class_name: Optional[str]) -> str:
+    """
+    (created_at, id) 위치를 불투명 커서로 — base64url(JSON).
+    direction: "n"(이 행 다음) / "p"(이 행 이전). 정렬/필터도 담아 다른 조건에 재사용되는 것을 막음
+    """
+    raw = json.dumps({"t": row.created_at.isoformat(), "i": row.id, "d": direction, "o": order, "c": class_name},
+                     separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, order: str, class_name: Optional[str]) -> Tuple[datetime, int, str]:
+    """커서 → (created_at, id, direction). 형식 오류/조건 불일치는 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c = json.loads(raw)
+        t, i, d = datetime.fromisoformat(c["t"]), int(c["i"]), c["d"]
+    except Exception:
+        raise ValueError("잘못된 커서입니다")
+    if d not in ("n", "p"):
+        raise ValueError("잘못된 커서입니다")
+    if c.get("o") != order or (c.get("c") or None) != (class_name or None):
+        raise ValueError("커서의 정렬/필터 조건이 요청과 다릅니다")
+    return t, i, d
+
+def count_results(db: Session, class_name: Optional[str] = None) -> int:
+    """
+    결과 행 수 (class_name 지정 시 해당 클래스만)
+    """
+    q = db.query(func.count(finalprojectresults.id))
+    if class_name:
+        q = q.filter(finalprojectresults.class_name == class_name)
+    return int(q.scalar() or 0)
+
+def list_results_page(db: Session, *, size: int, order: str = "desc", class_name: Optional[str] = None,
+                      cursor: Optional[str] = None, offset: int = 0
+                      ) -> Tuple[List[finalprojectresults], Optional[str], Optional[str]]:
+    """
+    목록 한 페이지 → (rows, next_cursor, prev_cursor).
+    - cursor 지정: (created_at, id) keyset 범위 조건 — idx_class_created_id / idx_created_id 범위 스캔, 깊이와 무관
+    - cursor 없음: offset (하위 호환, offset=0 이면 keyset 첫 페이지와 같음)
+    size+1 행을 읽어 다음(이전) 페이지 존재 여부를 판단
+    """
+    T = finalprojectresults
+    asc = order == "asc"
+    q = db.query(T)
+    if class_name:
+        q = q.filter(T.class_name == class_name)
+
+    direction = "n"
+    if cursor:
+        t, i, direction = decode_cursor(cursor, order, class_name)
+        forward = (direction == "n") != asc  # True → 더 오래된(작은) 쪽으로 진행
+        if forward:
+            q = q.filter(or_(T.created_at < t, and_(T.created_at == t, T.id < i)))
+        else:
+            q = q.filter(or_(T.created_at > t, and_(T.created_at == t, T.id > i)))
+        desc_scan = forward
+    else:
+        desc_scan = not asc
+    if desc_scan:
+        q = q.order_by(T.created_at.desc(), T.id.desc())
+    else:
+        q = q.order_by(T.created_at.asc(), T.id.asc())
+    if offset and not cursor:
+        q = q.offset(offset)
+
+    rows = q.limit(size + 1).all()
+    more = len(rows) > size
+    rows = rows[:size]
+    if direction == "p":
+        rows.reverse()  # 역방향으로 읽었으므로 표시 순서로 되돌림
+    if not rows:
+        return rows, None, None
+
+    has_next = more if direction == "n" else True
+    has_prev = more if direction == "p" else bool(cursor or offset)
+    next_cursor = encode_cursor(rows[-1], "n", order, class_name) if has_next else None
+    prev_cursor = encode_cursor(rows[0], "p", order, class_name) if has_prev else None
+    return rows, next_cursor, prev_cursor
+
 def delete_result(db: Session, result_id: int) -> bool:
     """
     예측 결과를 삭제합니다.
@@ -160,25 +403,105 @@ def delete_result(db: Session, result_id: int) -> bool:
         db.rollback()
         raise
 
+def rebuild_rollups(db: Session, since: Optional[date] = None) -> int:
+    """
+    results 테이블에서 일별 집계를 다시 계산 (since 이후 날짜만, None 이면 전체).
+    증분 갱신과의 차이(수동 수정/삭제, 자정 경계 등)를 맞추는 정리 작업용.
+    Unknown 집계는 결과 행이 없으므로 그대로 둠
+    """
+    T, R = finalprojectresults, ResultRollup
+    try:
+        cond = [R.class_name != UNKNOWN_CLASS]
+        src = [T.created_at.isnot(None)]
+        if since is not None:
+            cond.append(R.day >= since)
+            src.append(T.created_at >= datetime.combine(since, time.min))
+        db.execute(delete(R).where(*cond))
+        day = func.date(T.created_at)
+        reason = func.coalesce(T.reason, "Ensemble")
+        sel = (select(day, T.class_name, reason, func.count(T.id), func.coalesce(func.sum(T.confidence), 0.0))
+               .where(*src).group_by(day, T.class_name, reason))
+        res = db.execute(insert(R).from_select(["day", "class_name", "reason", "n", "conf_sum"], sel))
+        db.commit()
+        logger.info(f"집계 재계산 완료: since={since}, {res.rowcount}행")
+        return int(res.rowcount or 0)
+    except Exception as e:
+        logger.error(f"집계 재계산 실패: {str(e)}")
+        db.rollback()
+        raise
+
+def _mean(conf_sum, n) -> Optional[float]:
+    return (float(conf_sum) / n) if n else None
+
+def get_stats(db: Session, start: date, end: date, class_name: Optional[str] = None) -> dict:
+    """
+    기간(일 단위, 양끝 포함) 통계 — result_rollups 의 기본키 범위 스캔만 (결과 테이블 크기와 무관)
+    mean_confidence 는 Unknown 제외
+    """
+    R = ResultRollup
+    cond = [R.day >= start, R.day <= end]
+    if class_name:
+        cond.append(R.class_name == class_name)
+    is_unknown = R.class_name == UNKNOWN_CLASS
+    known_n = func.sum(case((is_unknown, 0), else_=R.n))
+    unknown_n = func.sum(case((is_unknown, R.n), else_=0))
+    try:
+        by_day = db.execute(
+            select(R.day, known_n, unknown_n, func.sum(R.conf_sum)).where(*cond).group_by(R.day).order_by(R.day)
+        ).all()
+        by_class = db.execute(
+            select(R.class_name, func.sum(R.n), func.sum(R.conf_sum)).where(*cond)
+            .group_by(R.class_name).order_by(desc(func.sum(R.n)))
+        ).all()
+        by_reason = db.execute(
+            select(R.reason, func.sum(R.n)).where(*cond).group_by(R.reason).order_by(desc(func.sum(R.n)))
+        ).all()
+    except Exception as e:
+        logger.error(f"통계 조회 실패 ({start}~{end}, {class_name}): {str(e)}")
+        raise
+
+    known = sum(int(k or 0) for _, k, _, _ in by_day)
+    unknown = sum(int(u or 0) for _, _, u, _ in by_day)
+    conf_sum = sum(float(c or 0.0) for _, _, _, c in by_day)
+    total = known + unknown
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "total": total,
+        "unknown": unknown,
+        "unknown_rate": (unknown / total) if total else 0.0,
+        "mean_confidence": _mean(conf_sum, known),
+        "by_day": [
+            {"day": str(d), "count": int(k or 0) + int(u or 0), "unknown": int(u or 0),
+             "unknown_rate": (int(u or 0) / (int(k or 0) + int(u or 0))) if (k or u) else 0.0,
+             "mean_confidence": _mean(c or 0.0, int(k or 0))}
+            for d, k, u, c in by_day
+        ],
+        "by_class": [
+            {"class_name": c, "count": int(n or 0),
+             "mean_confidence": None if c == UNKNOWN_CLASS else _mean(cs or 0.0, int(n or 0))}
+            for c, n, cs in by_class
+        ],
+        "by_reason": [{"reason": r, "count": int(n or 0)} for r, n in by_reason],
+    }
+
 def get_statistics(db: Session) -> dict:
     """
-    예측 통계를 조회합니다.
+    예측 통계를 조회합니다. (저장된 결과 기준 — 집계 테이블에서, Unknown 제외)
     """
     try:
-        total_count = db.query(finalprojectresults).count()
-        
-        # 클래스별 통계
+        R = ResultRollup
         class_stats = db.query(
-            finalprojectresults.class_name,
-            db.func.count(finalprojectresults.id).label('count')
-        ).group_by(finalprojectresults.class_name).all()
-        
+            R.class_name,
+            func.sum(R.n).label('count')
+        ).filter(R.class_name != UNKNOWN_CLASS).group_by(R.class_name).all()
+
         return {
-            "total_analyses": total_count,
+            "total_analyses": sum(int(stat.count or 0) for stat in class_stats),
             "class_statistics": [
                 {
                     "class_name": stat.class_name,
-                    "count": stat.count
+                    "count": int(stat.count or 0)
                 }
                 for stat in class_stats
             ]
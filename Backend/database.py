@@ -1,8 +1,9 @@
 # Backend/database.py
 from __future__ import annotations
 from pathlib import Path
-import os
+from typing import Any, Dict
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
@@ -12,16 +13,65 @@ load_dotenv(dotenv_path=BASE_DIR / ".env", override=True)
 
 from .config import settings  # load_dotenv 이후에 import
 
+def _pool_kwargs(url) -> Dict[str, Any]:
+    """✅ 풀 크기는 설정값 (SQLite 는 드라이버 기본 풀 사용)"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
     future=True,
+    **_pool_kwargs(settings.DATABASE_URL),
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
+# ===================== 비동기 엔진 (결과 쓰기 전용, 이벤트 루프에서 직접 사용) =====================
+_ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite", "postgresql": "asyncpg"}
+_async_engine = None
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL 이 없으면 DATABASE_URL 의 드라이버만 비동기로 교체 (mysql+pymysql → mysql+aiomysql)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver:
+        url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    return url.render_as_string(hide_password=False)
+
+def get_async_engine():
+    """첫 사용 시 생성 (현재 이벤트 루프의 커넥션 풀). 드라이버는 requirements 의 aiomysql/aiosqlite"""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = async_database_url()
+        _async_engine = create_async_engine(url, pool_pre_ping=True, **_pool_kwargs(url))
+    return _async_engine
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        eng, _async_engine = _async_engine, None
+        await eng.dispose()
+
+def sqlite_ddl_compat() -> None:
+    """MySQL 전용 'ON UPDATE CURRENT_TIMESTAMP' 기본값을 SQLite DDL 에서 제거 (벤치/테스트용 SQLite DB 생성)"""
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.schema import CreateColumn
+
+    @compiles(CreateColumn, "sqlite")
+    def _column(element, compiler, **kw):
+        return compiler.visit_create_column(element, **kw).replace(" ON UPDATE CURRENT_TIMESTAMP", "")
+
 def test_db_connection():
     try:
         with engine.begin() as conn:
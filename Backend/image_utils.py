@@ -3,14 +3,18 @@
 import logging
 import os
 import uuid
+from typing import Optional
 
 import cv2
 import numpy as np
 
-from config import get_settings
+from .config import settings
 
-# 설정 로드
-settings = get_settings()
+# 분류기와 같은 디코드 경로 (Model/decode.py — torch 비의존)
+try:
+    from Model.decode import decode_rgb
+except ImportError:
+    from decode import decode_rgb
 
 logger = logging.getLogger(__name__)
 
@@ -45,13 +49,20 @@ def resize_image_if_needed(image: np.ndarray, max_size: int = MAX_IMAGE_SIZE) ->
     logger.info(f"이미지 리사이즈: {width}x{height} -> {new_width}x{new_height}")
     return resized
 
+def decode_image(src, min_side: Optional[int] = None) -> np.ndarray:
+    """
+    업로드(바이트/파일 핸들/경로) → 분류기 입력용 uint8 HWC RGB 배열.
+    예측 캐시 해시·규칙 신호·텐서 변환이 모두 이 배열 하나를 공유 (PIL 왕복 없음)
+    """
+    return decode_rgb(src, min_side=min_side)
+
 def read_image(data: bytes) -> np.ndarray:
-    """바이트 데이터에서 이미지 읽기 (최적화됨)"""
+    """바이트 데이터에서 이미지 읽기 (BGR). 긴 변이 MAX_IMAGE_SIZE 보다 훨씬 크면 JPEG 축소 디코드"""
     try:
-        # numpy로 직접 읽기
-        arr = np.frombuffer(data, np.uint8)
-        image = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-        
+        try:
+            image = decode_rgb(data, min_side=0, min_long=MAX_IMAGE_SIZE, bgr=True)
+        except Exception:
+            image = None
         if image is None:
             raise ValueError("이미지를 읽을 수 없습니다")
         
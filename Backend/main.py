@@ -8,7 +8,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 import structlog
 
 from .config import settings
@@ -29,14 +30,35 @@ UPLOAD_DIR = getattr(settings, "UPLOAD_DIR", "Backend/uploads")
 DOCS_DIR = getattr(settings, "DOCS_DIR", "Backend/rag/docs")
 RAG_INDEX_DIR = getattr(settings, "RAG_INDEX_DIR", "Backend/rag/indexes/faiss")
 
-# 선택: classifier 로드 지원
+# 선택: classifier 로드 지원 (api 라우터와 같은 싱글톤 사용 — 모델은 1회만 로드)
 classifier = None
+CLASSIFIER_DEMO_MODE = False
 try:
-    from .services.classifier import Classifier
-    classifier = Classifier()
+    from .services.classifier import classifier, DEMO_MODE as CLASSIFIER_DEMO_MODE
 except Exception as e:
     print(f"⚠️ classifier 준비 실패: {e} (스텁 모드)")
 
+from .services.startup import startup
+
+
+class StreamingAwareGZip:
+    """
+    GZipMiddleware 래퍼 — NDJSON 스트리밍 경로는 압축하지 않음.
+    gzip 은 압축 블록이 찰 때까지 버퍼링하므로 줄 단위 결과가 클라이언트에 바로 도착하지 않음
+    """
+
+    def __init__(self, app, minimum_size: int = 500, exclude_paths: tuple = ()):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
 # DB 헬스체크
 try:
     from .database import test_db_connection
@@ -73,17 +95,54 @@ async def lifespan(app: FastAPI):
         os.makedirs(UPLOAD_DIR, exist_ok=True)
         os.makedirs(DOCS_DIR, exist_ok=True)
         os.makedirs(RAG_INDEX_DIR, exist_ok=True)
+        try:
+            from .services.upload_store import upload_store
+            upload_store.cleanup_tmp()
+        except Exception as e:
+            logger.warning("업로드 임시 파일 정리 실패", error=str(e))
+        # ✅ 무거운 구성요소는 백그라운드에서 병렬 로드 (lifespan 은 바로 반환, 준비 상태는 /ready)
         if classifier is not None:
-            try:
+            def _load_classifier():
                 classifier.load()
-                logger.info("분류 모델 로드 성공")
-            except Exception as e:
-                logger.warning("분류 모델 로드 실패 - 스텁 사용", error=str(e))
+                # 모델 없이 스텁/데모 응답으로 서빙하지 않도록 실패로 보고 → /ready 가 트래픽 차단 (데모 모드 제외)
+                if not classifier.model_available and not CLASSIFIER_DEMO_MODE:
+                    raise RuntimeError(classifier.registry.last_error or "모델을 사용할 수 없습니다 (CLASSIFIER_DEMO_MODE=1 이면 허용)")
+                model = getattr(classifier, "model", None)
+                return {
+                    "model_available": classifier.model_available,
+                    "model_version": getattr(model, "version", None),
+                    "checkpoints_ms": getattr(model, "load_ms", None),
+                }
+            startup.register("classifier", _load_classifier)
+
+        def _load_rag():
+            from .services.rag_service import get_rag, rag_error
+            rag = get_rag()
+            if rag is None:
+                raise RuntimeError(rag_error() or "RAG 초기화 실패")
+            return {"index_loaded": rag.vs is not None, "query_vectors": len(rag.qvec) if rag.qvec is not None else 0}
+        startup.register("rag", _load_rag)
+        startup.start()
+        # ✅ 결과 INSERT write-behind 플러셔 (비동기 엔진 — 이 이벤트 루프에 바인딩)
+        from .services.write_behind import result_writer
+        result_writer.start()
     except Exception as e:
         logger.error("초기화 실패", error=str(e))
         raise
     yield
     logger.info("애플리케이션 종료 중...")
+    try:
+        from .services.write_behind import result_writer
+        await result_writer.stop()  # 대기 중인 행 기록 후 종료
+    except Exception as e:
+        logger.warning("결과 쓰기 큐 종료 실패", error=str(e))
+    if classifier is not None:
+        classifier.registry.stop_watch()
+    try:
+        from .services.executors import shutdown_executors
+        shutdown_executors()
+    except Exception as e:
+        logger.warning("실행기 종료 실패", error=str(e))
     logger.info("애플리케이션 종료 완료")
 
 app = FastAPI(
@@ -96,7 +155,7 @@ app = FastAPI(
 )
 
 # 미들웨어
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(StreamingAwareGZip, minimum_size=1000, exclude_paths=(f"{API_PREFIX}/predict/batch",))
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -143,7 +202,8 @@ except Exception:
 @app.get("/health", response_model=HealthCheck)
 async def health_check_endpoint():
     try:
-        db_ok = test_db_connection()
+        # DB ping도 블로킹이므로 이벤트 루프 밖에서 실행
+        db_ok = await run_in_threadpool(test_db_connection)
         return {
             "status": "healthy" if db_ok else "unhealthy",
             "service": APP_NAME,
@@ -159,6 +219,18 @@ async def health_check_endpoint():
             "version": APP_VERSION,
         }
 
+@app.get("/ready")
+async def readiness_endpoint():
+    """구성요소별 로드 상태/시간. 필수 구성요소가 모두 ready 일 때만 200 (오토스케일러/LB 용)"""
+    status = startup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 수집용 (단계별/요청 지연 히스토그램, 결정 사유 라벨). 워커 프로세스별 값"""
+    from .services.metrics import render
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(
@@ -1,5 +1,6 @@
 # Backend/models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Index, text
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Float, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
 from .database import Base
 
 class FinalProjectResult(Base):
@@ -7,11 +8,54 @@ class FinalProjectResult(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     class_name = Column(String(255), nullable=False)
-    class_info = Column(Text, nullable=True)
+    class_info = Column(Text, nullable=True)  # (구) JSON 통째 저장 — 신규 행은 NULL, 상세는 FinalProjectResultDetail
     recomm = Column(Text, nullable=True)
     image_path = Column(String(500), nullable=False)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
 
-Index("idx_class_name", FinalProjectResult.class_name)
-Index("idx_created_at", FinalProjectResult.created_at)
\ No newline at end of file
+    # ✅ 분석용 구조화 컬럼 (detailed_prediction 에서 추출, SQL 로 필터/집계)
+    confidence = Column(Float, nullable=True)
+    picked_model = Column(String(32), nullable=True)    # MobileNetV2 / ResNet50 / Ensemble / AgreeOverride ...
+    reason = Column(String(64), nullable=True)          # 정규화된 결정 사유 (CONSENSUS, Global:WaterVeto ...)
+    mn_label = Column(String(255), nullable=True)
+    mn_conf = Column(Float, nullable=True)
+    rn_label = Column(String(255), nullable=True)       # 캐스케이드 MN 단독 경로면 NULL
+    rn_conf = Column(Float, nullable=True)
+    leaf_area = Column(Float, nullable=True)
+    gy = Column(Float, nullable=True)
+    sat = Column(Float, nullable=True)
+    inference_ms = Column(Float, nullable=True)
+
+    # 질의어/출처/detailed_prediction 원본 — 상세 조회에서만 로드
+    detail = relationship("FinalProjectResultDetail", uselist=False, lazy="select",
+                          cascade="all, delete-orphan", back_populates="result")
+
+class FinalProjectResultDetail(Base):
+    __tablename__ = "final_project_result_details"
+
+    result_id = Column(Integer, ForeignKey("final_project_results.id", ondelete="CASCADE"), primary_key=True)
+    payload = Column(Text, nullable=False)  # JSON: query_terms / boolean_query / sources / detailed_prediction
+
+    result = relationship("FinalProjectResult", back_populates="detail")
+
+class ResultRollup(Base):
+    """
+    일 × 클래스 × 결정 사유 집계 (/api/stats). 결과 INSERT/DELETE 와 같은 트랜잭션에서 증감,
+    Unknown(결과 행 없음)은 class_name="Unknown" 으로 집계만. stats_rollup 작업으로 재계산 가능
+    """
+    __tablename__ = "result_rollups"
+
+    day = Column(Date, primary_key=True)
+    class_name = Column(String(255), primary_key=True)
+    reason = Column(String(64), primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+    conf_sum = Column(Float, nullable=False, default=0.0)
+
+# ✅ 목록 조회(keyset) 순서 (created_at, id) 와 class_name 필터를 그대로 타는 복합 인덱스
+Index("idx_class_created_id", FinalProjectResult.class_name, FinalProjectResult.created_at, FinalProjectResult.id)
+Index("idx_created_id", FinalProjectResult.created_at, FinalProjectResult.id)
+# ✅ 기간 × 클래스 × 사유 집계 (인덱스만으로 GROUP BY), 사유별 추이, 클래스별 신뢰도 분포
+Index("idx_created_class_reason", FinalProjectResult.created_at, FinalProjectResult.class_name, FinalProjectResult.reason)
+Index("idx_reason_created", FinalProjectResult.reason, FinalProjectResult.created_at)
+Index("idx_class_confidence", FinalProjectResult.class_name, FinalProjectResult.confidence)
@@ -12,10 +12,13 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
 from ..config import settings
+from .query_vectors import build as build_query_vectors
 
 DOCS_DIR = Path(settings.DOCS_DIR)
 INDEX_DIR = Path(settings.RAG_INDEX_DIR)
 INDEX_DIR.mkdir(parents=True, exist_ok=True)
+# services/rag_service.py 의 EXPLAIN_CACHE_FILE 과 동일 (서비스 import 시 임베딩 모델이 로드되므로 상수만 복제)
+EXPLAIN_CACHE_FILE = "explain_cache.json"
 
 
 def load_pdf(path: Path) -> List[Document]:
@@ -93,6 +96,16 @@ def main():
         vs.save_local(str(INDEX_DIR))
         print("[ingest] created new index.")
 
+    # 클래스별 질의 벡터 테이블 (서버는 mmap 으로 읽어 인코더 없이 검색)
+    n = build_query_vectors(emb, INDEX_DIR, settings.EMBEDDING_MODEL_NAME)
+    print(f"[ingest] query vectors: {n}")
+
+    # 인덱스가 바뀌었으므로 클래스별 설명 캐시 무효화 (서버는 인덱스 지문 변경으로도 감지)
+    cache_file = INDEX_DIR / EXPLAIN_CACHE_FILE
+    if cache_file.exists():
+        cache_file.unlink()
+        print("[ingest] explanation cache invalidated.")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
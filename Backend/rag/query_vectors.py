@@ -0,0 +1,84 @@
+# Backend/rag/query_vectors.py
+"""
+클래스별 RAG 질의 임베딩 테이블.
+질의는 클래스 라벨마다 하나(synonyms → boolean query)로 유한하므로 미리 임베딩해
+FAISS 인덱스 옆에 저장하고, 서버는 mmap 으로 읽어 인코더 forward 없이 검색한다.
+
+- query_vectors.npy  : float32 [N, D]
+- query_vectors.json : {"model": 임베딩 모델명, "labels": [...], "queries": [...], "dim": D}
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..services.synonyms import SYNONYMS, class_to_query_terms, as_boolean_query
+
+VECTORS_FILE = "query_vectors.npy"
+META_FILE = "query_vectors.json"
+
+
+def class_queries(labels: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """라벨 → boolean 질의 (api/rag_service 와 동일한 생성 규칙)"""
+    labels = list(labels) if labels is not None else list(SYNONYMS.keys())
+    return {lbl: as_boolean_query(class_to_query_terms(lbl)) for lbl in labels}
+
+
+def build(emb, index_dir: Path, model_name: str, labels: Optional[Iterable[str]] = None) -> int:
+    """모든 클래스 질의를 임베딩해 index_dir 에 저장 (원자적 교체). 저장한 벡터 수 반환"""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    qmap = class_queries(labels)
+    names = list(qmap.keys())
+    queries = [qmap[n] for n in names]
+    vecs = np.asarray(emb.embed_documents(queries), dtype=np.float32)
+
+    tmp_vec = index_dir / f"{VECTORS_FILE}.{os.getpid()}.tmp"
+    tmp_meta = index_dir / f"{META_FILE}.{os.getpid()}.tmp"
+    with open(tmp_vec, "wb") as f:
+        np.save(f, vecs)
+    tmp_meta.write_text(
+        json.dumps({"model": model_name, "labels": names, "queries": queries, "dim": int(vecs.shape[1])},
+                   ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp_vec, index_dir / VECTORS_FILE)
+    os.replace(tmp_meta, index_dir / META_FILE)
+    return len(names)
+
+
+class QueryVectorTable:
+    """mmap 으로 연 질의 벡터 테이블 (읽기 전용, 프로세스 간 페이지 공유)"""
+
+    def __init__(self, vectors: np.ndarray, queries: List[str], model_name: str):
+        self.vectors = vectors
+        self.model_name = model_name
+        self._row: Dict[str, int] = {q: i for i, q in enumerate(queries)}
+
+    @classmethod
+    def load(cls, index_dir: Path, model_name: str) -> Optional["QueryVectorTable"]:
+        index_dir = Path(index_dir)
+        vec_path, meta_path = index_dir / VECTORS_FILE, index_dir / META_FILE
+        if not (vec_path.is_file() and meta_path.is_file()):
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("model") != model_name:
+            return None  # 임베딩 모델이 바뀌면 재생성 필요
+        vectors = np.load(vec_path, mmap_mode="r")
+        if vectors.shape[0] != len(meta.get("queries", [])):
+            return None
+        return cls(vectors, meta["queries"], model_name)
+
+    def covers(self, queries: Iterable[str]) -> bool:
+        return all(q in self._row for q in queries)
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        i = self._row.get(query)
+        return None if i is None else self.vectors[i]
+
+    def __len__(self) -> int:
+        return len(self._row)
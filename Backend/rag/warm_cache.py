@@ -0,0 +1,60 @@
+# Backend/rag/warm_cache.py
+"""
+클래스별 RAG 설명 캐시 예열.
+class_to_idx.json 의 모든 클래스에 대해 검색 + 설명 생성 결과를 미리 만들어
+predict 요청이 임베딩/LLM 왕복 없이 응답하도록 함.
+
+사용: python -m Backend.rag.warm_cache [--force] [--k 4]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from ..config import BASE_DIR, settings
+from ..services.rag_service import get_rag
+
+CLASS_TO_IDX_JSON = Path(os.getenv("CLASS_TO_IDX_JSON", BASE_DIR.parent / "Model" / "weights" / "class_to_idx.json"))
+
+
+def load_class_names(path: Path) -> List[str]:
+    js = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(js, dict) and isinstance(js.get("classes"), dict):
+        js = js["classes"]
+    if isinstance(js, dict):
+        # {"name": idx} 또는 {idx: "name"}
+        if all(isinstance(v, str) for v in js.values()):
+            return [v for _, v in sorted(js.items(), key=lambda kv: int(kv[0]))]
+        return [k for k, _ in sorted(js.items(), key=lambda kv: int(kv[1]))]
+    return list(js)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="클래스별 RAG 설명 캐시 예열")
+    ap.add_argument("--force", action="store_true", help="캐시가 있어도 다시 생성")
+    ap.add_argument("--k", type=int, default=4)
+    args = ap.parse_args()
+
+    rag = get_rag()
+    if rag is None or not rag.vs:
+        print(f"[warm] RAG 인덱스가 없습니다: {settings.RAG_INDEX_DIR} (먼저 ingest_batch 실행)")
+        return
+
+    classes = load_class_names(CLASS_TO_IDX_JSON)
+    print(f"[warm] classes: {len(classes)}, index_fp={rag.index_fp}, llm={rag.llm_id}")
+    t_all = time.time()
+    for name in classes:
+        t0 = time.time()
+        before = rag.explain_cache.stats()["hits"]
+        rag.explain_class(name, k=args.k, use_cache=not args.force)
+        hit = rag.explain_cache.stats()["hits"] > before
+        print(f"[warm] {'cached ' if hit else 'built  '} {name} ({(time.time() - t0) * 1000:.0f} ms)")
+    print(f"[warm] done in {time.time() - t_all:.1f}s, entries={rag.explain_cache.stats()['size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,13 +27,17 @@ class ResultItem(BaseModel):
     class_name: str
     image_path: str
     created_at: str  # ISO 문자열로 반환
+    confidence: Optional[float] = None
+    reason: Optional[str] = None
 
 # 페이지네이션 응답
 class ResultsPage(BaseModel):
-    total: int
-    page: int = Field(ge=1)
+    total: Optional[int] = None  # 클래스별 캐시 값 (TTL 내 근사), with_total=false 면 None
+    page: Optional[int] = Field(default=None, ge=1)  # offset 모드에서만
     size: int = Field(ge=1, le=200)
     items: List[ResultItem]
+    next_cursor: Optional[str] = None  # ✅ keyset 커서 (다음/이전 페이지가 없으면 None)
+    prev_cursor: Optional[str] = None
 
 # 상세조회
 class ResultDetail(BaseModel):
@@ -43,9 +47,49 @@ class ResultDetail(BaseModel):
     image_path: str
     created_at: str
     updated_at: str
-    # class_info는 JSON 문자열이므로, 파싱해서 dict로 반환
+    # ✅ 구조화 컬럼 (구 행은 마이그레이션 백필 값, 없으면 None)
+    confidence: Optional[float] = None
+    picked_model: Optional[str] = None
+    reason: Optional[str] = None
+    mn_label: Optional[str] = None
+    mn_conf: Optional[float] = None
+    rn_label: Optional[str] = None
+    rn_conf: Optional[float] = None
+    leaf_area: Optional[float] = None
+    gy: Optional[float] = None
+    sat: Optional[float] = None
+    inference_ms: Optional[float] = None
+    # 질의어/출처/detailed_prediction — 상세 테이블(구 행은 class_info) JSON 을 dict 로 반환
     class_info: Optional[Dict[str, Any]] = None
 
+# 통계 (/api/stats)
+class StatsDayItem(BaseModel):
+    day: str
+    count: int
+    unknown: int
+    unknown_rate: float
+    mean_confidence: Optional[float] = None
+
+class StatsClassItem(BaseModel):
+    class_name: str
+    count: int
+    mean_confidence: Optional[float] = None
+
+class StatsReasonItem(BaseModel):
+    reason: str
+    count: int
+
+class StatsResponse(BaseModel):
+    start: str
+    end: str
+    total: int
+    unknown: int
+    unknown_rate: float
+    mean_confidence: Optional[float] = None  # Unknown 제외
+    by_day: List[StatsDayItem] = Field(default_factory=list)
+    by_class: List[StatsClassItem] = Field(default_factory=list)
+    by_reason: List[StatsReasonItem] = Field(default_factory=list)
+
 # 삭제 응답
 class DeleteResult(BaseModel):
     id: int
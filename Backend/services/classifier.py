@@ -2,143 +2,288 @@
 from __future__ import annotations
 import os
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Tuple, Dict, Optional
+from typing import Tuple, Dict, List, Optional
 import logging
 
 # ✅ 상대 임포트로 패키지 안정화
 from .guard import ClassGuard, GuardConfig
+from .decision import GATE_MIN, DELTA_MAX, AGREE_MIN, apply_decision, decision_version  # noqa: F401
+from .model_registry import ModelRegistry, ModelSnapshot, ReloadInProgress
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
 # model 폴더 경로를 Python 경로에 추가
 current_file = Path(__file__)
 project_root = current_file.parent.parent.parent  # Backend/services 상위
-model_path = project_root / "model"
+model_path = project_root / "Model"
+if not model_path.is_dir():
+    model_path = project_root / "model"
 DEMO_MODE = bool(int(os.getenv("CLASSIFIER_DEMO_MODE", "0")))
 
 if str(model_path) not in sys.path:
     sys.path.insert(0, str(model_path))
     sys.path.insert(0, str(project_root))
 
-try:
-    # model 폴더를 sys.path에 올렸으므로 leaf_ensemble가 일반 모듈처럼 import 가능
-    try:
-        from leaf_ensemble import get_model, LeafEnsemble  # 권장
-    except ImportError:
-        # 혹시 model이 패키지로 구성된 경우( __init__.py 존재 ) 대비
-        from model.leaf_ensemble import get_model, LeafEnsemble
-    MODEL_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: leaf_ensemble 모델을 불러올 수 없습니다: {e}")
-    MODEL_AVAILABLE = False
-    LeafEnsemble = object  # type: ignore
+from .metrics import Timings
 
+# ✅ torch/torchvision 을 끌어오는 leaf_ensemble 은 import 시점이 아니라 load() 에서 지연 import
+_model_api: Optional[Dict] = None
+MODEL_AVAILABLE = True  # 첫 load() 에서 import 실패 시 False
 
-# 튜닝 상수 정의 추가  -----------------------------------------------------------------------------0902
 
-GATE_MIN  = float(os.getenv("GATE_MIN",  "0.70"))  # 기본 0.75 → 0.70로 완화
-DELTA_MAX = float(os.getenv("DELTA_MAX", "0.45"))  # 기본 0.30 → 0.45로 완화
-AGREE_MIN = float(os.getenv("AGREE_MIN", "0.60"))  # 합의 예외 허들
+def _import_model_api() -> Dict:
+    global _model_api, MODEL_AVAILABLE
+    if _model_api is None:
+        try:
+            # model 폴더를 sys.path에 올렸으므로 leaf_ensemble가 일반 모듈처럼 import 가능
+            try:
+                import leaf_ensemble as le  # 권장
+                import batching as bt
+            except ImportError:
+                # 혹시 model이 패키지로 구성된 경우( __init__.py 존재 ) 대비
+                from Model import leaf_ensemble as le, batching as bt
+            _model_api = {
+                "LeafEnsemble": le.LeafEnsemble,
+                "model_version": le.model_version,
+                "MicroBatcher": bt.MicroBatcher,
+                "BATCH_MAX_SIZE": bt.BATCH_MAX_SIZE,
+            }
+        except ImportError as e:
+            print(f"Warning: leaf_ensemble 모델을 불러올 수 없습니다: {e}")
+            MODEL_AVAILABLE = False
+            _model_api = {}
+    return _model_api
+
+
+# 튜닝 상수(GATE_MIN / DELTA_MAX / AGREE_MIN)는 services/decision.py
 
 
 class Classifier:
     def __init__(self):
         self.loaded: bool = False
-        self.model: Optional[LeafEnsemble] = None
         self.model_available: bool = MODEL_AVAILABLE
         self._class_guard: Optional[ClassGuard] = None
-
-    # ✅ 가드 주입(멱등). 항상 self.model에 붙임
-    def _bind_guard_to_model(self) -> ClassGuard:
-        guard = self._class_guard
-        if guard is None:
-            guard = ClassGuard(GuardConfig.from_env())
-            self._class_guard = guard
-
-        if self.model is not None and (
-            not hasattr(self.model, "_class_guard")
-            or getattr(self.model, "_class_guard", None) is None
-        ):
-            setattr(self.model, "_class_guard", guard)
-            logger.debug("Injected _class_guard into LeafEnsemble")
-        return guard
+        self._load_lock = threading.Lock()
+        # ✅ 모델은 버전 고정 스냅샷(LeafEnsemble + MicroBatcher)으로 보관 → 재시작 없이 교체
+        self.registry = ModelRegistry(
+            self._build_snapshot,
+            fingerprint=self._disk_version,
+            drain_timeout=settings.MODEL_DRAIN_TIMEOUT_SEC,
+            on_swap=self._on_swap,
+        )
+
+    @property
+    def model(self):
+        """현재 활성 LeafEnsemble (없으면 None)"""
+        snap = self.registry.active()
+        return snap.model if snap is not None else None
+
+    @property
+    def batcher(self):
+        snap = self.registry.active()
+        return snap.batcher if snap is not None else None
+
+    # ✅ 가드는 스냅샷 간 공유 (임계값은 환경변수 기준)
+    def _guard(self) -> ClassGuard:
+        if self._class_guard is None:
+            self._class_guard = ClassGuard(GuardConfig.from_env())
+        return self._class_guard
+
+    def _build_snapshot(self) -> ModelSnapshot:
+        """새 LeafEnsemble(가중치/보정/cascade 설정을 파일에서 다시 읽음) + 가드 주입 + 워밍업 + MicroBatcher"""
+        api = _import_model_api()
+        if not api:
+            raise RuntimeError("leaf_ensemble 모듈을 불러올 수 없습니다")
+        t0 = time.perf_counter()
+        model = api["LeafEnsemble"]()
+        model._class_guard = self._guard()
+        warmup_ms = model.warmup(settings.MODEL_WARMUP_IMAGES) if settings.MODEL_WARMUP_IMAGES > 0 else None
+        # ✅ 동시 요청 마이크로 배칭 (INFER_BATCH_MAX > 1 일 때만)
+        batcher = api["MicroBatcher"](model) if api["BATCH_MAX_SIZE"] > 1 else None
+        return ModelSnapshot(model.version, model, batcher, detail={
+            "load_ms": (time.perf_counter() - t0) * 1000.0,
+            "warmup_ms": warmup_ms,
+            "checkpoints_ms": getattr(model, "load_ms", None),
+            "backends": getattr(model, "backends", None),
+        })
+
+    @staticmethod
+    def _disk_version(snap: ModelSnapshot) -> Optional[str]:
+        """디스크 상 파일/설정 지문 (스냅샷 버전과 다르면 파일이 바뀐 것)"""
+        api = _import_model_api()
+        if not api or snap.model is None:
+            return None
+        return api["model_version"](getattr(snap.model, "cascade", None), getattr(snap.model, "backends", None))
+
+    def _on_swap(self, snap: ModelSnapshot) -> None:
+        self.model_available = True
+        if snap.batcher is not None:
+            print(f"MicroBatcher 활성화: max_batch={snap.batcher.max_batch}, max_wait_ms={snap.batcher.max_wait * 1000.0:.1f}")
 
     def load(self):
-        """실제 모델 로드 구현"""
-        if not self.model_available:
-            print("Warning: 모델을 사용할 수 없습니다. 데모 모드로 실행됩니다.")
-            self.loaded = True
-            return
+        """실제 모델 로드 구현 (멱등, 백그라운드 로드와 요청 스레드가 겹쳐도 1회만 로드)"""
+        with self._load_lock:
+            if self.loaded:
+                return
+            api = _import_model_api()
+            if not api:
+                self.model_available = False
+            if not self.model_available:
+                print("Warning: 모델을 사용할 수 없습니다. 데모 모드로 실행됩니다.")
+                self.loaded = True
+                return
+
+            try:
+                snap = self.registry.reload()
+                print(f"LeafEnsemble 모델 로드 완료 ({snap.version})")
+                self.registry.start_watch(settings.MODEL_WATCH_SEC)
+            except Exception as e:
+                print(f"Error: 모델 로드 실패: {e}")
+                self.model_available = False
+            self.loaded = True  # 실패 시 데모 모드로 실행
+
+    def reload(self, wait: bool = False) -> Dict:
+        """
+        가중치/보정/cascade 설정을 다시 읽은 스냅샷으로 교체 (진행 중 요청은 이전 스냅샷으로 마침).
+        wait=False 면 백그라운드로 시작만 하고 바로 반환. 이미 로드 중이면 ReloadInProgress
+        """
+        if not _import_model_api():
+            raise RuntimeError("leaf_ensemble 모듈을 불러올 수 없습니다")
+        if not self.loaded:  # 첫 로드가 곧 최신 파일 기준 로드
+            self.load()
+            return self.registry.stats()
+        if wait:
+            self.registry.reload(blocking=False)
+        elif not self.registry.start_reload():
+            raise ReloadInProgress("model reload already in progress")
+        return self.registry.stats()
 
-        try:
-            self.model = get_model()
-            self.loaded = True
-            print("LeafEnsemble 모델 로드 완료")
-            # ✅ 로드 직후 가드 주입
-            self._bind_guard_to_model()
-        except Exception as e:
-            print(f"Error: 모델 로드 실패: {e}")
-            self.model_available = False
-            self.loaded = True  # 데모 모드로 실행
-
-    # ✅ 로드 보장 + 가드 재주입 보장
     def _ensure_loaded(self):
         if not self.loaded:
             self.load()
-        else:
-            if self.model is not None:
-                self._bind_guard_to_model()
 
-    def classify(self, image_path: str) -> Tuple[str, float]:
-        """이미지 경로를 받아 (클래스명, 신뢰도) 반환"""
+    def _full_version(self, base: str) -> str:
+        return f"{base}|{decision_version()}"
+
+    def model_version(self) -> str:
+        """결과 캐시 키용 버전: 활성 스냅샷의 가중치/보정/규칙 지문 + 백엔드 컷오프 상수"""
+        self._ensure_loaded()
+        snap = self.registry.active()
+        base = snap.version if (self.model_available and snap is not None) else ("demo" if DEMO_MODE else "stub")
+        return self._full_version(base)
+
+    def result_version(self, detailed: Optional[Dict], fallback: str) -> str:
+        """
+        결과를 만든 스냅샷 기준 캐시 키 버전 (meta.model_version).
+        조회 후 추론 사이에 교체되면 이전 스냅샷 결과가 새 버전 키로 저장되지 않도록
+        """
+        v = ((detailed or {}).get("meta") or {}).get("model_version")
+        return self._full_version(v) if v else fallback
+
+    def batch_stats(self) -> Optional[Dict]:
+        """마이크로 배칭 지표(큐 깊이/배치 크기/대기 시간). 비활성 시 None"""
+        batcher = self.batcher
+        return batcher.stats() if batcher is not None else None
+
+    # ✅ Gate / AgreeOverride / Top1Override 공통 결정 함수 (services/decision.py, bulk_score 재채점과 공유)
+    _apply_decision = staticmethod(apply_decision)
+
+    def analyze(self, image_path: str, image=None, timings: Optional[Timings] = None) -> Dict:
+        """
+        이미지 1회 디코드 + predict_one 1회 실행으로 최종 결과와 상세 결과를 함께 반환.
+        image: 이미 디코드된 RGB 배열(image_digest/decode_image) 또는 PIL 이미지가 있으면 파일을 다시 읽지 않음
+        timings: 요청 단위 Timings (decode / batch_wait / 모델 단계 / classify 를 기록, meta.timings 에 반영)
+        반환: {"label": str, "confidence": float, "detailed": dict}
+        """
+        self._ensure_loaded()
+        tm = timings if timings is not None else Timings()
+
+        # ✅ 요청 1건은 시작 시점의 스냅샷으로 끝까지 (도중에 교체돼도 이전 스냅샷은 drain 후 종료)
+        with self.registry.acquire() as snap:
+            if self.model_available and snap is not None and snap.model is not None:
+                try:
+                    if image is None:
+                        from ..image_utils import decode_image
+                        with tm.span("decode"):
+                            image = decode_image(image_path)
+
+                    with tm.span("classify"):
+                        if snap.batcher is not None:
+                            prediction = snap.batcher.predict(image, timings=tm)
+                        else:
+                            prediction = snap.model.predict_one(image, timings=tm)
+                        label, confidence = self._apply_decision(prediction)
+                    prediction["image_path"] = image_path
+                    meta = prediction.setdefault("meta", {})
+                    meta["timings"] = tm.as_dict()
+                    meta["model_version"] = snap.version
+                    return {"label": label, "confidence": confidence, "detailed": prediction}
+
+                except Exception as e:
+                    print(f"Error: 모델 예측 실패: {e}")
+                    # 실패 시 데모 모드로 폴백
+                    return self._fallback(image_path, e)
+
+        return self._fallback(image_path)
+
+    def analyze_many(self, image_paths: List[str], images: List) -> List[Dict]:
+        """
+        여러 장을 한 번에 분석: MN/RN 기본 추론은 실제 텐서 배치 1회, 규칙/컷오프는 이미지별 적용.
+        반환 항목 형식은 analyze() 와 동일
+        """
         self._ensure_loaded()
 
-        if self.model_available and self.model:
-            try:
-                from PIL import Image
-                image = Image.open(image_path).convert("RGB")
-
-                # ✅ 추론 직전에도 한 번 더 보장(다중경로/리로드 대비)
-                self._bind_guard_to_model()
-
-                prediction = self.model.predict_one(image)
-
-                # 컷오프 분기 수정 ------------------------------------------------------------------0902
-                mobilenet_conf = prediction["mobilenet"]["confidence"]
-                resnet50_conf  = prediction["resnet50"]["confidence"]
-                mobilenet_lbl  = prediction["mobilenet"]["label"]
-                resnet50_lbl   = prediction["resnet50"]["label"]
-                agree_same_lbl = (mobilenet_lbl == resnet50_lbl)
-
-                # 완화된 컷오프
-                reject_by_gate  = (mobilenet_conf <= GATE_MIN and resnet50_conf <= GATE_MIN)
-                reject_by_delta = (abs(mobilenet_conf - resnet50_conf) >= DELTA_MAX)
-
-                if reject_by_gate or reject_by_delta:
-                    # ✅ 합의 예외: 두 모델이 같은 클래스에 합의했고, 둘 중 하나가 AGREE_MIN 이상이면 채택
-                    if agree_same_lbl and max(mobilenet_conf, resnet50_conf) >= AGREE_MIN:
-                        agreed_label = mobilenet_lbl  # 두 라벨이 동일하므로 어느 쪽이든 동일
-                        agreed_conf  = max(mobilenet_conf, resnet50_conf)
-                        return agreed_label, agreed_conf
-
-                    # 최상위 확신치 예외는 기존 로직 유지
-                    if mobilenet_conf >= 0.98:
-                        return prediction["mobilenet"]["label"], mobilenet_conf
-                    elif resnet50_conf >= 0.98:
-                        return prediction["resnet50"]["label"], resnet50_conf
-                    else:
-                        return "Unknown", 0.0
-
-                # 컷오프에 안 걸리면 기존대로 ensemble picked 사용
-                picked = prediction["picked"]
-                return picked["label"], picked["confidence"]
+        with self.registry.acquire() as snap:
+            if self.model_available and snap is not None and snap.model is not None and images:
+                try:
+                    predictions = snap.model.predict_many(images)
+                    out = []
+                    for path, prediction in zip(image_paths, predictions):
+                        label, confidence = self._apply_decision(prediction)
+                        prediction["image_path"] = path
+                        prediction.setdefault("meta", {})["model_version"] = snap.version
+                        out.append({"label": label, "confidence": confidence, "detailed": prediction})
+                    return out
+                except Exception as e:
+                    print(f"Error: 배치 예측 실패: {e}")
+                    # 실패 시 데모 모드로 폴백
+                    return [self._fallback(path, e) for path in image_paths]
+
+        return [self._fallback(path) for path in image_paths]
 
-            except Exception as e:
-                print(f"Error: 모델 예측 실패: {e}")
-                # 실패 시 데모 모드로 폴백
+    def classify(self, image_path: str) -> Tuple[str, float]:
+        """이미지 경로를 받아 (클래스명, 신뢰도) 반환"""
+        result = self.analyze(image_path)
+        return result["label"], result["confidence"]
 
-        # ------- 데모 모드 -------
+    def classify_with_details(self, image_path: str) -> Dict:
+        """이미지 경로를 받아 상세한 분류 결과 반환"""
+        return self.analyze(image_path)["detailed"]
+
+    # ------- 데모 모드 -------
+    def _fallback(self, image_path: str, error: Optional[Exception] = None) -> Dict:
+        """
+        모델 미사용/예측 실패 시 결과 (analyze 와 같은 형식).
+        meta.fallback=True → 모델이 판정한 결과가 아니므로 결과 캐시·Unknown 집계에서 제외
+        """
+        label, confidence = self._demo_label(image_path)
+        detailed = self._demo_details(image_path)
+        meta = detailed.setdefault("meta", {})
+        meta["fallback"] = True
+        if error is not None:
+            meta["error"] = f"{type(error).__name__}: {error}"
+        return {"label": label, "confidence": confidence, "detailed": detailed}
+
+    @staticmethod
+    def is_fallback(detailed: Optional[Dict]) -> bool:
+        return bool(((detailed or {}).get("meta") or {}).get("fallback"))
+
+    @staticmethod
+    def _demo_label(image_path: str) -> Tuple[str, float]:
         if DEMO_MODE:
             name = Path(image_path).name.lower()
             if "scab" in name:
@@ -152,73 +297,8 @@ class Classifier:
             return "Apple___Apple_scab", 0.75
         return "Unknown", 0.0
 
-    def classify_with_details(self, image_path: str) -> Dict:
-        """이미지 경로를 받아 상세한 분류 결과 반환"""
-        self._ensure_loaded()
-
-        if self.model_available and self.model:
-            try:
-                from PIL import Image
-                image = Image.open(image_path).convert("RGB")
-
-                # ✅ 추론 직전에도 한 번 더 보장
-                self._bind_guard_to_model()
-#----------0902
-                prediction = self.model.predict_one(image)
-
-                mobilenet_conf = prediction["mobilenet"]["confidence"]
-                resnet50_conf  = prediction["resnet50"]["confidence"]
-                mobilenet_lbl  = prediction["mobilenet"]["label"]
-                resnet50_lbl   = prediction["resnet50"]["label"]
-                agree_same_lbl = (mobilenet_lbl == resnet50_lbl)
-
-                reject_by_gate  = (mobilenet_conf <= GATE_MIN and resnet50_conf <= GATE_MIN)   # ✅ 환경변수화
-                reject_by_delta = (abs(mobilenet_conf - resnet50_conf) >= DELTA_MAX)           # ✅ 환경변수화
-
-                if reject_by_gate or reject_by_delta:
-                    # ✅ 합의 예외: 두 모델이 같은 클래스로 합의 & 허들 통과 시 Unknown으로 덮어쓰지 않음
-                    if agree_same_lbl and max(mobilenet_conf, resnet50_conf) >= AGREE_MIN:
-                        prediction["picked"] = {
-                            "model": "AgreeOverride",
-                            "label": mobilenet_lbl,  # 두 모델 라벨 동일
-                            "confidence": max(mobilenet_conf, resnet50_conf),
-                            "reason": "AgreeOverride"
-                        }
-                        # (선택) meta.reason 갱신하여 디버깅 용이
-                        meta = prediction.setdefault("meta", {})
-                        meta["reason"] = f"AgreeOverride gate_min={GATE_MIN} delta_max={DELTA_MAX}"
-                    else:
-                        # 기존 Top1 override 유지
-                        if mobilenet_conf >= 0.98:
-                            prediction["picked"] = {
-                                "model": "MobileNetV2",
-                                "label": prediction["mobilenet"]["label"],
-                                "confidence": mobilenet_conf,
-                                "reason": "Top1Override"
-                            }
-                        elif resnet50_conf >= 0.98:
-                            prediction["picked"] = {
-                                "model": "ResNet50",
-                                "label": prediction["resnet50"]["label"],
-                                "confidence": resnet50_conf,
-                                "reason": "Top1Override"
-                            }
-                        else:
-                            prediction["picked"] = {
-                                "model": "Unknown",
-                                "label": "Unknown",
-                                "confidence": 0.0,
-                                "reason": f"Gate(delta>{DELTA_MAX} or both<{GATE_MIN})"
-                            }
-
-                prediction["image_path"] = image_path
-                return prediction
-
-            except Exception as e:
-                print(f"Error: 모델 예측 실패: {e}")
-                # 실패 시 데모 모드로 폴백
-
-        # ------- 데모 모드 -------
+    @staticmethod
+    def _demo_details(image_path: str) -> Dict:
         name = Path(image_path).name.lower()
         if "scab" in name:
             return {
@@ -0,0 +1,78 @@
+# Backend/services/decision.py
+"""
+predict_one 결과에 적용하는 서빙 컷오프 (Gate / AgreeOverride / Top1Override).
+torch 없이 import 가능 — /api/predict(classifier) 와 Model/bulk_score 재채점이 같은 결정을 쓰도록 공유
+"""
+from __future__ import annotations
+import os
+from dataclasses import asdict
+from typing import Dict, Tuple
+
+from .guard import GuardConfig
+
+# 튜닝 상수 정의 추가  -----------------------------------------------------------------------------0902
+
+GATE_MIN  = float(os.getenv("GATE_MIN",  "0.70"))  # 기본 0.75 → 0.70로 완화
+DELTA_MAX = float(os.getenv("DELTA_MAX", "0.45"))  # 기본 0.30 → 0.45로 완화
+AGREE_MIN = float(os.getenv("AGREE_MIN", "0.60"))  # 합의 예외 허들
+
+
+def decision_version() -> str:
+    """결과에 영향을 주는 서빙 설정 지문 (컷오프 상수 + 클래스 가드 설정) — 캐시 키/재채점 버전에 덧붙임"""
+    guard = ",".join(f"{k}={v}" for k, v in sorted(asdict(GuardConfig.from_env()).items()))
+    return f"gate={GATE_MIN}|delta={DELTA_MAX}|agree={AGREE_MIN}|guard={guard}"
+
+
+# ✅ Gate / AgreeOverride / Top1Override 공통 결정 함수 (prediction["picked"]를 갱신)
+def apply_decision(prediction: Dict) -> Tuple[str, float]:
+    """predict_one 결과에 컷오프 규칙을 1회 적용하고 (라벨, 신뢰도) 반환"""
+    mobilenet_conf = prediction["mobilenet"]["confidence"]
+    resnet50_conf  = prediction["resnet50"]["confidence"]
+    mobilenet_lbl  = prediction["mobilenet"]["label"]
+    resnet50_lbl   = prediction["resnet50"]["label"]
+    if resnet50_conf is None:
+        # 캐스케이드 MN 단독 경로(RN 미실행): MN 기준으로만 컷오프
+        resnet50_conf, resnet50_lbl = mobilenet_conf, mobilenet_lbl
+    agree_same_lbl = (mobilenet_lbl == resnet50_lbl)
+
+    reject_by_gate  = (mobilenet_conf <= GATE_MIN and resnet50_conf <= GATE_MIN)   # ✅ 환경변수화
+    reject_by_delta = (abs(mobilenet_conf - resnet50_conf) >= DELTA_MAX)           # ✅ 환경변수화
+
+    if reject_by_gate or reject_by_delta:
+        # ✅ 합의 예외: 두 모델이 같은 클래스로 합의 & 허들 통과 시 Unknown으로 덮어쓰지 않음
+        if agree_same_lbl and max(mobilenet_conf, resnet50_conf) >= AGREE_MIN:
+            prediction["picked"] = {
+                "model": "AgreeOverride",
+                "label": mobilenet_lbl,  # 두 모델 라벨 동일
+                "confidence": max(mobilenet_conf, resnet50_conf),
+                "reason": "AgreeOverride"
+            }
+            # (선택) meta.reason 갱신하여 디버깅 용이
+            meta = prediction.setdefault("meta", {})
+            meta["reason"] = f"AgreeOverride gate_min={GATE_MIN} delta_max={DELTA_MAX}"
+        # 최상위 확신치 예외(Top1 override)는 기존 로직 유지
+        elif mobilenet_conf >= 0.98:
+            prediction["picked"] = {
+                "model": "MobileNetV2",
+                "label": mobilenet_lbl,
+                "confidence": mobilenet_conf,
+                "reason": "Top1Override"
+            }
+        elif resnet50_conf >= 0.98:
+            prediction["picked"] = {
+                "model": "ResNet50",
+                "label": resnet50_lbl,
+                "confidence": resnet50_conf,
+                "reason": "Top1Override"
+            }
+        else:
+            prediction["picked"] = {
+                "model": "Unknown",
+                "label": "Unknown",
+                "confidence": 0.0,
+                "reason": f"Gate(delta>{DELTA_MAX} or both<{GATE_MIN})"
+            }
+
+    # 컷오프에 안 걸리면 기존대로 ensemble picked 사용
+    picked = prediction["picked"]
+    return picked["label"], picked["confidence"]
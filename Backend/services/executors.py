@@ -0,0 +1,118 @@
+# Backend/services/executors.py
+from __future__ import annotations
+import os
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Union
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(Exception):
+    """실행기 대기열이 가득 참 → 503 + Retry-After 로 응답"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} executor is saturated")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    워커 수 + 대기열 상한이 있는 스레드풀.
+    상한 초과 시 즉시 ExecutorBusy (이벤트 루프를 막지 않고 백프레셔 적용)
+    """
+
+    def __init__(self, name: str, workers: Union[int, Callable[[], int]], queue_max: int, retry_after: int):
+        self.name = name
+        self._workers_spec = workers
+        self._queue_max = max(0, int(queue_max))
+        self.retry_after = retry_after
+        self.workers = 0
+        self.capacity = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._rejected = 0
+
+    def _ensure_pool(self) -> None:
+        """워커 수가 callable 이면 첫 사용 시 결정 (예: torch 는 모델 로드 후에만 import)"""
+        if self._pool is not None:
+            return
+        with self._lock:
+            if self._pool is not None:
+                return
+            spec = self._workers_spec
+            self.workers = max(1, int(spec() if callable(spec) else spec))
+            self.capacity = self.workers + self._queue_max
+            self._slots = threading.BoundedSemaphore(self.capacity)
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-exec")
+
+    def _release(self, _fut) -> None:
+        with self._lock:
+            self._inflight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._ensure_pool()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorBusy(self.name, self.retry_after)
+        with self._lock:
+            self._inflight += 1
+        try:
+            cf = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self._release(None)
+            raise
+        # 요청이 취소돼도 슬롯은 실제 작업이 끝날 때 반납
+        cf.add_done_callback(self._release)
+        return await asyncio.wrap_future(cf)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "inflight": self._inflight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+def _default_infer_workers() -> int:
+    """torch intra-op 스레드가 코어를 나눠 쓰도록 (코어 수 // intra-op 스레드) 개의 추론 워커"""
+    try:
+        import torch
+        intra = max(1, torch.get_num_threads())
+    except Exception:
+        intra = 1
+    workers = max(1, (os.cpu_count() or 1) // intra)
+    # MicroBatcher 사용 시 한 배치를 채울 만큼의 호출자 스레드가 필요
+    return max(workers, int(os.getenv("INFER_BATCH_MAX", "1")))
+
+
+_retry = settings.BUSY_RETRY_AFTER_SEC
+infer_executor = BoundedExecutor(
+    "infer", settings.INFER_WORKERS or _default_infer_workers, settings.INFER_QUEUE_MAX, _retry
+)
+rag_executor = BoundedExecutor("rag", settings.RAG_WORKERS, settings.RAG_QUEUE_MAX, _retry)
+
+
+def executor_stats() -> Dict[str, Dict[str, int]]:
+    return {ex.name: ex.stats() for ex in (infer_executor, rag_executor)}
+
+
+def shutdown_executors() -> None:
+    for ex in (infer_executor, rag_executor):
+        ex.shutdown(wait=False)
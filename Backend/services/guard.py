@@ -59,6 +59,9 @@ class GuardDecision:
         return t if n >= 3 else t[:2]
 
 class ClassGuard:
+    # 판정이 cfg 임계값(gate_min/delta_max/pick_override)만으로 정해짐 → Model/rule_engine 이 배열로 후보만 골라 호출
+    vectorizable = True
+
     def __init__(self, cfg: GuardConfig):
         self.cfg = cfg
 
@@ -0,0 +1,136 @@
+# Backend/services/metrics.py
+"""
+Prometheus 텍스트 노출 형식(0.0.4) 지표 — 외부 의존성 없음, 프로세스(워커)별 집계.
+- agroeye_predict_stage_seconds{stage, reason} : 단계별 소요 시간 (meta.timings), 결정 사유별
+- agroeye_predict_request_seconds{reason, path}: /predict 요청 전체 처리 시간
+reason 은 CONSENSUS / RNHIGH / GuardOverride / HighEntropy / Global:WaterVeto 처럼 수치를 뗀 이름으로 정규화
+"""
+from __future__ import annotations
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from Model.timings import Timings  # noqa: F401  (Backend 에서는 여기서 가져다 씀)
+except ImportError:
+    from timings import Timings  # noqa: F401
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_REASONS = 64  # 라벨 카디널리티 상한 (초과분은 "other")
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    return repr(float(v)) if v != float("inf") else "+Inf"
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str], buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}  # labels → [bucket counts, sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if i < len(self.buckets):
+                s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in sorted(self._series.items())]
+        for key, counts, total, n in items:
+            lbl = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, key))
+            sep = "," if lbl else ""
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                out.append(f'{self.name}_bucket{{{lbl}{sep}le="{_fmt(le)}"}} {acc}')
+            out.append(f'{self.name}_bucket{{{lbl}{sep}le="+Inf"}} {n}')
+            out.append(f"{self.name}_sum{{{lbl}}} {_fmt(total)}")
+            out.append(f"{self.name}_count{{{lbl}}} {n}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Histogram] = []
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str], buckets: Sequence[float] = STAGE_BUCKETS) -> Histogram:
+        h = Histogram(name, doc, labelnames, buckets)
+        self._metrics.append(h)
+        return h
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+STAGE_SECONDS = registry.histogram(
+    "agroeye_predict_stage_seconds", "Per-stage latency of a prediction (meta.timings), by decision reason", ("stage", "reason"))
+REQUEST_SECONDS = registry.histogram(
+    "agroeye_predict_request_seconds", "End-to-end /predict handler latency, by decision reason and path", ("reason", "path"))
+
+
+# ===================== reason 정규화 =====================
+_GUARD_REASONS = (("both<=gate_min", "Guard:GateMin"), ("delta>=delta_max", "Guard:DeltaMax"))
+_REASON_RE = re.compile(r"([A-Za-z][A-Za-z0-9_]*)(?:\[([A-Za-z0-9_]+))?")
+_seen_reasons: set = set()
+_seen_lock = threading.Lock()
+
+
+def normalize_reason(reason: Optional[str]) -> str:
+    """'Global[WaterVeto wf=0.42]' → 'Global:WaterVeto', 'HighEntropy(1.31>1.20)' → 'HighEntropy', None → 'Ensemble'"""
+    if not reason:
+        return "Ensemble"
+    guard = [name for prefix, name in _GUARD_REASONS if prefix in reason]
+    if guard:
+        return "+".join(guard)
+    m = _REASON_RE.match(reason.strip())
+    if not m:
+        return "other"
+    return f"{m.group(1)}:{m.group(2)}" if m.group(2) else m.group(1)
+
+
+def decision_reason(detailed: Optional[Dict[str, Any]]) -> str:
+    """최종 결정 사유: 분류기 컷오프(picked.reason)가 있으면 그것, 없으면 predict_one 의 meta.reason"""
+    detailed = detailed or {}
+    raw = (detailed.get("picked") or {}).get("reason") or (detailed.get("meta") or {}).get("reason")
+    name = normalize_reason(raw)
+    with _seen_lock:
+        if name not in _seen_reasons:
+            if len(_seen_reasons) >= MAX_REASONS:
+                return "other"
+            _seen_reasons.add(name)
+    return name
+
+
+def observe_prediction(timings: Dict[str, float], detailed: Optional[Dict[str, Any]],
+                       path: Optional[str] = None, total_ms: Optional[float] = None) -> None:
+    """meta.timings(ms) 를 단계별 히스토그램에, total_ms 가 있으면 요청 히스토그램에 기록"""
+    reason = decision_reason(detailed)
+    for stage, ms in (timings or {}).items():
+        if stage != "total":
+            STAGE_SECONDS.observe(ms / 1000.0, stage=stage, reason=reason)
+    if total_ms is not None:
+        path = path or ((detailed or {}).get("meta") or {}).get("path") or "full"
+        REQUEST_SECONDS.observe(total_ms / 1000.0, reason=reason, path=path)
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,216 @@
+# Backend/services/model_registry.py
+from __future__ import annotations
+import gc
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadInProgress(Exception):
+    """이미 다른 스냅샷을 로드 중"""
+
+
+class ModelSnapshot:
+    """
+    로드·워밍업이 끝난 모델 1벌 (버전 고정).
+    요청은 acquire 한 스냅샷으로 끝까지 처리하고, 교체된 스냅샷은 진행 중 요청이 0이 되면 close
+    """
+
+    def __init__(self, version: str, model: Any = None, batcher: Any = None,
+                 detail: Optional[Dict[str, Any]] = None):
+        self.version = version
+        self.model = model
+        self.batcher = batcher
+        self.detail = detail or {}
+        self.loaded_at = time.time()
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    def _enter(self) -> None:
+        with self._cond:
+            self._inflight += 1
+
+    def _exit(self) -> None:
+        with self._cond:
+            self._inflight -= 1
+            if self._inflight <= 0:
+                self._cond.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """진행 중 요청이 모두 끝날 때까지 대기 (timeout 초과 시 False)"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            while self._inflight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """MicroBatcher 종료 + 모델 참조 해제"""
+        if self.batcher is not None:
+            try:
+                self.batcher.close()
+            except Exception as e:
+                logger.warning(f"스냅샷 {self.version} 배처 종료 실패: {e}")
+        self.model = self.batcher = None
+
+    def info(self) -> Dict[str, Any]:
+        return {"version": self.version, "loaded_at": self.loaded_at, "inflight": self._inflight, **self.detail}
+
+
+class ModelRegistry:
+    """
+    활성 스냅샷 포인터 (서빙 중 모델 교체).
+    - reload(): loader 로 새 스냅샷 로드·워밍업 → 포인터 교체 → 이전 스냅샷은 백그라운드에서 drain 후 close
+      (로드 실패 시 기존 스냅샷 유지, 동시에 1개만 로드)
+    - acquire(): 요청 1건이 쓸 스냅샷 (교체와 같은 잠금 아래에서 진행 중 수 증가 → drain 이 놓치지 않음)
+    - start_watch(): interval 초마다 fingerprint(활성 스냅샷) 가 버전과 다르면 reload (파일 교체 감지)
+    """
+
+    def __init__(self, loader: Callable[[], ModelSnapshot],
+                 fingerprint: Optional[Callable[[ModelSnapshot], Optional[str]]] = None,
+                 drain_timeout: float = 60.0,
+                 on_swap: Optional[Callable[[ModelSnapshot], None]] = None):
+        self.loader = loader
+        self.fingerprint = fingerprint
+        self.drain_timeout = float(drain_timeout)
+        self.on_swap = on_swap
+        self._active: Optional[ModelSnapshot] = None
+        self._lock = threading.Lock()          # 포인터 교체 / acquire
+        self._reload_lock = threading.Lock()   # 로드는 한 번에 1개
+        self._retiring: List[ModelSnapshot] = []
+        self._watch: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+        self._failed_fp: Optional[str] = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_reload_ms: Optional[float] = None
+
+    def active(self) -> Optional[ModelSnapshot]:
+        return self._active
+
+    @contextmanager
+    def acquire(self) -> Iterator[Optional[ModelSnapshot]]:
+        with self._lock:
+            snap = self._active
+            if snap is not None:
+                snap._enter()
+        try:
+            yield snap
+        finally:
+            if snap is not None:
+                snap._exit()
+
+    @property
+    def loading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def reload(self, blocking: bool = True) -> ModelSnapshot:
+        """새 스냅샷으로 교체하고 반환 (blocking=False 면 이미 로드 중일 때 ReloadInProgress)"""
+        if not self._reload_lock.acquire(blocking=blocking):
+            raise ReloadInProgress("model reload already in progress")
+        try:
+            t0 = time.perf_counter()
+            try:
+                snap = self.loader()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            with self._lock:
+                old, self._active = self._active, snap
+            self.reloads += 1
+            self.last_error = None
+            self._failed_fp = None
+            self.last_reload_ms = (time.perf_counter() - t0) * 1000.0
+            logger.info(f"모델 스냅샷 교체: {old.version if old else None} → {snap.version} ({self.last_reload_ms:.0f} ms)")
+            try:
+                if self.on_swap is not None:
+                    self.on_swap(snap)
+            finally:
+                # 포인터는 이미 교체됨 → on_swap 이 실패해도 이전 스냅샷은 반드시 drain 후 정리
+                if old is not None and old is not snap:
+                    self._retiring.append(old)
+                    threading.Thread(target=self._retire, args=(old,), name="model-drain", daemon=True).start()
+        finally:
+            self._reload_lock.release()
+        return snap
+
+    def start_reload(self) -> bool:
+        """백그라운드 스레드에서 reload (이미 로드 중이면 False)"""
+        if self.loading:
+            return False
+
+        def _run():
+            try:
+                self.reload(blocking=False)
+            except ReloadInProgress:
+                pass
+            except Exception as e:
+                logger.error(f"모델 리로드 실패 (기존 스냅샷 유지): {e}")
+
+        threading.Thread(target=_run, name="model-reload", daemon=True).start()
+        return True
+
+    def _retire(self, old: ModelSnapshot) -> None:
+        if not old.drain(self.drain_timeout):
+            logger.warning(f"스냅샷 {old.version}: {self.drain_timeout:.0f}s 안에 요청이 끝나지 않음 → 강제 종료")
+        old.close()
+        try:
+            self._retiring.remove(old)
+        except ValueError:
+            pass
+        gc.collect()
+
+    # ---------- 파일 변경 감지 ----------
+    def start_watch(self, interval: float) -> None:
+        if interval <= 0 or self.fingerprint is None or (self._watch is not None and self._watch.is_alive()):
+            return
+        self._watch_stop.clear()
+        self._watch = threading.Thread(target=self._watch_loop, args=(float(interval),), name="model-watch", daemon=True)
+        self._watch.start()
+
+    def stop_watch(self) -> None:
+        self._watch_stop.set()
+
+    def _watch_loop(self, interval: float) -> None:
+        while not self._watch_stop.wait(interval):
+            snap = self._active
+            if snap is None or self.loading:
+                continue
+            try:
+                fp = self.fingerprint(snap)
+            except Exception as e:
+                logger.warning(f"모델 지문 확인 실패: {e}")
+                continue
+            # 같은 지문으로 실패한 로드는 파일이 다시 바뀔 때까지 재시도하지 않음
+            if not fp or fp == snap.version or fp == self._failed_fp:
+                continue
+            logger.info(f"모델 파일 변경 감지: {snap.version} → {fp}")
+            try:
+                self.reload(blocking=False)
+            except ReloadInProgress:
+                pass
+            except Exception as e:
+                self._failed_fp = fp
+                logger.error(f"모델 자동 리로드 실패 (기존 스냅샷 유지): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        active = self._active
+        return {
+            "active": active.info() if active else None,
+            "loading": self.loading,
+            "draining": [s.info() for s in list(self._retiring)],
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload_ms": self.last_reload_ms,
+            "watching": bool(self._watch is not None and self._watch.is_alive()),
+        }
@@ -0,0 +1,196 @@
+# Backend/services/prediction_cache.py
+from __future__ import annotations
+import json
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def image_digest(src: Union[bytes, BinaryIO, str]) -> Tuple[str, Any]:
+    """
+    업로드(바이트/읽기 핸들/경로)를 디코드해 픽셀 기준 sha256 과 uint8 HWC RGB 배열을 함께 반환.
+    (EXIF/재인코딩만 다른 동일 사진도 같은 키) — 디코드 결과는 분류기에 그대로 재사용.
+    해시는 배열 버퍼를 직접 읽음 (tobytes 사본 없음)
+    """
+    from ..image_utils import decode_image
+
+    arr = decode_image(src)
+    h = hashlib.sha256()
+    h.update(f"{arr.shape[1]}x{arr.shape[0]}:".encode("ascii"))
+    h.update(memoryview(arr).cast("B") if arr.flags.c_contiguous else arr.tobytes())
+    return h.hexdigest(), arr
+
+
+class PredictionCache:
+    """
+    (이미지 해시 + 모델/보정/규칙 버전) → PredictResponse payload 캐시.
+    - 메모리: LRU (max_items)
+    - 디스크(선택): disk_dir/<key[:2]>/<key>.json, 메모리 미스 시 조회 후 승격
+      (이벤트 루프에서는 aget/aput — 디스크 I/O 는 스레드풀에서)
+    - result_id → key 색인: 메모리(_ids) + 디스크 disk_dir/_ids/<id> (키 목록) → 행 삭제 시 전체 스캔 없음
+    - 디스크 계층이 있으면 DB 행 id 를 가진 응답은 메모리(프로세스별)에 두지 않음 — 다중 워커에서
+      다른 워커가 행을 삭제해도 이 워커 메모리에 남아 삭제된 id 를 내보내지 않도록 (공유 디스크만이 기준)
+    """
+
+    def __init__(self, max_items: int = 1024, disk_dir: Optional[Path] = None):
+        self.max_items = max(0, int(max_items))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(digest: str, version: str) -> str:
+        return hashlib.sha256(f"{digest}|{version}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return (self.disk_dir / key[:2] / f"{key}.json") if self.disk_dir else None
+
+    def _id_index_path(self, result_id: int) -> Optional[Path]:
+        return (self.disk_dir / "_ids" / str(int(result_id))) if self.disk_dir else None
+
+    def _forget_locked(self, key: str, payload: Dict[str, Any]) -> None:
+        rid = payload.get("id")
+        keys = self._ids.get(rid) if rid is not None else None
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._ids[rid]
+
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        if self.max_items == 0 or (self.disk_dir is not None and payload.get("id") is not None):
+            return
+        old = self._mem.get(key)
+        if old is not None:
+            self._forget_locked(key, old)
+        self._mem[key] = payload
+        self._mem.move_to_end(key)
+        if payload.get("id") is not None:
+            self._ids.setdefault(payload["id"], set()).add(key)
+        while len(self._mem) > self.max_items:
+            k, v = self._mem.popitem(last=False)
+            self._forget_locked(k, v)
+            self.evictions += 1
+
+    def _mem_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._mem.get(key)
+            if payload is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+            return payload
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self._mem_get(key)
+        return payload if payload is not None else self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """get 의 비동기판 — 메모리 적중은 그대로, 디스크 조회만 스레드풀에서"""
+        payload = self._mem_get(key)
+        if payload is not None:
+            return payload
+        if self.disk_dir is None:
+            return self._disk_get(key)
+        return await run_in_threadpool(self._disk_get, key)
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if path is not None and path.is_file():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"prediction cache 디스크 항목 손상 ({path.name}): {e}")
+                payload = None
+            if payload is not None:
+                with self._lock:
+                    self._remember(key, payload)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return payload
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, payload)
+        self._disk_put(key, payload)
+
+    async def aput(self, key: str, payload: Dict[str, Any]) -> None:
+        """put 의 비동기판 — 메모리 반영은 즉시, 디스크 기록만 스레드풀에서"""
+        with self._lock:
+            self._remember(key, payload)
+        if self.disk_dir is not None:
+            await run_in_threadpool(self._disk_put, key, payload)
+
+    def _disk_put(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+            idx = self._id_index_path(payload["id"]) if payload.get("id") is not None else None
+            if idx is not None:
+                idx.parent.mkdir(parents=True, exist_ok=True)
+                with open(idx, "a", encoding="utf-8") as f:  # 한 줄 append (워커 간 경합에도 줄 단위 보존)
+                    f.write(key + "\n")
+        except Exception as e:
+            logger.warning(f"prediction cache 디스크 저장 실패: {e}")
+
+    def discard_result_id(self, result_id: int) -> int:
+        """삭제된 DB 행을 가리키는 항목 제거 (메모리 + 디스크, result_id 색인으로). 제거 개수 반환"""
+        removed: Set[str] = set()
+        with self._lock:
+            for k in self._ids.pop(result_id, set()):
+                if self._mem.pop(k, None) is not None:
+                    removed.add(k)
+        idx = self._id_index_path(result_id)
+        if idx is not None:
+            try:
+                keys = set(idx.read_text(encoding="utf-8").split())
+            except OSError:
+                keys = set()
+            for k in keys:
+                path = self._disk_path(k)
+                if path.is_file():
+                    path.unlink(missing_ok=True)
+                    removed.add(k)
+            idx.unlink(missing_ok=True)
+        return len(removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._mem),
+                "max_items": self.max_items,
+                "disk": str(self.disk_dir) if self.disk_dir else None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+prediction_cache = PredictionCache(settings.PRED_CACHE_SIZE, settings.PRED_CACHE_DIR)
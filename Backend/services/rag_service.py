@@ -2,19 +2,42 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import List, Dict
+import json
+import time
+import hashlib
+import logging
+import threading
+import contextlib
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
+# ✅ faiss/langchain_community/sentence-transformers(torch) 는 무거우므로 실제 로드 시점에 import
+from langchain_core.embeddings import Embeddings
 
 from ..config import settings
+from .synonyms import class_to_query_terms, as_boolean_query
+from .metrics import Timings
+from ..rag.query_vectors import QueryVectorTable, class_queries, build as build_query_vectors
 
 try:
     from openai import OpenAI  # optional
 except Exception:
     OpenAI = None
 
+try:
+    import fcntl
+    _HAS_FCNTL = True
+except ImportError:  # Windows
+    _HAS_FCNTL = False
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트(시스템/유저 템플릿)를 바꾸면 올려서 캐시 무효화
+PROMPT_VERSION = "v1"
+EXPLAIN_CACHE_FILE = "explain_cache.json"
+
 
 @dataclass
 class Retrieved:
@@ -23,23 +46,265 @@ class Retrieved:
     score: float
 
 
+class LazyEmbeddings(Embeddings):
+    """sentence-transformers 모델을 첫 임베딩 호출 때 로드 (캐시된 질의 벡터만 쓰면 로드 안 함)"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._inner = None  # HuggingFaceEmbeddings
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._inner is not None
+
+    def _get(self):
+        if self._inner is None:
+            with self._lock:
+                if self._inner is None:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    logger.info(f"임베딩 모델 로드: {self.model_name}")
+                    self._inner = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._inner
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._get().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._get().embed_query(text)
+
+
+def index_fingerprint(index_dir) -> str:
+    """FAISS 인덱스 파일(크기+mtime) 지문. ingest 로 인덱스가 바뀌면 값이 바뀜"""
+    parts = []
+    for name in ("index.faiss", "index.pkl"):
+        try:
+            st = os.stat(os.path.join(index_dir, name))
+            parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}:-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class ExplanationCache:
+    """
+    (클래스 라벨, 인덱스 지문, 프롬프트 버전, LLM 모델) → (검색 결과, 설명) 캐시.
+    TTL + LRU 상한, 인덱스 디렉터리의 explain_cache.json 에 영속화 (워커/재시작 간 공유).
+    쓰기는 파일 잠금(.lock) 아래에서 디스크 내용을 다시 읽어 병합한 뒤 교체 → 다른 워커의 항목을 덮어쓰지 않음
+    """
+
+    def __init__(self, path: Path, ttl_sec: int, max_items: int):
+        self.path = Path(path)
+        self.ttl = max(0, int(ttl_sec))
+        self.max_items = max(1, int(max_items))
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Dict]" = OrderedDict()
+        self._disk_stamp: Optional[Tuple[int, int]] = None
+        self.hits = 0
+        self.misses = 0
+        with self._lock:
+            self._merge_disk_locked()
+
+    @staticmethod
+    def make_key(label: str, index_fp: str, llm_id: str) -> str:
+        return f"{label}|{index_fp}|{PROMPT_VERSION}|{llm_id}"
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """같은 캐시 파일을 쓰는 워커 간 읽기-병합-쓰기 직렬화 (POSIX advisory lock)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not _HAS_FCNTL:
+            yield; return
+        with open(self.path.with_suffix(".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _merge_disk_locked(self) -> Dict[str, Dict]:
+        """디스크 항목을 메모리에 병합 (같은 키는 created 가 최신인 쪽), 만료 항목 제외. 디스크 원본 반환"""
+        self._disk_stamp = self._stamp()
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8")) if self._disk_stamp else {}
+        except Exception as e:
+            logger.warning(f"explain cache 로드 실패({self.path}): {e}")
+            raw = {}
+        now = time.time()
+        merged = dict(self._items)
+        for k, v in raw.items():
+            if k not in merged or v.get("created", 0) > merged[k].get("created", 0):
+                merged[k] = v
+        self._items = OrderedDict(
+            (k, v) for k, v in sorted(merged.items(), key=lambda kv: kv[1].get("created", 0))
+            if not self.ttl or now - v.get("created", 0) <= self.ttl)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return raw
+
+    def _write_locked(self):
+        try:
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self._items, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._disk_stamp = self._stamp()
+        except Exception as e:
+            logger.warning(f"explain cache 저장 실패({self.path}): {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            v = self._items.get(key)
+            if v is None and self._stamp() != self._disk_stamp:
+                # 다른 워커가 파일을 갱신했으면 한 번 병합 후 재조회
+                self._merge_disk_locked()
+                v = self._items.get(key)
+            if v is not None and self.ttl and time.time() - v.get("created", 0) > self.ttl:
+                del self._items[key]
+                v = None
+            if v is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return v
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            try:
+                with self._file_lock():
+                    self._merge_disk_locked()
+                    self._items[key] = dict(value, created=time.time())
+                    self._items.move_to_end(key)
+                    while len(self._items) > self.max_items:
+                        self._items.popitem(last=False)
+                    self._write_locked()
+            except OSError as e:
+                self._items[key] = dict(value, created=time.time())
+                logger.warning(f"explain cache 잠금 실패({self.path}): {e}")
+
+    def purge_except(self, index_fp: str):
+        """다른 인덱스 지문으로 만들어진 항목 제거 (인덱스 교체 시)"""
+        with self._lock:
+            with self._file_lock():
+                raw = self._merge_disk_locked()
+                stale = [k for k in self._items if k.split("|")[1] != index_fp]
+                for k in stale:
+                    del self._items[k]
+                if stale or len(raw) != len(self._items):
+                    self._write_locked()
+
+    def clear(self):
+        with self._lock:
+            with self._file_lock():
+                self._items.clear()
+                self._write_locked()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses,
+                    "ttl_sec": self.ttl, "prompt_version": PROMPT_VERSION}
+
+
 class RagService:
     def __init__(self):
         self.index_dir = settings.RAG_INDEX_DIR
-        self.emb = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
-        self.vs: FAISS | None = None
+        self.emb = LazyEmbeddings(settings.EMBEDDING_MODEL_NAME)
+        self.vs = None  # langchain FAISS
+        self.qvec: Optional[QueryVectorTable] = None
+        self.index_fp: str = ""
+        self._reload_lock = threading.Lock()
+        self.explain_cache = ExplanationCache(
+            Path(self.index_dir) / EXPLAIN_CACHE_FILE,
+            settings.EXPLAIN_CACHE_TTL_SEC,
+            settings.EXPLAIN_CACHE_SIZE,
+        )
         self._load_index()
 
     def _load_index(self):
+        self.index_fp = index_fingerprint(self.index_dir)
         if os.path.isdir(self.index_dir) and os.path.exists(os.path.join(self.index_dir, "index.faiss")):
+            from langchain_community.vectorstores import FAISS
             self.vs = FAISS.load_local(self.index_dir, self.emb, allow_dangerous_deserialization=True)
+            self._load_query_vectors()
         else:
             self.vs = None
 
+    def _load_query_vectors(self):
+        """클래스별 질의 벡터 테이블(mmap) 로드. 없거나 모델/클래스가 바뀌었으면 1회 생성"""
+        model_name = settings.EMBEDDING_MODEL_NAME
+        table = QueryVectorTable.load(self.index_dir, model_name)
+        if table is None or not table.covers(class_queries().values()):
+            try:
+                n = build_query_vectors(self.emb, self.index_dir, model_name)
+                logger.info(f"질의 벡터 테이블 생성: {n}개")
+                table = QueryVectorTable.load(self.index_dir, model_name)
+            except Exception as e:
+                logger.warning(f"질의 벡터 테이블 생성 실패 (임베딩 직접 계산으로 동작): {e}")
+        self.qvec = table
+
+    def _maybe_reload(self):
+        """ingest_batch 가 인덱스를 갱신했으면 재로드 + 이전 지문의 설명 캐시 폐기"""
+        if index_fingerprint(self.index_dir) == self.index_fp:
+            return
+        with self._reload_lock:
+            if index_fingerprint(self.index_dir) == self.index_fp:
+                return
+            logger.info("RAG 인덱스 변경 감지 → 재로드")
+            self._load_index()
+            self.explain_cache.purge_except(self.index_fp)
+
+    @property
+    def llm_id(self) -> str:
+        return settings.LLM_MODEL if (settings.OPENAI_API_KEY and OpenAI is not None) else "none"
+
+    def explain_class(self, class_name: str, k: int = 4, use_cache: bool = True,
+                      timings: Optional[Timings] = None) -> Tuple[List[str], str, List[Retrieved], str]:
+        """
+        예측 클래스 → (질의어, boolean 질의, 검색 결과, 설명).
+        클래스별 결과가 캐시에 있으면 임베딩/FAISS/LLM 호출 없이 반환
+        timings: rag_cache / rag_search / llm 단계 시간 기록 (요청 단위 Timings)
+        """
+        tm = timings if timings is not None else Timings()
+        terms = class_to_query_terms(class_name)
+        boolean_query = as_boolean_query(terms)
+        self._maybe_reload()
+        key = ExplanationCache.make_key(class_name, self.index_fp, self.llm_id)
+        if use_cache:
+            with tm.span("rag_cache"):
+                hit = self.explain_cache.get(key)
+            if hit is not None and hit.get("k") == k:
+                retrieved = [Retrieved(**r) for r in hit["retrieved"]]
+                return terms, boolean_query, retrieved, hit["explanation"]
+
+        with tm.span("rag_search"):
+            retrieved = self.search(boolean_query, k=k)
+        with tm.span("llm"):
+            explanation, ok = self._generate(boolean_query, retrieved)
+        if ok:  # LLM 호출 실패 응답은 캐시하지 않음
+            self.explain_cache.put(key, {
+                "label": class_name, "k": k,
+                "retrieved": [asdict(r) for r in retrieved],
+                "explanation": explanation,
+            })
+        return terms, boolean_query, retrieved, explanation
+
     def search(self, query: str, k: int = 4) -> List[Retrieved]:
         if not self.vs:
             return []
-        docs_scores = self.vs.similarity_search_with_score(query, k=k)
+        vec = self.qvec.get(query) if self.qvec is not None else None
+        if vec is not None:
+            # 클래스 질의: 미리 계산된 벡터로 바로 index.search (인코더 forward 없음)
+            docs_scores = self.vs.similarity_search_with_score_by_vector(vec, k=k)
+        else:
+            # 임의 질의만 인코더 사용 (첫 호출 시 모델 로드)
+            docs_scores = self.vs.similarity_search_with_score(query, k=k)
         out: List[Retrieved] = []
         for doc, score in docs_scores:
             out.append(Retrieved(text=doc.page_content, meta=doc.metadata or {}, score=float(score)))
@@ -69,6 +334,11 @@ class RagService:
         """OPENAI_API_KEY 있으면 LLM, 없으면 간이 요약.
         소스 정보는 별도 sources 필드로 전달됩니다.
         """
+        return self._generate(query, items)[0]
+
+    def _generate(self, query: str, items: List[Retrieved]) -> Tuple[str, bool]:
+        """(설명, 캐시 가능 여부) — LLM 호출 실패 시 False"""
+        ok = True
         sources = self.make_sources(items)
         context = "\n\n".join([r.text for r in items])[:6000]
 
@@ -85,13 +355,14 @@ class RagService:
             )
             try:
                 resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=settings.LLM_MODEL,
                     messages=[{"role": "system", "content": sys}, {"role": "user", "content": user}],
                     temperature=0.2,
                 )
                 body = resp.choices[0].message.content.strip()
             except Exception as e:
                 body = f"[LLM 호출 실패: {e}]\n\n" + (context[:1200] or "")
+                ok = False
         else:
             # 간이: 컨텍스트 앞부분을 요약처럼 제공
             head = context[:1000]
@@ -102,6 +373,32 @@ class RagService:
             )
 
         # 소스 정보는 별도 sources 필드로 전달하므로 recomm에는 포함하지 않음
-        return body
+        return body, ok
+
+_rag: Optional[RagService] = None
+_rag_error: Optional[str] = None
+_rag_lock = threading.Lock()
+
+
+def get_rag() -> Optional[RagService]:
+    """RagService 지연 생성 (임베딩 모델/FAISS 인덱스 로드). 실패 시 None, 오류는 rag_error()"""
+    global _rag, _rag_error
+    if _rag is None:
+        with _rag_lock:
+            if _rag is None:
+                try:
+                    _rag = RagService()
+                    _rag_error = None
+                except Exception as e:
+                    _rag_error = str(e)
+                    logger.error(f"RAG 서비스 초기화 실패: {e}")
+    return _rag
+
+
+def peek_rag() -> Optional[RagService]:
+    """로드를 유발하지 않고 현재 인스턴스만 반환 (상태 조회용)"""
+    return _rag
+
 
-rag = RagService()
\ No newline at end of file
+def rag_error() -> Optional[str]:
+    return _rag_error
\ No newline at end of file
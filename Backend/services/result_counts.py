@@ -0,0 +1,60 @@
+# Backend/services/result_counts.py
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from ..config import settings
+
+
+class ResultCounts:
+    """
+    GET /api/results 의 total 용 클래스별 행 수 캐시 (None 키 = 전체).
+    - 미스/만료 시에만 COUNT(*) (class_name 인덱스 범위 스캔), ttl 초 동안 재사용
+    - 이 워커의 INSERT/DELETE 는 캐시된 값에 바로 반영 (다른 워커 변경분은 ttl 안에 수렴)
+    """
+
+    def __init__(self, ttl_sec: float = 30.0):
+        self.ttl = max(0.0, float(ttl_sec))
+        self._lock = threading.Lock()
+        self._counts: Dict[Optional[str], list] = {}  # key → [count, 만료 시각]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, class_name: Optional[str], loader: Callable[[Optional[str]], int]) -> int:
+        key = class_name or None
+        now = time.monotonic()
+        with self._lock:
+            ent = self._counts.get(key)
+            if ent is not None and ent[1] > now:
+                self.hits += 1
+                return ent[0]
+            self.misses += 1
+        n = int(loader(key))
+        if self.ttl > 0:
+            with self._lock:
+                self._counts[key] = [n, time.monotonic() + self.ttl]
+        return n
+
+    def adjust(self, class_name: Optional[str], delta: int) -> None:
+        """INSERT(+n)/DELETE(-n) 반영 — 해당 클래스와 전체 키 모두"""
+        with self._lock:
+            for key in {class_name or None, None}:
+                ent = self._counts.get(key)
+                if ent is not None:
+                    ent[0] = max(0, ent[0] + delta)
+
+    def invalidate(self, class_name: Optional[str] = None) -> None:
+        with self._lock:
+            if class_name is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(class_name, None)
+                self._counts.pop(None, None)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"keys": len(self._counts), "ttl_sec": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+result_counts = ResultCounts(settings.RESULTS_COUNT_TTL_SEC)
@@ -0,0 +1,89 @@
+# Backend/services/startup.py
+from __future__ import annotations
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+@dataclass
+class ComponentState:
+    name: str
+    required: bool = True
+    state: str = PENDING
+    started_at: Optional[float] = None
+    elapsed_ms: Optional[float] = None
+    error: Optional[str] = None
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "elapsed_ms": round(self.elapsed_ms, 1) if self.elapsed_ms is not None else None,
+            "error": self.error,
+            **({"detail": self.detail} if self.detail else {}),
+        }
+
+
+class StartupManager:
+    """
+    무거운 구성요소(분류 모델, RAG 인덱스 등)를 백그라운드 스레드에서 병렬 로드.
+    lifespan 은 start() 후 바로 반환 → /health 는 즉시 응답, /ready 가 구성요소별 상태/시간 보고
+    """
+
+    def __init__(self):
+        self._components: Dict[str, ComponentState] = {}
+        self._loaders: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, loader: Callable[[], Optional[Dict[str, Any]]], required: bool = True) -> None:
+        """loader 는 성공 시 선택적으로 상세 정보 dict 반환, 실패 시 예외"""
+        with self._lock:
+            self._components[name] = ComponentState(name=name, required=required)
+            self._loaders[name] = loader
+
+    def _run(self, name: str) -> None:
+        comp = self._components[name]
+        comp.state, comp.started_at = LOADING, time.perf_counter()
+        try:
+            detail = self._loaders[name]()
+            comp.detail = detail or {}
+            comp.state = READY
+        except Exception as e:
+            comp.state, comp.error = FAILED, str(e)
+            logger.error(f"[startup] {name} 로드 실패: {e}")
+        finally:
+            comp.elapsed_ms = (time.perf_counter() - comp.started_at) * 1000.0
+            logger.info(f"[startup] {name} {comp.state} ({comp.elapsed_ms:.0f} ms)")
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        self.started_at = time.perf_counter()
+        names: List[str] = list(self._components)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="startup")
+        for n in names:
+            self._pool.submit(self._run, n)
+        self._pool.shutdown(wait=False)
+
+    def is_ready(self) -> bool:
+        return all(c.state == READY for c in self._components.values() if c.required)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "uptime_ms": round((time.perf_counter() - self.started_at) * 1000.0, 1) if self.started_at else None,
+            "components": {n: c.as_dict() for n, c in self._components.items()},
+        }
+
+
+startup = StartupManager()
@@ -0,0 +1,126 @@
+# Backend/services/upload_store.py
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"upload exceeds {limit} bytes")
+        self.limit = limit
+
+
+def _ext(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if ext in ALLOWED_EXTS else ".jpg"
+
+
+class SpooledUpload:
+    """
+    UPLOAD_DIR/.tmp 에 기록 중/완료된 업로드 1건. 열린 파일 핸들을 유지해
+    디코드는 같은 핸들(page cache)에서 바로 하고, 보관 시 같은 파일시스템 안에서 rename 만 한다
+    """
+
+    __slots__ = ("tmp_path", "fp", "sha256", "size", "ext", "filename")
+
+    def __init__(self, tmp_path: Path, fp: BinaryIO, sha256: str, size: int, ext: str, filename: Optional[str]):
+        self.tmp_path = tmp_path
+        self.fp = fp
+        self.sha256 = sha256
+        self.size = size
+        self.ext = ext
+        self.filename = filename
+
+    def open(self) -> BinaryIO:
+        """처음으로 되감은 읽기 핸들 (PIL.Image.open 등에 그대로 전달)"""
+        self.fp.seek(0)
+        return self.fp
+
+    def discard(self) -> None:
+        try:
+            self.fp.close()
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+class UploadStore:
+    """
+    콘텐츠 주소 업로드 저장소
+    - 청크 단위로 임시 파일에 기록하며 sha256 계산 + 크기 상한 (전체를 메모리에 올리지 않음)
+    - 보관 경로: <root>/<h[:2]>/<h[2:4]>/<sha256><ext> (os.replace 로 원자적 이동, 같은 내용은 1벌)
+    """
+
+    def __init__(self, root: Path, max_bytes: int, chunk_size: int = 1 << 20):
+        self.root = Path(root)
+        self.tmp_dir = self.root / ".tmp"
+        self.max_bytes = int(max_bytes)
+        self.chunk_size = max(64 * 1024, int(chunk_size))
+
+    def receive(self, src: BinaryIO, filename: Optional[str] = None) -> SpooledUpload:
+        """src(UploadFile.file, ZipExtFile 등)를 스트리밍으로 임시 파일에 기록 (블로킹 — 스레드에서 호출)"""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.tmp_dir, suffix=".part")
+        fp = os.fdopen(fd, "w+b")
+        h = hashlib.sha256()
+        size = 0
+        try:
+            while True:
+                chunk = src.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLarge(self.max_bytes)
+                h.update(chunk)
+                fp.write(chunk)
+            fp.flush()
+        except BaseException:
+            fp.close()
+            os.unlink(tmp)
+            raise
+        return SpooledUpload(Path(tmp), fp, h.hexdigest(), size, _ext(filename), filename)
+
+    def path_for(self, sha256: str, ext: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    def commit(self, up: SpooledUpload) -> Path:
+        """임시 파일을 콘텐츠 주소 경로로 이동 (이미 있으면 임시 파일만 제거). 최종 경로 반환"""
+        dest = self.path_for(up.sha256, up.ext)
+        up.fp.close()
+        if dest.exists():
+            up.tmp_path.unlink(missing_ok=True)
+            return dest
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(up.tmp_path, dest)
+        return dest
+
+    def cleanup_tmp(self, older_than_sec: int = 3600) -> int:
+        """중단된 요청이 남긴 임시 파일 정리 (기동 시 1회)"""
+        removed = 0
+        if not self.tmp_dir.is_dir():
+            return 0
+        cutoff = time.time() - older_than_sec
+        for p in self.tmp_dir.glob("*.part"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"upload tmp 정리: {removed}개")
+        return removed
+
+
+upload_store = UploadStore(settings.UPLOAD_DIR, settings.UPLOAD_MAX_BYTES, settings.UPLOAD_CHUNK_SIZE)
@@ -0,0 +1,152 @@
+# Backend/services/write_behind.py
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .. import crud
+from ..database import get_async_engine, dispose_async_engine
+from .executors import ExecutorBusy
+from .result_counts import result_counts
+
+logger = logging.getLogger(__name__)
+
+
+class ResultWriter:
+    """
+    FinalProjectResult INSERT write-behind 큐 (이벤트 루프 위, 스레드 없음).
+    - 요청은 행을 넣고 자기 id 가 나올 때까지 대기 (submit / submit_many)
+    - 플러셔 태스크가 첫 행 도착 후 flush_ms 동안(또는 max_batch 까지) 모아 다중 VALUES INSERT 1회
+      → 부하 시 요청당 왕복/커밋 대신 배치당 1회
+    - 대기 행 수가 queue_max 를 넘으면 ExecutorBusy (503 + Retry-After)
+    - record_unknown: 결과 행 없이 일별 집계만 (대기하지 않음, 큐가 가득 차면 버림)
+    """
+
+    def __init__(self, flush_ms: float = 5.0, max_batch: int = 128, queue_max: int = 2048, retry_after: int = 2):
+        self.flush_sec = max(0.0, float(flush_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.queue_max = max(1, int(queue_max))
+        self.retry_after = retry_after
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_seen = 0
+        self.errors = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="result-writer")
+
+    async def stop(self) -> None:
+        """남은 행을 모두 기록한 뒤 종료 + 비동기 엔진 정리"""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        await dispose_async_engine()
+
+    async def submit(self, row: Dict[str, Any]) -> int:
+        return (await self.submit_many([row]))[0]
+
+    async def submit_many(self, rows: List[Dict[str, Any]]) -> List[int]:
+        if not rows:
+            return []
+        self.start()  # lifespan 밖(스크립트 등)에서도 첫 사용 시 시작
+        if self._pending + len(rows) > self.queue_max:
+            self.rejected += 1
+            raise ExecutorBusy("db-writer", self.retry_after)
+        loop = asyncio.get_running_loop()
+        futs = [loop.create_future() for _ in rows]
+        self._pending += len(rows)
+        for row, fut in zip(rows, futs):
+            self._queue.put_nowait((row, fut))
+        return list(await asyncio.gather(*futs))
+
+    def record_unknown(self, reason: Optional[str]) -> None:
+        """Unknown 판정 1건을 집계(result_rollups)에만 반영 — 다음 배치와 같은 트랜잭션"""
+        self.start()
+        if self._pending >= self.queue_max:
+            self.dropped += 1
+            return
+        self._pending += 1
+        self._queue.put_nowait(({"class_name": crud.UNKNOWN_CLASS, "reason": reason, "confidence": 0.0}, None))
+
+    async def _collect(self, first) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.flush_sec
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:  # stop(): 현재 배치를 기록한 뒤 종료
+                self._queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]) -> None:
+        waiting = [(r, f) for r, f in batch if f is not None]
+        rows = [r for r, _ in waiting]
+        rollup_only = [r for r, f in batch if f is None]
+        try:
+            ids = await crud.save_results_batch_async(get_async_engine(), rows, rollup_only)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"write-behind 배치 저장 실패 ({len(rows)}행, 집계 {len(rollup_only)}건): {e}")
+            for _, fut in waiting:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (row, fut), row_id in zip(waiting, ids):
+            result_counts.adjust(row.get("class_name"), 1)
+            if not fut.done():  # 요청이 취소돼도 행은 이미 기록됨
+                fut.set_result(row_id)
+        self.batches += 1
+        self.rows += len(rows)
+        self.max_seen = max(self.max_seen, len(rows))
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = await self._collect(first)
+            try:
+                await self._flush(batch)
+            finally:
+                self._pending -= len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch": (self.rows / self.batches) if self.batches else 0.0,
+            "max_batch_seen": self.max_seen,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "dropped_rollups": self.dropped,
+            "flush_ms": self.flush_sec * 1000.0,
+            "max_batch": self.max_batch,
+        }
+
+
+result_writer = ResultWriter(
+    settings.WRITE_BEHIND_FLUSH_MS,
+    settings.WRITE_BEHIND_MAX_BATCH,
+    settings.WRITE_BEHIND_QUEUE_MAX,
+    settings.BUSY_RETRY_AFTER_SEC,
+)
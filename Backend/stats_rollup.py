@@ -0,0 +1,43 @@
+# Backend/stats_rollup.py
+"""
+일별 집계(result_rollups) 재계산 작업 — /api/stats 는 INSERT/DELETE 시 증분 갱신되고, 이 작업은 어긋남을 정리
+(수동 DB 수정, 자정 경계의 날짜 차이, write-behind 실패 등). cron 등으로 주기 실행
+- 사용:
+    python -m Backend.stats_rollup --days 2      # 어제~오늘 재계산 (기본)
+    python -m Backend.stats_rollup --all         # 전체 재계산 (마이그레이션 직후 등)
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Backend import crud
+from Backend.database import SessionLocal
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--days", type=int, default=2, help="오늘 포함 최근 N일 재계산")
+    ap.add_argument("--since", type=date.fromisoformat, default=None, help="YYYY-MM-DD 이후 재계산 (--days 보다 우선)")
+    ap.add_argument("--all", action="store_true", help="전체 기간 재계산")
+    args = ap.parse_args(argv)
+
+    since = None if args.all else (args.since or date.today() - timedelta(days=max(1, args.days) - 1))
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        n = crud.rebuild_rollups(db, since)
+    finally:
+        db.close()
+    print(f"[stats_rollup] since={since or 'ALL'} → {n}행 ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
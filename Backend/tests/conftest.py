@@ -0,0 +1,32 @@
+# Backend/tests/conftest.py
+"""
+오프라인 테스트 공통 설정 — 체크포인트 없이 무작위 가중치 허용, DB 는 테스트마다 임시 SQLite
+    python -m pytest Backend/tests -q
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Model/ 설정은 import 시점에 환경변수를 읽으므로 먼저 지정
+os.environ.setdefault("ALLOW_RANDOM_WEIGHTS", "1")
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    """결과/상세/집계 테이블을 만든 임시 SQLite 파일 URL (sqlite:///...)"""
+    from sqlalchemy import create_engine
+    from Backend.database import Base, sqlite_ddl_compat
+    from Backend import models  # noqa: F401  (테이블 등록)
+
+    sqlite_ddl_compat()
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
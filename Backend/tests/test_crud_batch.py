@@ -0,0 +1,89 @@
+# Backend/tests/test_crud_batch.py
+"""save_results_batch(_async): 반환 id 가 입력 순서와 일치하고 상세/집계가 같은 행을 가리키는지 (SQLite)"""
+import json
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from Backend import crud
+from Backend.models import FinalProjectResult, FinalProjectResultDetail, ResultRollup
+
+
+def _results(n, prefix="cls"):
+    return [{
+        "class_name": f"{prefix}{i % 3}",
+        "recomm": f"설명 {i}",
+        "image_path": f"/uploads/{prefix}-{i}.jpg",
+        "confidence": 0.5 + i / 100.0,
+        "reason": "CONSENSUS" if i % 2 else None,
+        "detail": json.dumps({"i": i}),
+    } for i in range(n)]
+
+
+def _check(url, results, ids, unknown=0):
+    engine = create_engine(url, future=True)
+    db = sessionmaker(bind=engine, future=True)()
+    try:
+        assert len(ids) == len(results) == len(set(ids))
+        rows = {r.id: r for r in db.query(FinalProjectResult).all()}
+        for i, rid in enumerate(ids):
+            assert rows[rid].image_path == results[i]["image_path"]
+            assert rows[rid].class_name == results[i]["class_name"]
+        details = {d.result_id: json.loads(d.payload) for d in db.query(FinalProjectResultDetail).all()}
+        assert [details[rid]["i"] for rid in ids] == list(range(len(results)))
+
+        # 집계 day 는 created_at 과 같은 시계
+        days = {r.created_at.date() for r in rows.values()}
+        rollups = db.execute(select(ResultRollup)).scalars().all()
+        assert {r.day for r in rollups} == days
+        assert sum(r.n for r in rollups) == len(results) + unknown
+        assert sum(r.n for r in rollups if r.class_name == crud.UNKNOWN_CLASS) == unknown
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_save_results_batch_order(sqlite_url):
+    results = _results(25)
+    engine = create_engine(sqlite_url, future=True)
+    db = sessionmaker(bind=engine, future=True)()
+    try:
+        first = crud.save_results_batch(db, results[:10])
+        rest = crud.save_results_batch(db, results[10:])
+    finally:
+        db.close()
+        engine.dispose()
+    _check(sqlite_url, results, first + rest)
+
+
+def test_save_results_batch_rollup_only(sqlite_url):
+    engine = create_engine(sqlite_url, future=True)
+    db = sessionmaker(bind=engine, future=True)()
+    try:
+        ids = crud.save_results_batch(db, [], rollup_only=[{"reason": "Global:WaterVeto"}] * 3)
+        rollups = db.execute(select(ResultRollup)).scalars().all()
+    finally:
+        db.close()
+        engine.dispose()
+    assert ids == []
+    assert [(r.class_name, r.reason, r.n) for r in rollups] == [(crud.UNKNOWN_CLASS, "Global:WaterVeto", 3)]
+
+
+@pytest.mark.asyncio
+async def test_save_results_batch_async_order(sqlite_url):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    results = _results(17, prefix="async")
+    engine = create_async_engine(sqlite_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    try:
+        ids = await crud.save_results_batch_async(engine, results, rollup_only=[{"reason": "LeafGate"}])
+    finally:
+        await engine.dispose()
+    _check(sqlite_url, results, ids, unknown=1)
+
+
+def test_id_range_steps_by_auto_increment():
+    assert crud._id_range(7, 3, 1) == [7, 8, 9]
+    assert crud._id_range(11, 4, 10) == [11, 21, 31, 41]
@@ -0,0 +1,33 @@
+# Backend/tests/test_golden_rules.py
+"""규칙 엔진 골든 비교 (fuzz): predict_batch(규칙 표) == predict_one(기존 코드), 무작위 가중치로 오프라인 실행"""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+@pytest.fixture(scope="module")
+def model():
+    from Model.bulk_score import load_model
+    return load_model(cascade=False)
+
+
+@pytest.mark.parametrize("seed,batch", [(0, 32), (1, 7), (2, 1)])
+def test_fuzz_predict_batch_matches_predict_one(model, seed, batch):
+    from Model import golden_rules
+
+    with torch.inference_mode():
+        ims, bases, sigs = golden_rules.fuzz_cases(model, 160, seed, size=64)
+        report = golden_rules.run(model, ims, bases, sigs, batch)
+    assert report["n"] == 160
+    assert report["mismatches"] == [], report["mismatches"][:3]
+    # 퍼징이 한 분기에만 몰리지 않았는지 (사유가 여러 종류)
+    assert len(report["reasons"]) > 3
+
+
+def test_diff_detects_changes():
+    from Model.golden_rules import diff
+
+    assert diff({"a": [1.0, {"b": "x"}]}, {"a": [1.0, {"b": "x"}]}) == []
+    assert diff({"a": 1.0}, {"a": 1.0 + 1e-9}) != []
+    assert diff({"a": 1.0}, {"a": 1.0 + 1e-9}, atol=1e-6) == []
+    assert diff({"a": 1}, {"a": 1.0}) != []  # 타입이 달라도 불일치
@@ -108,13 +108,23 @@ export interface ResultItem {
   class_name: string
   image_path: string
   created_at: string
+  confidence?: number | null
+  reason?: string | null
 }
 
 export interface ResultsPage {
-  total: number
-  page: number
+  total: number | null
+  page: number | null
   size: number
   items: ResultItem[]
+  next_cursor?: string | null
+  prev_cursor?: string | null
+}
+
+// 결과 목록 keyset 조회 옵션 (cursor 지정 시 page 무시)
+export interface ResultsQuery {
+  cursor?: string | null      // 이전 응답의 next_cursor / prev_cursor
+  with_total?: boolean        // false → total 계산 생략 (무한 스크롤 등)
 }
 
 export interface ResultDetail {
@@ -124,6 +134,17 @@ export interface ResultDetail {
   image_path: string
   created_at: string
   updated_at: string
+  confidence?: number | null
+  picked_model?: string | null
+  reason?: string | null
+  mn_label?: string | null
+  mn_conf?: number | null
+  rn_label?: string | null
+  rn_conf?: number | null
+  leaf_area?: number | null
+  gy?: number | null
+  sat?: number | null
+  inference_ms?: number | null
   class_info?: Record<string, unknown>
 }
 
@@ -175,18 +196,27 @@ export const apiService = {
     }
   },
 
-  // 결과 목록 조회 (페이지네이션 + 필터링)
+  // 결과 목록 조회 (페이지네이션 + 필터링, query.cursor 지정 시 keyset 페이지)
   async getResults(
     page: number = 1,
     size: number = 20,
     class_name?: string,
-    order: 'asc' | 'desc' = 'desc'
+    order: 'asc' | 'desc' = 'desc',
+    query: ResultsQuery = {}
   ): Promise<ResultsPage> {
     try {
-      const params: Record<string, string | number> = { page, size, order }
+      const params: Record<string, string | number | boolean> = { size, order }
+      if (query.cursor) {
+        params.cursor = query.cursor
+      } else {
+        params.page = page
+      }
       if (class_name) {
         params.class_name = class_name
       }
+      if (query.with_total !== undefined) {
+        params.with_total = query.with_total
+      }
 
       const response = await backendApi.get<ResultsPage>('/results', { params })
       return response.data
@@ -195,6 +225,17 @@ export const apiService = {
     }
   },
 
+  // 결과 목록 커서 조회 (cursor 없으면 첫 페이지, 응답의 next_cursor/prev_cursor 로 이동)
+  async getResultsByCursor(
+    cursor: string | null = null,
+    size: number = 20,
+    class_name?: string,
+    order: 'asc' | 'desc' = 'desc',
+    with_total: boolean = false
+  ): Promise<ResultsPage> {
+    return apiService.getResults(1, size, class_name, order, { cursor, with_total })
+  },
+
   // 특정 결과 상세 조회
   async getResultById(id: number): Promise<ResultDetail> {
     try {
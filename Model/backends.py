@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+MN / RN CPU 추론 백엔드 (INFER_BACKEND 환경변수로 선택)
+- eager        : torchvision fp32 eager (기본값, 기존 동작)
+- dynamic_int8 : torch.ao 동적 양자화 (Linear 만 int8 → CNN 에선 이득 작음, 비교용)
+- static_int8  : FX 그래프 모드 정적 양자화 (conv 포함 int8, QUANT_CALIB_DIR 이미지로 보정) + TorchScript freeze
+- torchscript  : fp32 trace + freeze + optimize_for_inference
+- onnx         : ONNX 내보내기 + onnxruntime (미설치 시 eager 로 폴백)
+
+내보낸 산출물은 EXPORT_DIR(기본 WEIGHTS_DIR/.export)에 캐시되며,
+체크포인트 크기/mtime · torch 버전 · IMG_SIZE · 양자화 엔진이 바뀌면 다시 만든다.
+
+정합성 검사 (fp32 보정 확률 대비):
+    python -m Model.backends --check [--backends static_int8 torchscript onnx] [--images DIR] [--n 64]
+    폴백한 백엔드·무작위 입력 비교는 실패(종료 코드 1) — 허용하려면 --allow-fallback / --allow-random
+"""
+
+from __future__ import annotations
+import argparse, copy, hashlib, json, os, sys, time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+
+BACKENDS = ("eager", "dynamic_int8", "static_int8", "torchscript", "onnx")
+
+INFER_BACKEND = os.getenv("INFER_BACKEND", "eager").strip().lower()
+QUANT_ENGINE = os.getenv("QUANT_ENGINE", "").strip().lower()          # fbgemm(x86) | qnnpack(ARM), 빈 값이면 자동
+QUANT_CALIB_DIR = os.getenv("QUANT_CALIB_DIR", "")
+QUANT_CALIB_N = int(os.getenv("QUANT_CALIB_N", "128"))
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))                    # 0이면 onnxruntime 기본값
+
+# 정합성 허용치 (보정 후 확률 기준)
+PARITY_TOP1_MIN = float(os.getenv("PARITY_TOP1_MIN", "0.99"))
+PARITY_MAX_ABS = float(os.getenv("PARITY_MAX_ABS", "0.05"))
+
+_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+# -------- Optional onnxruntime ----------
+try:
+    import onnxruntime as ort
+    _HAS_ORT = True
+except Exception:
+    _HAS_ORT = False
+
+
+def export_dir(weights_dir: Path) -> Path:
+    return Path(os.getenv("EXPORT_DIR", Path(weights_dir) / ".export")).resolve()
+
+
+def quant_engine() -> str:
+    supported = torch.backends.quantized.supported_engines
+    if QUANT_ENGINE and QUANT_ENGINE in supported:
+        return QUANT_ENGINE
+    return "fbgemm" if "fbgemm" in supported else ("qnnpack" if "qnnpack" in supported else "none")
+
+
+def _artifact_key(name: str, backend: str, ckpt: Path, img_size: int) -> str:
+    try:
+        st = Path(ckpt).stat(); stamp = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        stamp = [None, None]
+    blob = {"ckpt": [str(ckpt), *stamp], "torch": torch.__version__, "img": img_size, "backend": backend}
+    if backend == "static_int8":
+        blob.update(engine=quant_engine(), calib=[QUANT_CALIB_DIR, QUANT_CALIB_N])
+    return f"{name}-{backend}-{hashlib.sha1(json.dumps(blob, sort_keys=True).encode()).hexdigest()[:12]}"
+
+
+def calibration_images(limit: int = QUANT_CALIB_N, root: str = QUANT_CALIB_DIR) -> List:
+    """정적 양자화 보정용 이미지 (QUANT_CALIB_DIR 재귀 탐색, 정렬 후 앞에서 limit 장)"""
+    if not root or not Path(root).is_dir():
+        return []
+    from PIL import Image
+    paths = sorted(p for p in Path(root).rglob("*") if p.suffix.lower() in _IMAGE_EXTS)[:limit]
+    out = []
+    for p in paths:
+        try:
+            with Image.open(p) as im:
+                out.append(im.convert("RGB"))
+        except Exception:
+            continue
+    return out
+
+
+class OrtModule:
+    """onnxruntime 세션을 torch 모듈처럼 호출 (입력/출력 torch.Tensor)"""
+
+    def __init__(self, path: Path):
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS > 0:
+            so.intra_op_num_threads = ONNX_THREADS
+        self.sess = ort.InferenceSession(str(path), so, providers=["CPUExecutionProvider"])
+        self.input_name = self.sess.get_inputs()[0].name
+        self.path = path
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        x = x.detach().to("cpu", torch.float32).contiguous().numpy()
+        return torch.from_numpy(self.sess.run(None, {self.input_name: x})[0])
+
+    def eval(self):
+        return self
+
+
+# ===================== 백엔드별 준비 =====================
+def _example(img_size: int, n: int = 1) -> torch.Tensor:
+    return torch.randn(n, 3, img_size, img_size)
+
+
+def _freeze(traced):
+    traced = torch.jit.freeze(traced.eval())
+    try:
+        traced = torch.jit.optimize_for_inference(traced)
+    except Exception:
+        pass
+    return traced
+
+
+def _build_dynamic_int8(model: nn.Module) -> nn.Module:
+    torch.backends.quantized.engine = quant_engine()
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _build_static_int8(model: nn.Module, img_size: int, calib: Iterable[torch.Tensor]) -> torch.jit.ScriptModule:
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    engine = quant_engine()
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), (_example(img_size),))
+    n = 0
+    with torch.inference_mode():
+        for x in calib:
+            prepared(x); n += x.shape[0]
+    if n == 0:
+        raise RuntimeError("QUANT_CALIB_DIR 에 보정 이미지가 없습니다")
+    quantized = convert_fx(prepared)
+    with torch.inference_mode():
+        return _freeze(torch.jit.trace(quantized, _example(img_size)))
+
+
+def _build_torchscript(model: nn.Module, img_size: int) -> torch.jit.ScriptModule:
+    with torch.inference_mode():
+        return _freeze(torch.jit.trace(model, _example(img_size)))
+
+
+def _export_onnx(model: nn.Module, img_size: int, path: Path):
+    torch.onnx.export(
+        model, _example(img_size), str(path),
+        input_names=["input"], output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+    )
+
+
+def prepare(model: nn.Module, name: str, ckpt: Path, weights_dir: Path, img_size: int,
+            device: str = "cpu", backend: str = INFER_BACKEND,
+            calib_batches: Optional[Callable[[], Iterable[torch.Tensor]]] = None) -> Tuple[Callable, str]:
+    """
+    fp32 eager 모델(가중치 로드 완료)을 요청한 백엔드로 변환. (호출 가능한 모듈, 실제 적용된 백엔드) 반환.
+    변환 실패·미지원 환경이면 경고 후 eager 로 폴백 (서빙은 계속).
+    calib_batches: static_int8 보정용 정규화된 [N,3,H,W] 텐서 배치 이터러블을 만드는 함수
+    """
+    model = model.eval()
+    if backend not in BACKENDS:
+        print(f"[backends] 알 수 없는 INFER_BACKEND={backend!r} → eager")
+        backend = "eager"
+    if backend == "eager":
+        return model.to(device), "eager"
+    if device != "cpu" and backend in ("dynamic_int8", "static_int8", "onnx"):
+        print(f"[backends] {backend} 는 CPU 전용 → {name} 은(는) {device} eager 사용")
+        return model.to(device), "eager"
+    if backend == "onnx" and not _HAS_ORT:
+        print("[backends] onnxruntime 미설치 → eager")
+        return model.to(device), "eager"
+
+    out_dir = export_dir(weights_dir)
+    key = _artifact_key(name, backend, ckpt, img_size)
+    try:
+        if backend == "dynamic_int8":
+            return _build_dynamic_int8(model.cpu()), backend  # 변환이 빠르므로 캐시하지 않음
+
+        if backend == "onnx":
+            path = out_dir / f"{key}.onnx"
+            if not path.is_file():
+                out_dir.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                _export_onnx(model.cpu(), img_size, tmp)
+                os.replace(tmp, path)
+                print(f"[backends] exported {path.name}")
+            return OrtModule(path), backend
+
+        # torchscript / static_int8: 고정 그래프를 .pt 로 캐시
+        path = out_dir / f"{key}.pt"
+        if path.is_file():
+            if backend == "static_int8":
+                torch.backends.quantized.engine = quant_engine()
+            return torch.jit.load(str(path), map_location=device).eval(), backend
+        if backend == "static_int8":
+            scripted = _build_static_int8(model.cpu(), img_size, calib_batches() if calib_batches else [])
+        else:
+            scripted = _build_torchscript(model.to(device), img_size)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        torch.jit.save(scripted, str(tmp))
+        os.replace(tmp, path)
+        print(f"[backends] exported {path.name}")
+        return scripted, backend
+    except Exception as e:
+        print(f"[backends] {name} {backend} 준비 실패 → eager ({e})")
+        return model.to(device), "eager"
+
+
+# ===================== 정합성 검사 =====================
+def _parity(ref: Dict, cand: Dict) -> Dict:
+    pr, pc = ref["probs"], cand["probs"].to(ref["probs"].device)
+    diff = (pr - pc).abs()
+    kl = (pr.clamp_min(1e-12) * (pr.clamp_min(1e-12).log() - pc.clamp_min(1e-12).log())).sum(1)
+    return {
+        "top1_agree": float((pr.argmax(1) == pc.argmax(1)).float().mean()),
+        "max_abs": float(diff.max()),
+        "mean_abs": float(diff.mean()),
+        "conf_mae": float((ref["conf"] - cand["conf"].to(ref["conf"].device)).abs().mean()),
+        "kl_mean": float(kl.mean()),
+    }
+
+
+def _bench_ms(model, x, T_vec, infer_tensor, repeat: int = 3) -> float:
+    infer_tensor(model, x[:1], T_vec)  # 워밍업
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        infer_tensor(model, x, T_vec, return_logits=False)
+    return (time.perf_counter() - t0) * 1000.0 / (repeat * x.shape[0])
+
+
+def check(backends: List[str], images_dir: Optional[str], n: int,
+          allow_fallback: bool = False, allow_random: bool = False) -> bool:
+    """
+    fp32 eager 대비 각 백엔드의 보정 확률 정합성 + 이미지당 지연(ms) 출력. 모두 허용치 이내면 True.
+    요청한 백엔드가 준비되지 못해 다른 백엔드로 폴백하거나(allow_fallback 제외),
+    검사 이미지가 없어 무작위 입력으로만 비교한 경우(allow_random 제외)는 실패로 본다
+    """
+    try:
+        from . import leaf_ensemble as le
+    except ImportError:
+        import leaf_ensemble as le
+
+    ref = le.LeafEnsemble(backend="eager")
+    ims = calibration_images(n, images_dir or QUANT_CALIB_DIR)
+    if ims:
+        x = torch.cat([le.input_tensor(im) for im in ims])
+    else:
+        print("[backends] 검사 이미지 없음 → 무작위 입력 (분포가 달라 정합성 수치는 참고용)")
+        x = torch.randn(n, 3, le.IMG_SIZE, le.IMG_SIZE)
+
+    components = [("mn", ref.mn, le.CKPT_MN, ref.Tmn_vec), ("rn", ref.rn, le.CKPT_RN, ref.Trn_vec)]
+    ok = bool(ims) or allow_random
+    report = {} if ok else {"inputs": {"pass": False, "reason": "random inputs only (--allow-random 로 허용)"}}
+    for name, model, ckpt, T in components:
+        base = le.infer_tensor(model, x, T)
+        report[f"{name}/eager"] = {"ms_per_image": _bench_ms(model, x, T, le.infer_tensor)}
+        for b in backends:
+            cand, used = prepare(copy.deepcopy(model).cpu(), name, ckpt, le.WEIGHTS_DIR, le.IMG_SIZE,
+                                 device=le.DEVICE, backend=b, calib_batches=ref.calibration_batches)
+            if used != b:
+                report[f"{name}/{b}"] = {"fallback": used, "pass": allow_fallback}
+                ok = ok and allow_fallback
+                continue
+            stats = _parity(base, le.infer_tensor(cand, x, T))
+            stats["ms_per_image"] = _bench_ms(cand, x, T, le.infer_tensor)
+            stats["pass"] = stats["top1_agree"] >= PARITY_TOP1_MIN and stats["max_abs"] <= PARITY_MAX_ABS
+            ok = ok and stats["pass"]
+            report[f"{name}/{b}"] = stats
+    print(json.dumps(report, indent=2))
+    return ok
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="추론 백엔드 내보내기/정합성 검사")
+    ap.add_argument("--check", action="store_true", help="fp32 대비 정합성 + 지연 비교")
+    ap.add_argument("--backends", nargs="+", default=[b for b in BACKENDS if b != "eager"], choices=BACKENDS)
+    ap.add_argument("--images", default=None, help="검사 이미지 폴더 (기본: QUANT_CALIB_DIR)")
+    ap.add_argument("--n", type=int, default=64)
+    ap.add_argument("--allow-fallback", action="store_true", help="준비 실패로 폴백한 백엔드를 실패로 보지 않음")
+    ap.add_argument("--allow-random", action="store_true", help="검사 이미지 없이 무작위 입력 비교만으로도 통과 허용")
+    args = ap.parse_args(argv)
+    if not args.check:
+        ap.print_help(); return
+    sys.exit(0 if check(args.backends, args.images, args.n, args.allow_fallback, args.allow_random) else 1)
+
+
+if __name__ == "__main__":
+    main()
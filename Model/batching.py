@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+LeafEnsemble 동적 마이크로 배칭
+- 동시에 들어온 요청을 max_wait_ms 동안 최대 max_batch 장까지 모아 MN/RN 기본 추론을 배치 1회로 실행
+- 이미지별 규칙 평가(predict_one)는 각 호출자 스레드로 되돌려 병렬 수행
+- 큐 깊이 / 배치 크기 / 대기 시간 지표 제공 (튜닝용)
+"""
+
+from __future__ import annotations
+import os, time, queue, threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+BATCH_MAX_SIZE = int(os.getenv("INFER_BATCH_MAX", "1"))          # 1이면 배칭 비활성
+BATCH_MAX_WAIT_MS = float(os.getenv("INFER_BATCH_WAIT_MS", "5"))
+BATCH_RESULT_TIMEOUT_S = float(os.getenv("INFER_BATCH_TIMEOUT_S", "120"))  # 배치 결과 대기 상한 (워커 정지 시 무한 대기 방지)
+
+# 대기 시간 히스토그램 버킷(ms)
+_WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class _Request:
+    __slots__ = ("image", "future", "t_enq", "wait_ms")
+
+    def __init__(self, image):
+        self.image = image
+        self.future: Future = Future()
+        self.t_enq = time.perf_counter()
+        self.wait_ms = 0.0
+
+
+class BatchMetrics:
+    """배칭 스케줄러 지표 (스레드 안전)"""
+
+    def __init__(self, max_batch: int):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.batch_size_hist = [0] * (max_batch + 1)   # index = 배치 크기
+        self.wait_ms_sum = 0.0
+        self.wait_ms_max = 0.0
+        self.wait_ms_hist = [0] * (len(_WAIT_BUCKETS_MS) + 1)
+        self.forward_ms_sum = 0.0
+        self.errors = 0
+
+    def record(self, size: int, waits_ms: List[float], forward_ms: float):
+        with self._lock:
+            self.batches += 1
+            self.images += size
+            self.batch_size_hist[min(size, len(self.batch_size_hist) - 1)] += 1
+            self.forward_ms_sum += forward_ms
+            for w in waits_ms:
+                self.wait_ms_sum += w
+                self.wait_ms_max = max(self.wait_ms_max, w)
+                for bi, b in enumerate(_WAIT_BUCKETS_MS):
+                    if w <= b:
+                        self.wait_ms_hist[bi] += 1
+                        break
+                else:
+                    self.wait_ms_hist[-1] += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "images": self.images,
+                "errors": self.errors,
+                "avg_batch_size": (self.images / self.batches) if self.batches else 0.0,
+                "batch_size_hist": {str(i): c for i, c in enumerate(self.batch_size_hist) if i > 0 and c},
+                "wait_ms": {
+                    "avg": (self.wait_ms_sum / self.images) if self.images else 0.0,
+                    "max": self.wait_ms_max,
+                    "hist": {
+                        **{f"le_{b}": c for b, c in zip(_WAIT_BUCKETS_MS, self.wait_ms_hist)},
+                        "le_inf": self.wait_ms_hist[-1],
+                    },
+                },
+                "avg_forward_ms": (self.forward_ms_sum / self.batches) if self.batches else 0.0,
+            }
+
+
+class MicroBatcher:
+    """
+    LeafEnsemble 앞단 배칭 스케줄러.
+    predict(im)은 호출자 스레드를 블록하고, 워커 스레드가 모은 배치의 기본 추론 결과를 받아
+    호출자 스레드에서 규칙 평가(predict_one(im, base=...))를 수행한다.
+    """
+
+    def __init__(self, model, max_batch: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 result_timeout: float = BATCH_RESULT_TIMEOUT_S):
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.result_timeout = float(result_timeout) if result_timeout and result_timeout > 0 else None
+        self.metrics = BatchMetrics(self.max_batch)
+        self._q: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._stopped = False
+        self._state_lock = threading.Lock()  # _stopped 확인+큐 삽입 ↔ close() 의 종료 신호를 원자적으로
+        self._worker = threading.Thread(target=self._loop, name="leaf-batcher", daemon=True)
+        self._worker.start()
+
+    # ---------- public ----------
+    def predict(self, im, timings=None) -> Dict:
+        """timings(Timings)가 있으면 배치 대기 시간을 batch_wait 로 기록 (forward 는 predict_one 이 기록)"""
+        req = _Request(im)
+        with self._state_lock:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher is stopped")
+            self._q.put(req)
+        try:
+            base = req.future.result(timeout=self.result_timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"MicroBatcher: {self.result_timeout:.0f}s 안에 배치 결과 없음") from None
+        if timings is not None:
+            timings.add("batch_wait", req.wait_ms)
+        return self.model.predict_one(im, base=base, timings=timings)
+
+    def queue_depth(self) -> int:
+        return self._q.qsize()
+
+    def stats(self) -> Dict:
+        out = self.metrics.snapshot()
+        out.update(queue_depth=self.queue_depth(), max_batch=self.max_batch, max_wait_ms=self.max_wait * 1000.0)
+        return out
+
+    def close(self):
+        with self._state_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._q.put(None)
+        self._worker.join(timeout=5.0)
+        # 워커가 제때 끝나지 않았으면 (forward 중 정체) 큐에 남은 요청을 여기서 실패 처리
+        self._fail_pending()
+        if self._worker.is_alive():
+            self._q.put(None)  # 위에서 함께 꺼낸 종료 신호 복구 → forward 가 끝나면 워커 종료
+
+    # ---------- worker ----------
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        deadline = first.t_enq + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                req = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:  # 종료 신호는 다음 루프에서 처리
+                self._q.put(None)
+                break
+            batch.append(req)
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._q.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            t0 = time.perf_counter()
+            waits_ms = [(t0 - r.t_enq) * 1000.0 for r in batch]
+            for r, w in zip(batch, waits_ms):
+                r.wait_ms = w
+            try:
+                bases = self.model.forward_base([r.image for r in batch])
+            except Exception as e:
+                self.metrics.record_error()
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+            self.metrics.record(len(batch), waits_ms, (time.perf_counter() - t0) * 1000.0)
+            for r, b in zip(batch, bases):
+                r.future.set_result(b)
+        # 종료 시 남은 요청 정리
+        self._fail_pending()
+
+    def _fail_pending(self):
+        while True:
+            try:
+                r = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if r is not None and not r.future.done():
+                r.future.set_exception(RuntimeError("MicroBatcher is stopped"))
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+leaf_metrics 최대 연결요소 추출 벤치마크
+- 잡음 많은 현장 사진을 흉내 낸 합성 마스크(작은 녹색 blob 수 증가)로
+  기존 라벨별 루프 vs connectedComponentsWithStats 기반 추출 시간 비교
+- 사용: python -m Model.bench_components [--size 1024] [--blobs 10 100 1000 4000] [--repeat 3]
+"""
+
+from __future__ import annotations
+import argparse, time
+
+import numpy as np
+import cv2
+
+try:
+    from .leaf_ensemble import _largest_component, _bbox_from_mask
+except ImportError:
+    from leaf_ensemble import _largest_component, _bbox_from_mask
+
+
+def _largest_component_loop(mask0, pad=4):
+    """기존 구현 (비교 기준)"""
+    num, labels = cv2.connectedComponents(mask0)
+    max_area = 0; max_lab = 0
+    for lab in range(1, num):
+        area = int((labels == lab).sum())
+        if area > max_area: max_area = area; max_lab = lab
+    mask_largest = (labels == max_lab).astype(np.uint8) if max_lab > 0 else (mask0 * 0)
+    return mask_largest, max_area, _bbox_from_mask(mask_largest, pad=pad)
+
+
+def synthetic_mask(size: int, blobs: int, seed: int = 0) -> np.ndarray:
+    """큰 잎 1개 + 서로 떨어진 작은 blob N개"""
+    rng = np.random.default_rng(seed)
+    m = np.zeros((size, size), np.uint8)
+    cv2.ellipse(m, (size // 2, size // 2), (size // 5, size // 8), 30, 0, 360, 1, -1)
+    # 격자 위 서로 겹치지 않는 위치에 3x3 blob 배치
+    step = max(6, int(size / np.sqrt(blobs * 1.3 + 1)))
+    cells = [(y, x) for y in range(3, size - 6, step) for x in range(3, size - 6, step)]
+    rng.shuffle(cells)
+    placed = 0
+    for y, x in cells:
+        if placed >= blobs:
+            break
+        if m[max(0, y - 2):y + 6, max(0, x - 2):x + 6].any():
+            continue
+        m[y:y + 3, x:x + 3] = 1
+        placed += 1
+    return m
+
+
+def _time(fn, mask, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(mask); best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", type=int, default=1024)
+    ap.add_argument("--blobs", type=int, nargs="+", default=[10, 100, 500, 1000, 2000, 4000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--skip-loop-over", type=int, default=2000, help="이 blob 수를 넘으면 기존 루프 측정 생략")
+    args = ap.parse_args()
+
+    print(f"{'blobs':>7} {'components':>11} {'stats_ms':>10} {'loop_ms':>10} {'speedup':>8} {'stats_ms/MPx':>13}")
+    mpx = args.size * args.size / 1e6
+    for n in args.blobs:
+        mask = synthetic_mask(args.size, n)
+        num = cv2.connectedComponents(mask)[0] - 1
+        t_new = _time(_largest_component, mask, args.repeat)
+        a = _largest_component(mask)
+        if n <= args.skip_loop_over:
+            t_old = _time(_largest_component_loop, mask, args.repeat)
+            b = _largest_component_loop(mask)
+            assert a[1] == b[1] and a[2] == b[2] and np.array_equal(a[0], b[0]), "결과 불일치"
+            old_s, spd = f"{t_old:10.2f}", f"{t_old / max(t_new, 1e-9):7.1f}x"
+        else:
+            old_s, spd = f"{'-':>10}", f"{'-':>8}"
+        print(f"{n:7d} {num:11d} {t_new:10.2f} {old_s} {spd} {t_new / mpx:13.2f}")
+    print("stats_ms 는 blob 수와 무관하게 픽셀 수에 선형이어야 함 (loop_ms 는 blob 수에 비례해 증가)")
+
+
+if __name__ == "__main__":
+    main()
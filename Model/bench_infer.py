@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+LeafEnsemble 추론 단계별 지연 벤치마크 (규칙/가중치 변경의 지연 회귀 확인용)
+- 고정 시드 합성 이미지 코퍼스(여러 해상도, JPEG)로 단계별 시간 측정:
+  decode / mn_forward / rn_forward / leaf_metrics / color_signals(sat·highlight·water)
+  / tta_quick / tta2 / rice_expert / guard / predict_one(전체)
+- p50/p95/p99 + 처리량을 JSON 기준선으로 저장하고 다른 커밋의 기준선과 비교
+- 체크포인트가 없으면 무작위 가중치로 동작 (ALLOW_RANDOM_WEIGHTS, 완전 오프라인)
+- 사용:
+    python -m Model.bench_infer --out bench/infer_base.json
+    python -m Model.bench_infer --compare bench/infer_base.json [--tolerance 0.10 --fail-on-regression]
+"""
+
+from __future__ import annotations
+import argparse, io, json, os, platform, subprocess, sys, time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import cv2
+from PIL import Image
+
+SIZES = [(320, 240), (640, 480), (1024, 768), (1600, 1200), (1920, 1080), (3024, 4032), (4000, 3000)]
+STAGES = ["decode", "mn_forward", "rn_forward", "leaf_metrics", "color_signals",
+          "tta_quick", "tta2", "rice_expert", "guard", "predict_one"]
+
+
+# ===================== 합성 코퍼스 =====================
+def synthetic_image(w: int, h: int, seed: int) -> np.ndarray:
+    """
+    현장 사진을 흉내 낸 RGB: 흙/회색 배경 + 잡음 + (대부분) 잎 타원과 병반.
+    일부는 잎 없는 붉은 물체 / 물 영역을 넣어 Unknown·veto 분기도 섞이게 함
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.integers(60, 140, 3).astype(np.float32)
+    img = np.empty((h, w, 3), np.float32)
+    img[:] = base
+    img += np.linspace(-20, 20, h, dtype=np.float32)[:, None, None]
+    img += rng.normal(0, 12, (h, w, 1)).astype(np.float32)
+    img = np.clip(img, 0, 255).astype(np.uint8)
+
+    kind = seed % 6
+    s = min(w, h)
+    center = (int(w * rng.uniform(0.35, 0.65)), int(h * rng.uniform(0.35, 0.65)))
+    if kind == 4:      # 잎 없음: 붉은 물체 (food / NoLeafVeto)
+        cv2.circle(img, center, int(s * 0.25), (190, 40, 40), -1)
+    else:
+        axes = (int(s * rng.uniform(0.25, 0.40)), int(s * rng.uniform(0.12, 0.22)))
+        leaf = tuple(int(c) for c in rng.integers((30, 110, 20), (90, 200, 70)))
+        cv2.ellipse(img, center, axes, float(rng.uniform(0, 180)), 0, 360, leaf, -1)
+        for _ in range(int(rng.integers(3, 30))):   # 병반
+            dx, dy = rng.normal(0, axes[0] / 3), rng.normal(0, axes[1] / 3)
+            cv2.circle(img, (int(center[0] + dx), int(center[1] + dy)), max(1, int(s * rng.uniform(0.005, 0.03))),
+                       (int(rng.integers(90, 160)), int(rng.integers(60, 110)), 30), -1)
+        if kind == 5:  # 물 영역 (rice water veto)
+            cv2.rectangle(img, (0, int(h * 0.7)), (w, h), (40, 170, 190), -1)
+    return img
+
+
+def synthetic_corpus(n: int, sizes: Sequence[Tuple[int, int]] = SIZES, seed: int = 0, quality: int = 90) -> List[Dict]:
+    """[{"name", "w", "h", "data": JPEG bytes}] — 해상도를 순환하며 n장 (seed 고정이면 항상 동일)"""
+    out = []
+    for i in range(n):
+        w, h = sizes[i % len(sizes)]
+        ok, buf = cv2.imencode(".jpg", synthetic_image(w, h, seed + i)[..., ::-1], [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if not ok:
+            raise RuntimeError("JPEG 인코딩 실패")
+        out.append({"name": f"syn_{i:04d}_{w}x{h}.jpg", "w": w, "h": h, "data": buf.tobytes()})
+    return out
+
+
+def folder_corpus(src: Path, n: Optional[int] = None) -> List[Dict]:
+    """실제 이미지 폴더로 측정할 때 (파일 바이트 그대로)"""
+    try:
+        from .bulk_score import collect_inputs
+    except ImportError:
+        from bulk_score import collect_inputs
+    out = []
+    for p in collect_inputs(Path(src))[:n]:
+        data = Path(p).read_bytes()
+        with Image.open(io.BytesIO(data)) as im:  # 헤더만
+            w, h = im.size
+        out.append({"name": Path(p).name, "w": w, "h": h, "data": data})
+    return out
+
+
+# ===================== 통계 / 기준선 (Backend/bench_api.py 와 공유) =====================
+def summarize(values_ms: Sequence[float]) -> Dict[str, Optional[float]]:
+    if not len(values_ms):
+        return {"n": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    v = np.asarray(values_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(v, [50, 95, 99])
+    return {"n": int(v.size), "mean_ms": float(v.mean()), "p50_ms": float(p50),
+            "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(v.max())}
+
+
+def env_info() -> Dict:
+    root = Path(__file__).resolve().parent.parent
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, timeout=10).stdout.strip()
+        except Exception:
+            return None
+    return {
+        "git_rev": git("rev-parse", "--short", "HEAD"),
+        "git_dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_report(report: Dict, path: Path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[bench] saved {path}")
+
+
+def compare_reports(base: Dict, cur: Dict, tolerance: float = 0.10,
+                    metrics: Sequence[str] = ("p50_ms", "p95_ms", "p99_ms")) -> List[Dict]:
+    """
+    stages(지연, 낮을수록 좋음) / throughput(높을수록 좋음) 를 항목별 비교.
+    상대 변화가 tolerance 를 넘어 나빠지면 regressed=True
+    """
+    rows = []
+    for stage, cs in cur.get("stages", {}).items():
+        bs = base.get("stages", {}).get(stage)
+        if not bs:
+            continue
+        for m in metrics:
+            b, c = bs.get(m), cs.get(m)
+            if b is None or c is None or b <= 0:
+                continue
+            d = (c - b) / b
+            rows.append({"item": stage, "metric": m, "base": b, "cur": c, "delta": d, "regressed": d > tolerance})
+    for k, c in cur.get("throughput", {}).items():
+        b = base.get("throughput", {}).get(k)
+        if b is None or c is None or b <= 0:
+            continue
+        d = (c - b) / b
+        rows.append({"item": "throughput", "metric": k, "base": b, "cur": c, "delta": d, "regressed": d < -tolerance})
+    return rows
+
+
+def print_compare(rows: List[Dict], base: Dict, cur: Dict):
+    rev = lambda r: (r.get("env") or {}).get("git_rev") or "?"
+    print(f"\nbase={rev(base)}  cur={rev(cur)}")
+    print(f"{'item':<16}{'metric':<16}{'base':>11}{'cur':>11}{'delta':>9}")
+    for r in rows:
+        flag = "  ⚠️ REGRESSION" if r["regressed"] else ""
+        print(f"{r['item']:<16}{r['metric']:<16}{r['base']:11.2f}{r['cur']:11.2f}{r['delta'] * 100:8.1f}%{flag}")
+
+
+def print_stages(report: Dict):
+    print(f"{'stage':<16}{'n':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    f = lambda v: f"{v:10.2f}" if v is not None else f"{'-':>10}"
+    for name, s in report["stages"].items():
+        print(f"{name:<16}{s['n']:6d}{f(s['mean_ms'])}{f(s['p50_ms'])}{f(s['p95_ms'])}{f(s['p99_ms'])}")
+    for k, v in report.get("throughput", {}).items():
+        print(f"{k}: {v:.2f}")
+
+
+# ===================== 단계별 측정 =====================
+def time_stages(model, le, data: bytes) -> Tuple[Dict[str, Optional[float]], Dict]:
+    """이미지 1장의 단계별 ms (predict_one 과 같은 함수·같은 입력으로 개별 실행) + predict_one 결과"""
+    t: Dict[str, Optional[float]] = {}
+
+    def lap(name, fn, *args, **kw):
+        t0 = time.perf_counter()
+        out = fn(*args, **kw)
+        t[name] = (time.perf_counter() - t0) * 1000.0
+        return out
+
+    arr = lap("decode", le.decode_rgb, data)
+    out_mn = lap("mn_forward", le.infer_batch, model.mn, [arr], model.Tmn_vec)
+    out_rn = lap("rn_forward", le.infer_batch, model.rn, [arr], model.Trn_vec)
+
+    def _leaf():
+        work, hsv, _ = le.signal_input(arr)
+        le._leaf_metrics_arr(work, hsv)
+        return work, hsv
+    work, hsv = lap("leaf_metrics", _leaf)
+    lap("color_signals", le.color_signals, work, hsv)
+
+    lap("tta_quick", le.tta_quick_predict, model.mn, model.rn, arr, model.Tmn_vec, model.Trn_vec, views=le.TTAViews(arr))
+    views = le.TTAViews(arr)
+    lap("tta2", le.tta2_predict, model.mn, model.rn, arr, model.Tmn_vec, model.Trn_vec, views=views)
+    if model.rn_rice is not None:  # predict_one 과 같이 TTA 뷰/MN 결과를 공유 → rice expert 추가분만
+        lap("rice_expert", le.tta2_predict, model.mn, model.rn_rice, arr, model.Tmn_vec, model.Trn_vec, views=views)
+    else:
+        t["rice_expert"] = None
+
+    if model._class_guard is not None:
+        pm, pr = out_mn["probs"][0], out_rn["probs"][0]
+        pe = le.ensemble_probs(pm, pr)
+        ke = int(pe.argmax())
+        lap("guard", model._class_guard,
+            mn_label=model.classes[int(out_mn["idx"][0])], mn_conf=float(out_mn["conf"][0]),
+            rn_label=model.classes[int(out_rn["idx"][0])], rn_conf=float(out_rn["conf"][0]),
+            ens_label=model.classes[ke], ens_conf=float(pe[ke]),
+            picked_model="Ensemble", picked_label=model.classes[ke], picked_conf=float(pe[ke]))
+    else:
+        t["guard"] = None
+
+    pred = lap("predict_one", model.predict_one, arr)
+    return t, pred
+
+
+def run(corpus: List[Dict], warmup: int = 2, repeat: int = 1, backend: Optional[str] = None,
+        cascade: Optional[bool] = None) -> Dict:
+    try:
+        from . import leaf_ensemble as le
+        from .bulk_score import load_model
+    except ImportError:
+        import leaf_ensemble as le
+        from bulk_score import load_model
+    import torch
+
+    kwargs = {k: v for k, v in dict(backend=backend, cascade=cascade).items() if v is not None}
+    model = load_model(**kwargs)
+    for _ in range(warmup):
+        time_stages(model, le, corpus[0]["data"])
+
+    samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+    by_size: Dict[str, List[float]] = {}
+    paths, reasons = Counter(), Counter()
+    for _ in range(repeat):
+        for item in corpus:
+            t, pred = time_stages(model, le, item["data"])
+            for k, v in t.items():
+                if v is not None:
+                    samples[k].append(v)
+            key = f"{item['w']}x{item['h']}"
+            by_size.setdefault(key, []).append(t["decode"] + t["predict_one"])
+            meta = pred.get("meta", {})
+            paths[meta.get("path", "full")] += 1
+            reasons[str(meta.get("reason"))] += 1
+
+    serve = [d + p for d, p in zip(samples["decode"], samples["predict_one"])]
+    return {
+        "kind": "infer",
+        "env": {**env_info(), "torch": torch.__version__, "torch_threads": torch.get_num_threads(),
+                "device": le.DEVICE, "backends": model.backends, "model_version": model.version,
+                "random_weights": "random" in model.backends.values()},
+        "config": {"images": len(corpus), "repeat": repeat, "warmup": warmup,
+                   "sizes": sorted({f"{c['w']}x{c['h']}" for c in corpus}),
+                   "cascade": model.cascade is not None},
+        "stages": {k: summarize(v) for k, v in samples.items()},
+        "by_size": {k: summarize(v) for k, v in sorted(by_size.items())},
+        "throughput": {
+            "predict_one_ips": len(samples["predict_one"]) / (sum(samples["predict_one"]) / 1000.0),
+            "decode_predict_ips": len(serve) / (sum(serve) / 1000.0),
+        },
+        "paths": dict(paths),
+        "reasons": dict(reasons.most_common()),
+    }
+
+
+def _parse_size(s: str) -> Tuple[int, int]:
+    w, h = s.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=28, help="합성 이미지 수 (해상도 순환)")
+    ap.add_argument("--sizes", type=_parse_size, nargs="+", default=SIZES, help="WxH 목록")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--images", type=Path, default=None, help="합성 대신 실제 이미지 폴더/매니페스트")
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--threads", type=int, default=None, help="torch.set_num_threads")
+    ap.add_argument("--backend", default=None, help="INFER_BACKEND 덮어쓰기")
+    ap.add_argument("--cascade", action="store_true", default=None)
+    ap.add_argument("--no-random", action="store_true", help="체크포인트 없으면 실패 (무작위 가중치 금지)")
+    ap.add_argument("--out", type=Path, default=None, help="기준선 JSON 저장 경로")
+    ap.add_argument("--compare", type=Path, default=None, help="비교할 기준선 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="회귀 판정 상대 변화")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    if not args.no_random:
+        os.environ.setdefault("ALLOW_RANDOM_WEIGHTS", "1")
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    corpus = folder_corpus(args.images, args.n) if args.images else synthetic_corpus(args.n, args.sizes, args.seed)
+    if not corpus:
+        raise SystemExit("[bench_infer] 측정할 이미지가 없습니다")
+    report = run(corpus, args.warmup, args.repeat, args.backend, args.cascade)
+    report["config"]["corpus"] = str(args.images) if args.images else {"synthetic_seed": args.seed, "n": args.n}
+    print_stages(report)
+    if args.out:
+        save_report(report, args.out)
+    if args.compare:
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        rows = compare_reports(base, report, args.tolerance)
+        print_compare(rows, base, report)
+        if args.fail_on_regression and any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
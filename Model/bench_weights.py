@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+워커별 상주 메모리 벤치마크 (WEIGHTS_MMAP off vs safetensors/torch mmap)
+- 모드마다 N개 프로세스를 동시에 띄워 각자 LeafEnsemble 로드 + 워밍업 추론 1회 후,
+  모두 살아있는 상태에서 /proc/self/smaps_rollup 의 RSS / PSS / Shared / Private 수집
+- PSS 합계가 실제 노드 메모리 사용량 (공유 페이지는 워커 수로 나눠 계산됨)
+- 사용: python -m Model.bench_weights [--workers 4] [--modes off safetensors torch] [--out bench_weights.json]
+"""
+
+from __future__ import annotations
+import argparse, json, os
+import multiprocessing as mp
+from typing import Dict, List, Optional
+
+
+def _worker(mode: str, barrier, q):
+    os.environ["WEIGHTS_MMAP"] = mode
+    os.environ.setdefault("INFER_BACKEND", "eager")
+    import numpy as np
+    from PIL import Image
+    try:
+        from .weights_store import memory_stats
+        from .bulk_score import load_model
+    except ImportError:
+        from weights_store import memory_stats
+        from bulk_score import load_model
+
+    before = memory_stats()
+    model = load_model()
+    im = Image.fromarray(np.random.default_rng(0).integers(0, 255, (512, 512, 3), dtype=np.uint8))
+    model.predict_one(im)  # 가중치 페이지 접근 + 활성화 버퍼 할당까지 포함
+    barrier.wait()         # 모든 워커가 로드된 상태에서 측정 (PSS 공유분 반영)
+    q.put({"pid": os.getpid(), "before": before, "after": memory_stats(), "load_ms": model.load_ms})
+    barrier.wait()
+
+
+def run_mode(mode: str, workers: int) -> Dict:
+    ctx = mp.get_context("spawn")
+    barrier, q = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, barrier, q)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [q.get() for _ in range(workers)]
+    for p in procs:
+        p.join()
+
+    def avg(key):
+        vals = [r["after"][key] for r in rows if r["after"][key] is not None]
+        return sum(vals) / len(vals) if vals else None
+
+    pss = [r["after"]["pss"] for r in rows if r["after"]["pss"] is not None]
+    return {
+        "mode": mode,
+        "workers": workers,
+        "avg_rss_mb": avg("rss"),
+        "avg_pss_mb": avg("pss"),
+        "avg_private_mb": avg("private"),
+        "avg_shared_mb": avg("shared"),
+        "total_pss_mb": sum(pss) if pss else None,
+        "per_worker": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="mmap 가중치 공유 메모리 벤치마크")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--modes", nargs="+", default=["off", "safetensors"], choices=["off", "safetensors", "torch"])
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args(argv)
+
+    # 변환은 측정 전에 끝내 둠 (첫 워커의 변환 비용·임시 메모리가 측정에 섞이지 않도록)
+    try:
+        from .weights_store import ensure_mapped
+        from .leaf_ensemble import CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT, WEIGHTS_DIR
+    except ImportError:
+        from weights_store import ensure_mapped
+        from leaf_ensemble import CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT, WEIGHTS_DIR
+    for mode in args.modes:
+        if mode != "off":
+            for ckpt in (CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT):
+                if ckpt.is_file():
+                    ensure_mapped(ckpt, WEIGHTS_DIR, mode)
+
+    results = [run_mode(m, args.workers) for m in args.modes]
+    print(f"{'mode':<12}{'workers':>8}{'rss':>10}{'pss':>10}{'private':>10}{'shared':>10}{'Σpss':>10}  (MB)")
+    for r in results:
+        f = lambda v: f"{v:10.1f}" if v is not None else f"{'-':>10}"
+        print(f"{r['mode']:<12}{r['workers']:>8}{f(r['avg_rss_mb'])}{f(r['avg_pss_mb'])}"
+              f"{f(r['avg_private_mb'])}{f(r['avg_shared_mb'])}{f(r['total_pss_mb'])}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
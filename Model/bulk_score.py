@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+오프라인 대량 재채점 CLI
+- 디렉터리(재귀) 또는 매니페스트(.txt 한 줄에 경로 1개 / .jsonl 의 "path")를 입력으로 받아
+  워커 프로세스들에 샤딩, 워커마다 LeafEnsemble 1개 + 로더 스레드 풀(선디코드)로 배치 추론
+- 결과는 워커별 part 파일로 배치마다 바로 기록 (JSONL 또는 Parquet)
+- 라벨은 /api/predict 와 같은 서빙 컷오프(Gate/AgreeOverride/Top1Override, Backend/services/decision.py) 적용 후 기록
+- 출력 폴더가 곧 체크포인트: 재실행 시 이미 기록된 경로는 건너뜀 (모델 버전이 다르면 --force 필요)
+- 사용: python -m Model.bulk_score <input> --out <dir> [--workers 4] [--batch 16] [--format jsonl|parquet]
+"""
+
+from __future__ import annotations
+import argparse, json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import multiprocessing as mp
+
+try:
+    from .decode import decode_rgb
+except ImportError:
+    from decode import decode_rgb
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+RUN_META = "_run.json"
+
+
+# ===================== 입력 수집 =====================
+def collect_inputs(src: Path, exts: Iterable[str] = IMAGE_EXTS) -> List[str]:
+    """디렉터리 재귀 탐색 또는 매니페스트 파일 → 정렬된 절대 경로 목록"""
+    src = Path(src)
+    exts = {e.lower() for e in exts}
+    if src.is_dir():
+        return sorted(str(p.resolve()) for p in src.rglob("*") if p.is_file() and p.suffix.lower() in exts)
+
+    base = src.parent
+    out = []
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            p = json.loads(line)["path"] if src.suffix.lower() == ".jsonl" else line
+            p = Path(p)
+            out.append(str((p if p.is_absolute() else base / p).resolve()))
+    return out
+
+
+def shard(paths: List[str], n: int, i: int) -> List[str]:
+    """라운드로빈 샤딩 (폴더별로 몰린 큰 이미지가 한 워커에 쏠리지 않도록)"""
+    return paths[i::n]
+
+
+# ===================== 출력 / 재개 =====================
+class PartWriter:
+    """워커별 결과 기록기. jsonl 은 part 파일에 append, parquet 은 배치마다 조각 파일 추가"""
+
+    def __init__(self, out_dir: Path, worker: int, fmt: str):
+        self.out_dir = Path(out_dir)
+        self.worker = worker
+        self.fmt = fmt
+        if fmt == "parquet":
+            import pyarrow  # noqa: F401  (없으면 시작 시점에 실패)
+        self._f = None
+        self._seq = len(self._parquet_parts())
+
+    def _jsonl_path(self) -> Path:
+        return self.out_dir / f"part-{self.worker:03d}.jsonl"
+
+    def _parquet_parts(self) -> List[Path]:
+        return sorted(self.out_dir.glob(f"part-{self.worker:03d}-*.parquet"))
+
+    def write(self, records: List[Dict]):
+        if not records:
+            return
+        if self.fmt == "jsonl":
+            if self._f is None:
+                self._f = open(self._jsonl_path(), "a", encoding="utf-8")
+            for r in records:
+                self._f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            self._f.flush()
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            path = self.out_dir / f"part-{self.worker:03d}-{self._seq:06d}.parquet"
+            tmp = path.with_suffix(".parquet.tmp")
+            pq.write_table(pa.Table.from_pylist(records), tmp)
+            os.replace(tmp, path)  # 조각 단위 원자적 기록
+            self._seq += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def done_paths(out_dir: Path, fmt: str, retry_errors: bool = False) -> Set[str]:
+    """
+    출력 폴더의 모든 part 파일에서 이미 기록된 경로 수집 (워커 수가 바뀌어도 재개 가능).
+    retry_errors 면 오류 행은 제외해 다시 채점 (jsonl 은 같은 경로의 뒤쪽 행이 최신)
+    """
+    done: Set[str] = set()
+    failed: Set[str] = set()
+    if fmt == "jsonl":
+        for part in sorted(Path(out_dir).glob("part-*.jsonl")):
+            with open(part, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 중단 시점의 잘린 마지막 줄
+                    (failed if rec.get("error") else done).add(rec["path"])
+    else:
+        import pyarrow.parquet as pq
+        for part in sorted(Path(out_dir).glob("part-*.parquet")):
+            t = pq.read_table(part, columns=["path", "error"]).to_pydict()
+            for p, err in zip(t["path"], t["error"]):
+                (failed if err else done).add(p)
+    return done if retry_errors else done | failed
+
+
+def _check_run_meta(out_dir: Path, version: str, force: bool):
+    """출력 폴더의 모델 버전 기록과 비교 (다른 가중치/규칙 결과가 섞이지 않도록)"""
+    meta_path = out_dir / RUN_META
+    if meta_path.is_file():
+        prev = json.loads(meta_path.read_text(encoding="utf-8")).get("model_version")
+        if prev != version and not force:
+            raise SystemExit(
+                f"[bulk_score] {out_dir} 는 다른 모델 버전({prev}) 결과입니다. 현재 {version}. "
+                f"새 폴더를 쓰거나 --force 로 덮어쓰세요."
+            )
+        if prev != version:
+            for p in list(out_dir.glob("part-*.jsonl")) + list(out_dir.glob("part-*.parquet")):
+                p.unlink()
+    meta_path.write_text(json.dumps({"model_version": version, "started": time.time()}, indent=2), encoding="utf-8")
+
+
+# ===================== 워커 =====================
+def _serving():
+    """서빙(/api/predict)과 같은 컷오프 결정 함수 + 설정 지문 (Backend/services/decision.py, torch 무관)"""
+    root = Path(__file__).resolve().parent.parent
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    from Backend.services import decision
+    return decision
+
+
+def load_model(**kwargs):
+    """LeafEnsemble + 서빙과 동일한 클래스 가드 (kwargs 는 LeafEnsemble 인자)"""
+    try:
+        from .leaf_ensemble import LeafEnsemble
+    except ImportError:
+        from leaf_ensemble import LeafEnsemble
+    # 서빙과 동일한 클래스 가드 주입 (Backend/services/guard.py)
+    root = Path(__file__).resolve().parent.parent
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    from Backend.services.guard import ClassGuard, GuardConfig
+
+    model = LeafEnsemble(**kwargs)
+    model._class_guard = ClassGuard(GuardConfig.from_env())
+    return model
+
+
+def _decode(path: str):
+    try:
+        return decode_rgb(path), None
+    except Exception as e:
+        return None, f"decode: {e}"
+
+
+def _record(path: str, version: str, pred: Optional[Dict] = None, error: Optional[str] = None) -> Dict:
+    if pred is None:
+        return {"path": path, "label": None, "confidence": None, "model": None, "reason": None,
+                "mn_label": None, "mn_conf": None, "rn_label": None, "rn_conf": None,
+                "model_version": version, "error": error}
+    picked, meta = pred.get("picked", {}), pred.get("meta", {})
+    return {
+        "path": path,
+        "label": picked.get("label"),
+        "confidence": picked.get("confidence"),
+        "model": picked.get("model"),
+        "reason": meta.get("reason"),
+        "mn_label": pred["mobilenet"]["label"],
+        "mn_conf": pred["mobilenet"]["confidence"],
+        "rn_label": pred["resnet50"]["label"],
+        "rn_conf": pred["resnet50"]["confidence"],
+        "model_version": version,
+        "error": None,
+    }
+
+
+def run_worker(worker: int, todo: List[str], out_dir: str, version: str, fmt: str,
+               batch: int, loaders: int, prefetch: int, threads: int, log_every: float = 10.0) -> Dict:
+    import torch
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+    writer = PartWriter(Path(out_dir), worker, fmt)
+    stats = {"worker": worker, "assigned": len(todo), "scored": 0, "errors": 0,
+             "seconds": 0.0, "images_per_sec": 0.0}
+    model = load_model()
+    apply_decision = _serving().apply_decision
+    t0 = t_log = time.perf_counter()
+
+    # 로더 풀: 최대 prefetch 배치 분량을 앞서 디코드
+    with ThreadPoolExecutor(max_workers=max(1, loaders), thread_name_prefix=f"load{worker}") as pool:
+        it = iter(todo)
+        window: deque = deque()
+
+        def _fill():
+            while len(window) < batch * max(1, prefetch):
+                p = next(it, None)
+                if p is None:
+                    return
+                window.append((p, pool.submit(_decode, p)))
+
+        _fill()
+        while window:
+            chunk = [window.popleft() for _ in range(min(batch, len(window)))]
+            _fill()
+            records, ims, ok_paths = [], [], []
+            for p, fut in chunk:
+                im, err = fut.result()
+                if im is None:
+                    records.append(_record(p, version, error=err))
+                else:
+                    ims.append(im); ok_paths.append(p)
+            if ims:
+                try:
+                    preds = model.predict_many(ims)
+                    for pred in preds:
+                        apply_decision(pred)  # picked 를 서빙과 같은 Gate/Agree/Top1 컷오프로 갱신
+                    records.extend(_record(p, version, pred) for p, pred in zip(ok_paths, preds))
+                except Exception as e:
+                    records.extend(_record(p, version, error=f"predict: {e}") for p in ok_paths)
+            writer.write(records)
+            stats["scored"] += len(records)
+            stats["errors"] += sum(1 for r in records if r["error"])
+
+            now = time.perf_counter()
+            if now - t_log >= log_every:
+                t_log = now
+                rate = stats["scored"] / (now - t0)
+                print(f"[bulk_score] worker {worker}: {stats['scored']}/{len(todo)} ({rate:.1f} img/s)", flush=True)
+
+    writer.close()
+    stats["seconds"] = time.perf_counter() - t0
+    stats["images_per_sec"] = stats["scored"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+
+# ===================== CLI =====================
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="LeafEnsemble 대량 재채점")
+    ap.add_argument("input", type=Path, help="이미지 디렉터리 또는 매니페스트(.txt/.jsonl)")
+    ap.add_argument("--out", type=Path, required=True, help="결과/체크포인트 폴더")
+    ap.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    ap.add_argument("--threads", type=int, default=0, help="워커당 torch 스레드 (0=cpu_count/workers)")
+    ap.add_argument("--loaders", type=int, default=2, help="워커당 디코드 스레드")
+    ap.add_argument("--batch", type=int, default=16)
+    ap.add_argument("--prefetch", type=int, default=2, help="앞서 디코드할 배치 수")
+    ap.add_argument("--retry-errors", action="store_true", help="오류로 기록된 이미지도 다시 채점")
+    ap.add_argument("--force", action="store_true", help="모델 버전이 다른 기존 결과를 지우고 다시 채점")
+    args = ap.parse_args(argv)
+
+    try:
+        from .leaf_ensemble import model_version
+    except ImportError:
+        from leaf_ensemble import model_version
+
+    paths = collect_inputs(args.input)
+    if not paths:
+        raise SystemExit(f"[bulk_score] 입력 이미지가 없습니다: {args.input}")
+    args.out.mkdir(parents=True, exist_ok=True)
+    # 서빙 컷오프·가드 설정도 버전에 포함 (설정이 바뀌면 다른 재채점 결과)
+    version = f"{model_version()}|{_serving().decision_version()}"
+    _check_run_meta(args.out, version, args.force)
+
+    done = done_paths(args.out, args.format, args.retry_errors)
+    todo = [p for p in paths if p not in done]
+    skipped = len(paths) - len(todo)
+    if not todo:
+        print(f"[bulk_score] 모든 이미지({len(paths)})가 이미 채점되었습니다: {args.out}")
+        return
+
+    workers = max(1, min(args.workers, len(todo)))
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+    print(f"[bulk_score] {len(todo)} images to score ({skipped} already done), "
+          f"{workers} workers × {threads} threads, model {version}", flush=True)
+
+    t0 = time.perf_counter()
+    results = []
+    ctx = mp.get_context("spawn")  # torch 스레드 풀과 fork 충돌 방지
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+        futs = [
+            ex.submit(run_worker, w, shard(todo, workers, w), str(args.out), version, args.format,
+                      args.batch, args.loaders, args.prefetch, threads)
+            for w in range(workers)
+        ]
+        for f in as_completed(futs):
+            s = f.result()
+            results.append(s)
+            print(f"[bulk_score] worker {s['worker']}: scored={s['scored']} "
+                  f"errors={s['errors']} {s['images_per_sec']:.1f} img/s", flush=True)
+
+    wall = time.perf_counter() - t0
+    scored = sum(s["scored"] for s in results)
+    summary = {
+        "model_version": version,
+        "images": len(paths),
+        "scored": scored,
+        "skipped": skipped,
+        "errors": sum(s["errors"] for s in results),
+        "wall_seconds": wall,
+        "images_per_sec": scored / wall if wall > 0 else 0.0,
+        "workers": sorted(results, key=lambda s: s["worker"]),
+    }
+    (args.out / "_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"[bulk_score] done: {scored} scored in {wall:.1f}s ({summary['images_per_sec']:.1f} img/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+업로드 이미지 디코드 파이프라인 (torch 비의존 — Backend/image_utils 와 공유)
+- 바이트/파일 핸들/경로 → uint8 HWC RGB(또는 BGR) C-연속 ndarray 1개
+- JPEG 이 필요한 해상도보다 훨씬 크면 DCT 스케일링(1/2, 1/4, 1/8)으로 축소 디코드
+  (cv2 IMREAD_REDUCED_COLOR_*, cv2 가 없으면 PIL draft)
+- EXIF 회전은 적용하지 않음 (기존 PIL Image.open().convert("RGB") 과 동일 픽셀 방향)
+"""
+
+from __future__ import annotations
+import io, os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+# -------- Optional cv2 ----------
+try:
+    import cv2
+    _HAS_CV2 = True
+    _REDUCED = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+except Exception:
+    _HAS_CV2 = False
+    _REDUCED = {}
+
+# 축소 디코드 후에도 보장할 짧은 변(px). 0이면 항상 원본 해상도로 디코드 (기본)
+# ⚠️ 같은 배열이 compute_signals 에도 쓰이므로 >0 이면 leaf/edge/lab/sat/hi/water 신호가 달라져
+#    v4.6.6 게이트·veto 판정이 코랩 규칙과 어긋날 수 있음 (SIGNAL_WORK_SIZE 와 같은 성격, 명시적으로 켤 때만)
+DECODE_MIN_SIDE = int(os.getenv("DECODE_MIN_SIDE", "0"))
+
+Source = Union[bytes, bytearray, memoryview, str, Path, "io.IOBase", Image.Image, np.ndarray]
+
+
+def _read_bytes(src) -> bytes:
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return bytes(src) if isinstance(src, memoryview) else src
+    if isinstance(src, (str, Path)):
+        return Path(src).read_bytes()
+    if hasattr(src, "seek"):
+        src.seek(0)
+    return src.read()
+
+
+def _header(buf: bytes) -> Optional[Tuple[int, int, str]]:
+    """헤더만 읽어 (w, h, format) — 픽셀 디코드 없음"""
+    try:
+        with Image.open(io.BytesIO(buf)) as im:
+            return im.size[0], im.size[1], (im.format or "")
+    except Exception:
+        return None
+
+
+def reduce_factor(w: int, h: int, min_side: int = 0, min_long: int = 0) -> int:
+    """짧은 변 ≥ min_side, 긴 변 ≥ min_long 을 지키는 가장 큰 DCT 축소 배율 (1, 2, 4, 8)"""
+    if not (min_side or min_long):
+        return 1
+    for f in (8, 4, 2):
+        if (not min_side or min(w, h) // f >= min_side) and (not min_long or max(w, h) // f >= min_long):
+            return f
+    return 1
+
+
+def decode_rgb(src: Source, min_side: Optional[int] = None, min_long: int = 0, bgr: bool = False) -> np.ndarray:
+    """
+    이미지 1장을 uint8 HWC 배열로 디코드.
+    min_side: 축소 디코드 후 보장할 짧은 변 (기본 DECODE_MIN_SIDE), min_long: 긴 변 기준 하한
+    bgr=True 면 OpenCV 채널 순서 그대로 반환 (image_utils 용)
+    """
+    if isinstance(src, np.ndarray):
+        return src
+    if isinstance(src, Image.Image):
+        arr = np.array(src.convert("RGB") if src.mode != "RGB" else src)
+        return np.ascontiguousarray(arr[..., ::-1]) if bgr else arr
+
+    if min_side is None:
+        min_side = DECODE_MIN_SIDE
+    buf = _read_bytes(src)
+    hdr = _header(buf)
+    f = reduce_factor(hdr[0], hdr[1], min_side, min_long) if (hdr and hdr[2] == "JPEG") else 1
+
+    if _HAS_CV2:
+        flag = _REDUCED.get(f, cv2.IMREAD_COLOR) | cv2.IMREAD_IGNORE_ORIENTATION
+        arr = cv2.imdecode(np.frombuffer(buf, np.uint8), flag)
+        if arr is not None:
+            if arr.ndim == 2:
+                arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR)
+            if not bgr:
+                cv2.cvtColor(arr, cv2.COLOR_BGR2RGB, dst=arr)  # 제자리 변환 (추가 버퍼 없음)
+            return arr
+
+    # PIL 폴백 (cv2 미설치 / cv2 미지원 포맷)
+    with Image.open(io.BytesIO(buf)) as im:
+        if f > 1:
+            im.draft("RGB", (im.size[0] // f, im.size[1] // f))
+        arr = np.array(im.convert("RGB"))
+    return np.ascontiguousarray(arr[..., ::-1]) if bgr else arr
+
+
+def as_rgb_array(img) -> np.ndarray:
+    """PIL / ndarray 모두 허용하는 규칙·신호 함수용 정규화 (ndarray 는 복사 없이 그대로)"""
+    if isinstance(img, np.ndarray):
+        return img
+    return np.array(img.convert("RGB") if img.mode != "RGB" else img)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+캐스케이드(MN 우선 조기 종료) 오프라인 평가 / "certain" 영역 적합
+- 입력: 라벨 폴더(<root>/<class_name>/*.jpg) 또는 매니페스트 .jsonl ({"path", "label"})
+- 이미지마다 전체 앙상블(predict_one, cascade 끔) 결과와 MN 단독 특징(conf/margin/entropy/신호)을 1회 수집
+  → --features 로 캐시해 두면 적합/평가를 모델 없이 반복 가능
+- 평가: 현재 영역(CASCADE_JSON 또는 기본값)의 skip 비율, 전체 대비 정확도 차이, 추정 지연 이득
+- 적합(--fit): 정확도 하락 ≤ --max-drop, 생략 샘플 정밀도 ≥ --min-precision 을 만족하며 skip 비율 최대인 영역 탐색
+  --write 면 calibration/cascade_v1.json 저장
+- 사용: python -m Model.eval_cascade <data> [--features feats.jsonl] [--fit --write]
+"""
+
+from __future__ import annotations
+import argparse, itertools, json, time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from . import leaf_ensemble as le
+    from .bulk_score import collect_inputs, load_model
+except ImportError:
+    import leaf_ensemble as le
+    from bulk_score import collect_inputs, load_model
+
+GRID = dict(
+    conf_min=[0.90, 0.92, 0.94, 0.95, 0.96, 0.97, 0.98, 0.99, 0.995],
+    margin_min=[0.50, 0.60, 0.70, 0.80, 0.90, 0.95],
+    entropy_max=[0.05, 0.10, 0.15, 0.25, 0.40, 0.60],
+    leaf_min=[0.05, 0.10, 0.15, 0.25],
+    gy_min=[0.05, 0.10, 0.15],
+)
+_THRESH_KEYS = tuple(GRID.keys())
+
+
+# ===================== 특징 수집 =====================
+def _labeled_inputs(src: Path) -> List[Dict]:
+    src = Path(src)
+    if src.is_dir():
+        return [{"path": p, "label": Path(p).parent.name} for p in collect_inputs(src)]
+    with open(src, "r", encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+
+def collect_features(items: List[Dict], limit: Optional[int] = None) -> List[Dict]:
+    """전체 앙상블 결과 + MN 단독 특징. base_ok 는 임계값과 무관한 조건(제외 클래스·leaf 게이트·water veto)"""
+    model = load_model(cascade=False)
+    permissive = dict(le.CASCADE, conf_min=0.0, margin_min=0.0, entropy_max=float("inf"), leaf_min=0.0, gy_min=0.0)
+    rows = []
+    for it in items[:limit]:
+        try:
+            im = le.decode_rgb(it["path"])
+        except Exception as e:
+            print(f"[eval_cascade] skip {it['path']}: {e}")
+            continue
+
+        t0 = time.perf_counter()
+        out_mn = le.infer_batch(model.mn, [im], model.Tmn_vec)
+        sig = le.compute_signals(im)
+        t_mn = time.perf_counter() - t0
+        model.cascade = permissive
+        base_ok = model._cascade_certain(out_mn, sig)
+        model.cascade = None
+
+        t0 = time.perf_counter()
+        full = model.predict_one(im)
+        t_full = time.perf_counter() - t0
+
+        rows.append({
+            "path": it["path"], "truth": it["label"],
+            "full_label": full["picked"]["label"],
+            "mn_label": model.classes[int(out_mn["idx"][0])],
+            "conf": float(out_mn["conf"][0]), "margin": float(out_mn["margin"][0]),
+            "entropy": le.entropy(out_mn["probs"][0]),
+            "leaf": sig.leaf_area, "gy": sig.gy, "base_ok": bool(base_ok),
+            "t_mn_ms": t_mn * 1000.0, "t_full_ms": t_full * 1000.0,
+        })
+    return rows
+
+
+# ===================== 평가 / 적합 =====================
+class Features:
+    """특징 행 → numpy 열 (영역 평가 벡터화)"""
+
+    def __init__(self, rows: List[Dict]):
+        self.n = len(rows)
+        col = lambda k, dt=np.float64: np.array([r[k] for r in rows], dtype=dt)
+        self.conf, self.margin, self.entropy = col("conf"), col("margin"), col("entropy")
+        self.leaf, self.gy = col("leaf"), col("gy")
+        self.base_ok = col("base_ok", bool)
+        truth = np.array([r["truth"] for r in rows], dtype=object)
+        self.full_ok = np.array([r["full_label"] for r in rows], dtype=object) == truth
+        self.mn_ok = np.array([r["mn_label"] for r in rows], dtype=object) == truth
+        self.t_mn, self.t_full = col("t_mn_ms"), col("t_full_ms")
+
+    def skip_mask(self, region: Dict) -> np.ndarray:
+        return (self.base_ok & (self.conf >= region["conf_min"]) & (self.margin >= region["margin_min"])
+                & (self.entropy <= region["entropy_max"]) & (self.leaf >= region["leaf_min"]) & (self.gy >= region["gy_min"]))
+
+    def evaluate(self, region: Dict) -> Dict:
+        skip = self.skip_mask(region)
+        casc_ok = np.where(skip, self.mn_ok, self.full_ok)
+        acc_full, acc_casc = float(self.full_ok.mean()), float(casc_ok.mean())
+        t_full = float(self.t_full.mean())
+        t_casc = float(np.where(skip, self.t_mn, self.t_full).mean())
+        return {
+            "n": self.n,
+            "skip_rate": float(skip.mean()),
+            "acc_full": acc_full,
+            "acc_cascade": acc_casc,
+            "acc_delta": acc_casc - acc_full,
+            "skipped_precision": float(self.mn_ok[skip].mean()) if skip.any() else None,
+            "flips_vs_full": int((skip & (self.mn_ok != self.full_ok)).sum()),
+            "mean_ms_full": t_full,
+            "mean_ms_cascade_est": t_casc,
+            "speedup_est": (t_full / t_casc) if t_casc > 0 else None,
+        }
+
+    def fit(self, max_drop: float, min_precision: float) -> Optional[Dict]:
+        best, best_key = None, None
+        for values in itertools.product(*GRID.values()):
+            region = dict(zip(_THRESH_KEYS, values))
+            skip = self.skip_mask(region)
+            if not skip.any():
+                continue
+            if float(self.mn_ok[skip].mean()) < min_precision:
+                continue
+            drop = float(self.full_ok.mean()) - float(np.where(skip, self.mn_ok, self.full_ok).mean())
+            if drop > max_drop:
+                continue
+            # skip 비율 최대, 동률이면 더 보수적인(임계값이 높은) 영역
+            key = (int(skip.sum()), region["conf_min"], region["margin_min"], -region["entropy_max"])
+            if best_key is None or key > best_key:
+                best, best_key = region, key
+        return best
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="캐스케이드 skip 비율 / 정확도 차이 평가 및 영역 적합")
+    ap.add_argument("data", type=Path, nargs="?", help="라벨 폴더 또는 매니페스트(.jsonl)")
+    ap.add_argument("--features", type=Path, default=None, help="특징 캐시 JSONL (있으면 재사용, 없으면 생성)")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--fit", action="store_true")
+    ap.add_argument("--max-drop", type=float, default=0.002, help="허용 정확도 하락 (절대값)")
+    ap.add_argument("--min-precision", type=float, default=0.995, help="생략 샘플의 MN 정확도 하한")
+    ap.add_argument("--write", action="store_true", help=f"적합 결과를 {le.CASCADE_JSON} 에 저장")
+    args = ap.parse_args(argv)
+
+    if args.features and args.features.is_file():
+        rows = [json.loads(l) for l in args.features.read_text(encoding="utf-8").splitlines() if l.strip()]
+    else:
+        if args.data is None:
+            ap.error("data 또는 기존 --features 파일이 필요합니다")
+        rows = collect_features(_labeled_inputs(args.data), args.limit)
+        if args.features:
+            args.features.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows), encoding="utf-8")
+    if not rows:
+        raise SystemExit("[eval_cascade] 평가할 이미지가 없습니다")
+    feats = Features(rows)
+
+    region = {k: le.CASCADE[k] for k in _THRESH_KEYS}
+    report = {"current": {"region": region, **feats.evaluate(region)}}
+    if args.fit:
+        fitted = feats.fit(args.max_drop, args.min_precision)
+        if fitted is None:
+            print("[eval_cascade] 조건을 만족하는 영역이 없습니다 (--max-drop / --min-precision 완화 필요)")
+        else:
+            report["fitted"] = {"region": fitted, **feats.evaluate(fitted)}
+            if args.write:
+                le.CASCADE_JSON.parent.mkdir(parents=True, exist_ok=True)
+                le.CASCADE_JSON.write_text(json.dumps({
+                    "region": fitted,
+                    "fitted_on": {"data": str(args.data or args.features), "n": feats.n,
+                                  "max_drop": args.max_drop, "min_precision": args.min_precision},
+                    "metrics": report["fitted"],
+                    "model_version": le.model_version(),
+                }, indent=2, ensure_ascii=False), encoding="utf-8")
+                print(f"[eval_cascade] wrote {le.CASCADE_JSON}")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
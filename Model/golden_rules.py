@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 엔진 골든 테스트: predict_one(이미지별 기존 코드) 과 predict_batch(rule_engine 규칙 표) 결과가 같은지 확인
+- real : 합성/실제 이미지 코퍼스 → forward_base 1회 → 같은 base 로 predict_one N번 vs predict_batch 1번
+- fuzz : 임계값 주변에 몰린 신호 + 특정 클래스로 뾰족한 확률을 합성해 모든 분기(veto/구제/완화/TTA/가드)를 고르게 통과
+- meta.timings 를 뺀 결과 dict 를 그대로 비교 (--atol 지정 시 실수만 허용 오차). 하나라도 다르면 종료 코드 1
+- 체크포인트가 없으면 무작위 가중치로 동작 (ALLOW_RANDOM_WEIGHTS, 완전 오프라인)
+- 사용:
+    python -m Model.golden_rules --mode real --n 56
+    python -m Model.golden_rules --mode fuzz --n 2000 --seed 1 [--batch 32]
+"""
+
+from __future__ import annotations
+import argparse, math, os, sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# ===================== 비교 =====================
+def _strip(pred: Dict) -> Dict:
+    out = dict(pred)
+    meta = dict(out.get("meta") or {})
+    meta.pop("timings", None)
+    out["meta"] = meta
+    return out
+
+
+def diff(a: Any, b: Any, atol: float = 0.0, path: str = "") -> List[str]:
+    """a/b 의 다른 위치 목록 (dict/list 재귀, 실수는 atol 허용)"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = []
+        for k in sorted(set(a) | set(b), key=str):
+            if k not in a or k not in b:
+                out.append(f"{path}.{k}: {'없음' if k not in a else a[k]!r} != {'없음' if k not in b else b[k]!r}")
+            else:
+                out += diff(a[k], b[k], atol, f"{path}.{k}")
+        return out
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)) and len(a) == len(b):
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in diff(x, y, atol, f"{path}[{i}]")]
+    if isinstance(a, float) and isinstance(b, float):
+        same = (a == b) or (math.isnan(a) and math.isnan(b)) or (atol > 0 and abs(a - b) <= atol)
+        return [] if same else [f"{path}: {a!r} != {b!r}"]
+    return [] if (type(a) is type(b) and a == b) else [f"{path}: {a!r} != {b!r}"]
+
+
+# ===================== 입력 =====================
+def real_cases(model, n: int, seed: int, images: Optional[Path]):
+    """(이미지, base, 신호=None) — base 는 실제 forward_base 결과"""
+    try:
+        from .bench_infer import folder_corpus, synthetic_corpus
+        from .decode import decode_rgb
+    except ImportError:
+        from bench_infer import folder_corpus, synthetic_corpus
+        from decode import decode_rgb
+    corpus = folder_corpus(images, n) if images else synthetic_corpus(n, seed=seed)
+    ims = [decode_rgb(c["data"]) for c in corpus]
+    return ims, model.forward_base(ims), [None] * len(ims)
+
+
+def _fake_out(p: np.ndarray):
+    import torch
+    probs = torch.tensor(p, dtype=torch.float32)[None, :]
+    top2 = probs.topk(2, dim=1)
+    return {"probs": probs, "conf": top2.values[:, 0], "margin": top2.values[:, 0] - top2.values[:, 1],
+            "idx": probs.argmax(1), "time": 0.0}
+
+
+def fuzz_cases(model, n: int, seed: int, size: int = 96):
+    """
+    (이미지, base, 신호) 합성. 신호는 LEAF_GATE/NECROSIS/RICE/CONSENSUS 등 임계값 ± 작은 폭에서 뽑고,
+    MN/RN 확률은 같은/다른/rice/가드 대상 클래스로 뾰족하게 → 이미지는 TTA·rice expert 입력으로만 쓰임
+    """
+    try:
+        from .bench_infer import synthetic_image
+        from .leaf_ensemble import GUARD_CFG, RELAX_RULES, ImageSignals, is_rice_label
+    except ImportError:
+        from bench_infer import synthetic_image
+        from leaf_ensemble import GUARD_CFG, RELAX_RULES, ImageSignals, is_rice_label
+    rng = np.random.default_rng(seed)
+    classes = model.classes
+    c = len(classes)
+    special = [i for i, k in enumerate(classes) if k in GUARD_CFG or k in RELAX_RULES or is_rice_label(k)
+               or k in ("Strawberry___Leaf_scorch", "Cherry___Powdery_mildew",
+                        "Orange___Haunglongbing_(Citrus_greening)") or k.endswith("___healthy")]
+
+    def pick():
+        return int(rng.choice(special)) if special and rng.random() < 0.7 else int(rng.integers(c))
+
+    def probs(k: int) -> np.ndarray:
+        z = rng.normal(0, 1, c)
+        z[k] += rng.choice([0.5, 2.0, 4.0, 7.0, 12.0])
+        if rng.random() < 0.3:  # 2위 경쟁 (margin/엔트로피 경계)
+            z[pick()] += rng.uniform(0, 6)
+        e = np.exp(z - z.max())
+        return e / e.sum()
+
+    def near(*pts, lo=0.0, hi=1.0):
+        return float(np.clip(rng.choice(pts) + rng.normal(0, 0.02), lo, hi)) if rng.random() < 0.8 \
+            else float(rng.uniform(lo, hi))
+
+    ims, bases, sigs = [], [], []
+    for i in range(n):
+        km = pick()
+        kr = km if rng.random() < 0.5 else pick()
+        bases.append((_fake_out(probs(km)), _fake_out(probs(kr))))
+        sigs.append(ImageSignals(
+            leaf_area=near(0.015, 0.02, 0.035, 0.05, 0.12, 0.15, 0.25, 0.35),
+            exg_mean=near(-0.30, 0.0, lo=-1.5, hi=1.5),
+            gy=near(0.03, 0.05, 0.06, 0.08, 0.12, 0.15, 0.24),
+            bbox=None,
+            exg_mean_box=near(-0.15, -0.10, -0.05, -0.02, 0.2, lo=-1.5, hi=1.5),
+            red_frac_box=near(0.0, 0.25, 0.30, 0.5),
+            edge_den_box=near(0.0, 0.02, 0.05, lo=0.0, hi=0.3),
+            lab_a=near(-10.0, 0.0, 10.0, lo=-40.0, hi=40.0),
+            lab_b=near(0.0, 15.0, 30.0, lo=-40.0, hi=60.0),
+            aspect=near(1.0, 3.0, 6.0, 8.0, lo=1.0, hi=12.0),
+            sat=near(0.10, 0.12, 0.15, 0.35, 0.65),
+            hi=near(0.0, 0.1, 0.3, 0.55),
+            water_frac=near(0.0, 0.05, 0.15, 0.30, 0.5),
+        ))
+        ims.append(synthetic_image(size, size, seed * 100003 + i))
+    return ims, bases, sigs
+
+
+# ===================== 실행 =====================
+def run(model, ims, bases, sigs, batch: int, atol: float = 0.0, show: int = 5) -> Dict:
+    try:
+        from .timings import Timings
+    except ImportError:
+        from timings import Timings
+    n = len(ims)
+    reasons: Counter = Counter()
+    mismatches = []
+    for s in range(0, n, batch):
+        sl = slice(s, min(n, s + batch))
+        got = model.predict_batch(ims[sl], bases=bases[sl], signals=sigs[sl])
+        for j, g in enumerate(got):
+            i = s + j
+            ref = model._predict_one(ims[i], bases[i], Timings(), sigs[i])
+            reasons[str((ref.get("meta") or {}).get("reason")).split("(")[0].split(" ")[0]] += 1
+            d = diff(_strip(ref), _strip(g), atol)
+            if d:
+                mismatches.append({"index": i, "diff": d})
+    print(f"[golden_rules] {n}장 비교, 불일치 {len(mismatches)}건")
+    print("사유 분포: " + ", ".join(f"{k}={v}" for k, v in reasons.most_common()))
+    for m in mismatches[:show]:
+        print(f"  #{m['index']}: " + " | ".join(m["diff"][:4]))
+    return {"n": n, "mismatches": mismatches, "reasons": dict(reasons)}
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mode", choices=["real", "fuzz"], default="fuzz")
+    ap.add_argument("--n", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--batch", type=int, default=32, help="predict_batch 1회 이미지 수")
+    ap.add_argument("--images", type=Path, default=None, help="real 모드: 합성 대신 실제 이미지 폴더/매니페스트")
+    ap.add_argument("--atol", type=float, default=0.0, help="실수 비교 허용 오차 (기본 0 = 비트 단위 동일)")
+    ap.add_argument("--threads", type=int, default=None, help="torch.set_num_threads")
+    ap.add_argument("--no-random", action="store_true", help="체크포인트 없으면 실패 (무작위 가중치 금지)")
+    args = ap.parse_args(argv)
+
+    if not args.no_random:
+        os.environ.setdefault("ALLOW_RANDOM_WEIGHTS", "1")
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    try:
+        from .bulk_score import load_model
+    except ImportError:
+        from bulk_score import load_model
+
+    model = load_model(cascade=False)
+    with torch.inference_mode():
+        if args.mode == "real":
+            ims, bases, sigs = real_cases(model, args.n, args.seed, args.images)
+        else:
+            ims, bases, sigs = fuzz_cases(model, args.n, args.seed)
+        report = run(model, ims, bases, sigs, max(1, args.batch), args.atol)
+    if report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
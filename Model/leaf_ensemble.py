@@ -7,7 +7,8 @@ LeafEnsemble Serving (v4.6.6 rules port)
 """
 
 from __future__ import annotations
-import os, json, time, random
+import os, json, time, random, hashlib, threading, zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -26,6 +27,17 @@ try:
 except Exception:
     _HAS_CV2 = False
 
+try:
+    from .backends import INFER_BACKEND, prepare as prepare_backend, calibration_images
+    from .weights_store import WEIGHTS_MMAP, build_model
+    from .decode import DECODE_MIN_SIDE, decode_rgb, as_rgb_array
+    from .timings import Timings
+except ImportError:
+    from backends import INFER_BACKEND, prepare as prepare_backend, calibration_images
+    from weights_store import WEIGHTS_MMAP, build_model
+    from decode import DECODE_MIN_SIDE, decode_rgb, as_rgb_array
+    from timings import Timings
+
 # ===================== PATHS / CONFIG =====================
 MODEL_DIR = Path(os.getenv("MODEL_DIR", Path(__file__).parent)).resolve()
 WEIGHTS_DIR = Path(os.getenv("WEIGHTS_DIR", MODEL_DIR / "weights")).resolve()
@@ -41,6 +53,9 @@ TEMP_SCALAR_JSON    = Path(os.getenv("TEMP_SCALAR_JSON",    MODEL_DIR / "calibra
 
 IMG_SIZE = int(os.getenv("IMG_SIZE", "224"))
 
+# 체크포인트가 없으면 무작위 초기화 가중치로 대체 (오프라인 벤치마크 전용 — 예측 결과는 의미 없음)
+ALLOW_RANDOM_WEIGHTS = os.getenv("ALLOW_RANDOM_WEIGHTS", "0").lower() in ("1", "true", "on", "yes")
+
 def _select_device() -> str:
     """CUDA 가능 시 GPU, 아니면 CPU 선택 + 1회 확인 메시지 출력"""
     if torch.cuda.is_available():
@@ -165,6 +180,71 @@ RICE = dict(
     gate_alt_leaf_min=0.22, gate_alt_aspect_min=3.0, gate_alt_mr_max=0.30, gate_alt_cr_max=0.60,
 )
 
+# ======= CASCADE (opt-in): MN 이 확실하면 RN/TTA 생략 =======
+CASCADE_MODE = os.getenv("CASCADE_MODE", "0").lower() in ("1", "true", "on", "yes")
+CASCADE_JSON = Path(os.getenv("CASCADE_JSON", MODEL_DIR / "calibration" / "cascade_v1.json"))
+# 보정셋 적합 결과가 없을 때의 보수적 기본 "certain" 영역 (Top1Override 0.98 보다 엄격)
+CASCADE_DEFAULT = dict(
+    conf_min=0.98, margin_min=0.95, entropy_max=0.15,
+    leaf_min=0.15, gy_min=0.10,
+    exclude_rice=True,  # rice expert 하이브리드 대상은 항상 전체 경로
+    exclude_classes=["Strawberry___Leaf_scorch", "Orange___Haunglongbing_(Citrus_greening)"],  # 전용 veto 규칙 대상
+)
+
+def load_cascade_cfg(path: Path = CASCADE_JSON) -> Dict:
+    """calibration/cascade_v1.json 의 "region" 으로 기본값 덮어쓰기 (Model/eval_cascade.py --fit 산출물)"""
+    cfg = dict(CASCADE_DEFAULT)
+    if path.is_file():
+        try:
+            cfg.update(json.loads(path.read_text(encoding="utf-8")).get("region", {}))
+        except Exception as e:
+            print(f"[LeafEnsemble] cascade 설정 로드 실패 → 기본값 사용 ({e})")
+    return cfg
+
+CASCADE = load_cascade_cfg()
+
+# 다중 이미지 규칙 평가: "vector" → rule_engine 규칙 표로 N장 한 번에, "scalar" → 이미지별 predict_one (결과 동일)
+RULE_ENGINE = os.getenv("RULE_ENGINE", "vector").lower()
+
+RULES_VERSION = "v4.6.6"
+
+def _file_stamp(p: Path):
+    try:
+        st = p.stat()
+        return [str(p), st.st_size, st.st_mtime_ns]
+    except OSError:
+        return [str(p), None, None]
+
+def _version_blob(cascade: Optional[Dict] = None) -> Dict:
+    """model_version 의 파일/설정 부분 (백엔드 제외) — 로드 전에 찍어 두기 위해 분리"""
+    return {
+        "rules": RULES_VERSION,
+        "ckpt": [_file_stamp(CKPT_MN), _file_stamp(CKPT_RN), _file_stamp(CKPT_RN_RICE_EXPERT)],
+        "calib": [_file_stamp(TEMP_CLASSWISE_JSON), _file_stamp(TEMP_SCALAR_JSON), _file_stamp(CLASS_TO_IDX_JSON)],
+        # cascade 사용 중이면 설정 파일도 지문에 포함 → 파일 수정이 MODEL_WATCH_SEC 자동 리로드를 트리거
+        "cascade_file": _file_stamp(CASCADE_JSON) if (cascade is not None or CASCADE_MODE) else None,
+        "cfg": dict(ENSEMBLE=ENSEMBLE, T_FLOOR=T_FLOOR, IMG_SIZE=IMG_SIZE, DECODE_MIN_SIDE=DECODE_MIN_SIDE, SIGNAL_WORK_SIZE=SIGNAL_WORK_SIZE, ENTROPY=ENTROPY, RN_PREF=RN_PREF,
+                    LEAF_GATE=LEAF_GATE, NECROSIS=NECROSIS, GLOBAL_OOD=GLOBAL_OOD, GUARD_CFG=GUARD_CFG,
+                    CLASS_ENTROPY_RELAX=CLASS_ENTROPY_RELAX, RELAX_RULES=RELAX_RULES, OVERRIDE=OVERRIDE,
+                    CONSENSUS=CONSENSUS, RNHIGH=RNHIGH, RICE=RICE,
+                    CASCADE=cascade if cascade is not None else (CASCADE if CASCADE_MODE else None)),
+        **({"random_weights": True} if ALLOW_RANDOM_WEIGHTS else {}),
+    }
+
+def model_version(cascade: Optional[Dict] = None, backends: Optional[Dict[str, str]] = None,
+                  blob: Optional[Dict] = None) -> str:
+    """
+    가중치/보정(T)/규칙 설정 지문. 결과 캐시 키 등에 사용.
+    체크포인트·보정 파일의 크기+mtime 과 규칙 dict 전체를 해시 (파일 내용은 읽지 않음)
+    cascade: 인스턴스가 읽은 cascade 설정 (없으면 import 시점 CASCADE)
+    backends: 인스턴스가 실제로 준비한 구성요소별 백엔드 (폴백 반영). 없으면 INFER_BACKEND
+    blob: 미리 찍어 둔 _version_blob (없으면 지금 계산)
+    """
+    blob = dict(blob if blob is not None else _version_blob(cascade))
+    blob["backend"] = dict(sorted(backends.items())) if backends else INFER_BACKEND
+    digest = hashlib.sha1(json.dumps(blob, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+    return f"{RULES_VERSION}-{digest}"
+
 # ===================== UTILS / METRICS =====================
 def _excess_green(arr_rgb):
     r = arr_rgb[...,0].astype(np.float32)
@@ -191,6 +271,25 @@ def _bbox_from_mask(mask, pad=4):
     y2 = min(mask.shape[0]-1, y2+pad); x2 = min(mask.shape[1]-1, x2+pad)
     return (y1,x1,y2,x2)
 
+def _largest_component(mask_uint8, pad=4):
+    """
+    최대 연결요소 (mask, area, bbox) 를 connectedComponentsWithStats 통계로 한 번에 추출.
+    라벨별 (labels==lab).sum() 루프(O(요소수 x H x W)) 대신 O(H x W).
+    동점이면 라벨 번호가 작은 쪽 (기존 루프와 동일), 요소가 없으면 bbox=None.
+    """
+    num, labels, stats, _ = cv2.connectedComponentsWithStats(mask_uint8, connectivity=8)
+    if num <= 1:
+        return mask_uint8*0, 0, None
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    max_lab = int(np.argmax(areas)) + 1
+    max_area = int(areas[max_lab-1])
+    mask_largest = (labels==max_lab).astype(np.uint8)
+    x, y = int(stats[max_lab, cv2.CC_STAT_LEFT]), int(stats[max_lab, cv2.CC_STAT_TOP])
+    bw, bh = int(stats[max_lab, cv2.CC_STAT_WIDTH]), int(stats[max_lab, cv2.CC_STAT_HEIGHT])
+    H, W = mask_uint8.shape[:2]
+    bbox = (max(0, y-pad), max(0, x-pad), min(H-1, y+bh-1+pad), min(W-1, x+bw-1+pad))
+    return mask_largest, max_area, bbox
+
 def _edge_density(mask_uint8):
     if not _HAS_CV2 or mask_uint8 is None: return 0.0
     edges = cv2.Canny(mask_uint8, 60, 120)
@@ -204,11 +303,12 @@ def _lab_stats(arr_rgb, mask=None):
         a = a[mask.astype(bool)]; b = b[mask.astype(bool)]
     return float(np.mean(a)), float(np.mean(b))
 
-def _adaptive_hsv_mask(arr):
+def _adaptive_hsv_mask(arr, hsv=None):
     if not _HAS_CV2:
         g = arr[...,1].astype(np.int32); r = arr[...,0].astype(np.int32); b = arr[...,2].astype(np.int32)
         return (g - ((r+b)//2) > 18).astype(np.uint8)
-    hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
+    if hsv is None:
+        hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
     H,S,V = hsv[...,0], hsv[...,1], hsv[...,2]
     clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
     Vc = clahe.apply(V)
@@ -220,24 +320,18 @@ def _adaptive_hsv_mask(arr):
     mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN,  k, iterations=1)
     return mask
 
-def leaf_metrics(img_pil: Image.Image):
-    arr = np.array(img_pil.convert("RGB"))
+def _leaf_metrics_arr(arr, hsv=None):
     h,w,_ = arr.shape
-    mask0 = _adaptive_hsv_mask(arr)
+    mask0 = _adaptive_hsv_mask(arr, hsv)
     if _HAS_CV2:
-        num, labels = cv2.connectedComponents(mask0)
-        max_area=0; max_lab=0
-        for lab in range(1,num):
-            area = int((labels==lab).sum())
-            if area>max_area: max_area=area; max_lab=lab
-        mask_largest = (labels==max_lab).astype(np.uint8) if max_lab>0 else (mask0*0)
+        mask_largest, max_area, bbox = _largest_component(mask0, pad=4)
         leaf_area = max_area/float(h*w)
     else:
         mask_largest = mask0; leaf_area = float(mask0.mean())
+        bbox = _bbox_from_mask(mask_largest, pad=4)
 
     gy_ratio = float(mask0.mean())
     exg = _excess_green(arr); exg_mean = float(exg.mean())
-    bbox = _bbox_from_mask(mask_largest, pad=4)
 
     if bbox is not None:
         y1,x1,y2,x2 = bbox
@@ -259,15 +353,17 @@ def leaf_metrics(img_pil: Image.Image):
     return (leaf_area, exg_mean, gy_ratio, bbox, exg_mean_box,
             red_frac_box, mask_largest, edge_den_box, lab_a, lab_b, aspect)
 
-def highlight_ratio(img_pil, thresh=240):
-    im = np.asarray(img_pil.convert("RGB"))
+def leaf_metrics(img_pil: Image.Image):
+    return _leaf_metrics_arr(np.array(img_pil.convert("RGB")))
+
+def _highlight_arr(im, thresh=240):
     gray = (0.299*im[...,0] + 0.587*im[...,1] + 0.114*im[...,2])
     return float((gray >= thresh).mean())
 
-def saturation_ratio(img_pil, s_thresh=60):
-    arr = np.array(img_pil.convert("RGB"))
+def _saturation_arr(arr, hsv=None, s_thresh=60):
     if _HAS_CV2:
-        hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
+        if hsv is None:
+            hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
         S = hsv[...,1]
         return float((S >= s_thresh).mean())
     r = arr[...,0].astype(np.float32); g = arr[...,1].astype(np.float32); b = arr[...,2].astype(np.float32)
@@ -275,14 +371,81 @@ def saturation_ratio(img_pil, s_thresh=60):
     sat = (np.abs(r-mean)+np.abs(g-mean)+np.abs(b-mean))/3.0
     return float((sat >= 30).mean())
 
-def water_like_ratio(img_pil, h_lo=70, h_hi=110, s_lo=100):
-    arr = np.array(img_pil.convert("RGB"))
+def _water_arr(arr, hsv=None, h_lo=70, h_hi=110, s_lo=100):
     if not _HAS_CV2: return 0.0
-    hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
-    H, S, V = hsv[...,0], hsv[...,1], hsv[...,2]
+    if hsv is None:
+        hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
+    H, S = hsv[...,0], hsv[...,1]
     mask = (H >= h_lo) & (H <= h_hi) & (S >= s_lo)
     return float(mask.mean())
 
+def highlight_ratio(img_pil, thresh=240):
+    return _highlight_arr(np.asarray(img_pil.convert("RGB")), thresh)
+
+def saturation_ratio(img_pil, s_thresh=60):
+    return _saturation_arr(np.array(img_pil.convert("RGB")), s_thresh=s_thresh)
+
+def water_like_ratio(img_pil, h_lo=70, h_hi=110, s_lo=100):
+    return _water_arr(np.array(img_pil.convert("RGB")), h_lo=h_lo, h_hi=h_hi, s_lo=s_lo)
+
+# ===================== FUSED IMAGE SIGNALS =====================
+# 신호 계산용 작업 해상도(긴 변 px). 0이면 원본 해상도 그대로(코랩 규칙과 동일 수치)
+SIGNAL_WORK_SIZE = int(os.getenv("SIGNAL_WORK_SIZE", "0"))
+
+class ImageSignals:
+    """predict_one 규칙에 쓰이는 이미지 신호 묶음 (RGB/HSV 변환 1회로 계산)"""
+    __slots__ = ("leaf_area", "exg_mean", "gy", "bbox", "exg_mean_box", "red_frac_box",
+                 "edge_den_box", "lab_a", "lab_b", "aspect", "sat", "hi", "water_frac", "scale")
+
+    def __init__(self, leaf_area, exg_mean, gy, bbox, exg_mean_box, red_frac_box,
+                 edge_den_box, lab_a, lab_b, aspect, sat, hi, water_frac, scale=1.0):
+        self.leaf_area = leaf_area; self.exg_mean = exg_mean; self.gy = gy; self.bbox = bbox
+        self.exg_mean_box = exg_mean_box; self.red_frac_box = red_frac_box
+        self.edge_den_box = edge_den_box; self.lab_a = lab_a; self.lab_b = lab_b
+        self.aspect = aspect; self.sat = sat; self.hi = hi; self.water_frac = water_frac
+        self.scale = scale  # 작업 해상도 / 원본 해상도 (bbox 좌표계)
+
+    def as_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f"ImageSignals(leaf={self.leaf_area:.3f}, gy={self.gy:.3f}, sat={self.sat:.3f}, hi={self.hi:.3f}, water={self.water_frac:.3f})"
+
+def signal_input(img, work_size: Optional[int] = None) -> Tuple[np.ndarray, Optional[np.ndarray], float]:
+    """compute_signals 의 공통 입력: (작업 해상도 RGB 배열, HSV 배열 또는 None, 축소 배율)"""
+    arr = as_rgb_array(img)
+    if work_size is None:
+        work_size = SIGNAL_WORK_SIZE
+    scale = 1.0
+    h, w = arr.shape[:2]
+    if work_size and max(h, w) > work_size and _HAS_CV2:
+        scale = work_size / float(max(h, w))
+        arr = cv2.resize(arr, (max(1, round(w*scale)), max(1, round(h*scale))), interpolation=cv2.INTER_AREA)
+    arr = np.ascontiguousarray(arr)
+    hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV) if _HAS_CV2 else None
+    return arr, hsv, scale
+
+def color_signals(arr: np.ndarray, hsv: Optional[np.ndarray]) -> Tuple[float, float, float]:
+    """(saturation, highlight, water_frac) — signal_input() 결과를 그대로 사용"""
+    return (_saturation_arr(arr, hsv), _highlight_arr(arr),
+            _water_arr(arr, hsv, h_lo=RICE["water_veto_h_lo"], h_hi=RICE["water_veto_h_hi"], s_lo=RICE["water_veto_s_lo"]))
+
+def compute_signals(img, work_size: Optional[int] = None) -> ImageSignals:
+    """
+    leaf_metrics / saturation_ratio / highlight_ratio / water_like_ratio 를 한 번에 계산.
+    - img: PIL 또는 decode_rgb() 의 uint8 HWC RGB 배열 (배열이면 복사 없이 사용)
+    - HSV 변환 1회를 모든 신호가 공유
+    - work_size(긴 변 px) 지정 시 그 해상도로 축소 후 계산 (기본: SIGNAL_WORK_SIZE, 0=원본)
+    """
+    arr, hsv, scale = signal_input(img, work_size)
+    (leaf_area, exg_mean, gy, bbox, exg_mean_box,
+     red_frac_box, _mask, edge_den_box, lab_a, lab_b, aspect) = _leaf_metrics_arr(arr, hsv)
+    sat, hi, water_frac = color_signals(arr, hsv)
+    return ImageSignals(
+        leaf_area, exg_mean, gy, bbox, exg_mean_box, red_frac_box, edge_den_box, lab_a, lab_b, aspect,
+        sat=sat, hi=hi, water_frac=water_frac, scale=scale,
+    )
+
 # ===================== MODEL / TEMPERATURE =====================
 def _canon(s: str):
     s = s.replace("___","_").replace(",", "").replace(" ","_")
@@ -342,15 +505,20 @@ def load_scalar_T(path: Path) -> Tuple[float, float]:
         return 1.0, 1.0
 
 # ===================== INFER / TTA / ENSEMBLE =====================
+# PIL 기준 전처리 (학습 스크립트와 동일, 참조용). 서빙 경로는 배열 → 텐서 직행인 input_tensor()
 tfm_eval = transforms.Compose([
     transforms.Resize((IMG_SIZE, IMG_SIZE)),
     transforms.ToTensor(),
     transforms.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225]),
 ])
 
+_NORM_MEAN = torch.tensor([0.485,0.456,0.406]).view(1,3,1,1)
+_NORM_STD  = torch.tensor([0.229,0.224,0.225]).view(1,3,1,1)
+
 @torch.inference_mode()
-def infer_batch(model, images: List[Image.Image], T_vec=None, return_logits=True):
-    x = torch.stack([tfm_eval(im) for im in images]).to(DEVICE, non_blocking=(DEVICE=="cuda"))
+def infer_tensor(model, x: torch.Tensor, T_vec=None, return_logits=True):
+    """이미 정규화된 [N,3,IMG_SIZE,IMG_SIZE] 텐서 배치 추론"""
+    x = x.to(DEVICE, non_blocking=(DEVICE=="cuda"))
     t0 = time.time()
     # 최신 API 사용, CPU에서는 비활성화하여 경고 제거
     if DEVICE == "cuda":
@@ -372,6 +540,18 @@ def infer_batch(model, images: List[Image.Image], T_vec=None, return_logits=True
     if return_logits: out["logits"]=z
     return out
 
+@torch.inference_mode()
+def infer_batch(model, images: List, T_vec=None, return_logits=True):
+    """images: PIL 또는 uint8 HWC RGB 배열 리스트"""
+    x = torch.cat([input_tensor(im) for im in images])
+    return infer_tensor(model, x, T_vec, return_logits)
+
+def _slice_out(out: Dict, i: int, n: int) -> Dict:
+    """infer_batch 결과에서 i번째 이미지만 [1, ...] 형태로 잘라냄 (배치 시간은 n등분)"""
+    sl = {k: v[i:i+1] for k, v in out.items() if torch.is_tensor(v)}
+    sl["time"] = out["time"] / max(1, n)
+    return sl
+
 def entropy(p: torch.Tensor) -> float:
     return float((-p.clamp_min(1e-12) * (p.clamp_min(1e-12)).log()).sum().item())
 
@@ -384,36 +564,97 @@ def ensemble_probs(pm, pr):
         pe = pe/pe.sum()
     return pe
 
-def _tta2_views(img_pil: Image.Image):
-    w,h = img_pil.size; crops=[]
-    s = int(min(w,h)*0.90); left=(w-s)//2; top=(h-s)//2
-    crops.append(img_pil.crop((left,top,left+s,top+s)))
-    s2 = int(min(w,h)*0.85)
-    crops.append(img_pil.crop((0,0,s2,s2)))
-    crops.append(img_pil.crop((w-s2,0,w,s2)))
-    crops.append(img_pil.crop((0,h-s2,s2,h)))
-    crops.append(img_pil.crop((w-s2,h-s2,w,h)))
-    views = crops + [c.transpose(Image.FLIP_LEFT_RIGHT) for c in crops]
-    return views
+def _resize_norm(x: torch.Tensor) -> torch.Tensor:
+    """[N,3,h,w] (0~1) → IMG_SIZE 로 일괄 리사이즈 + 정규화 (tfm_eval 과 동일: bilinear + antialias)"""
+    x = F.interpolate(x, size=(IMG_SIZE, IMG_SIZE), mode="bilinear", align_corners=False, antialias=True)
+    return (x - _NORM_MEAN.to(x.device)) / _NORM_STD.to(x.device)
+
+def _box_reduce(arr: np.ndarray, min_side: int) -> np.ndarray:
+    """uint8 HWC 를 짧은 변이 min_side 이상으로 남는 선까지 정수배 box 축소 (float 변환 전에 크기부터 줄임)"""
+    h, w = arr.shape[:2]
+    f = int(min(h, w) // max(1, min_side))
+    if f < 2:
+        return arr
+    if _HAS_CV2:
+        return cv2.resize(arr, (w // f, h // f), interpolation=cv2.INTER_AREA)
+    return np.asarray(Image.fromarray(arr).reduce(f))
+
+def _tensor01(arr: np.ndarray) -> torch.Tensor:
+    """uint8 HWC → [1,3,h,w] float 0~1 (torch.from_numpy 로 배열 메모리를 그대로 사용)"""
+    x = torch.from_numpy(np.ascontiguousarray(arr)).to(DEVICE).permute(2,0,1).unsqueeze(0)
+    return x.float().div_(255.0)
+
+def input_tensor(img) -> torch.Tensor:
+    """
+    기본 추론 입력 [1,3,IMG_SIZE,IMG_SIZE] (정규화 완료).
+    PIL Resize + ToTensor + Normalize(tfm_eval) 대신 배열에서 바로 텐서로:
+    uint8 상태로 box 축소 → float 1회 변환 → bilinear(antialias) 리사이즈 + 정규화
+    """
+    return _resize_norm(_tensor01(_box_reduce(as_rgb_array(img), IMG_SIZE)))
+
+class TTAViews:
+    """
+    이미지 1장의 TTA 뷰를 텐서로 1회만 생성하고 모델별 결과를 메모이즈.
+    - 디코드/ToTensor 1회, 크롭은 텐서 슬라이싱, 좌우반전은 torch.flip
+    - 같은 크기 크롭끼리 interpolate 1회로 일괄 리사이즈
+    - MN/RN/rice expert 가 동일한 뷰 텐서를 공유 (같은 모델·T 조합은 재추론 안 함)
+    """
+
+    def __init__(self, img):
+        self.img = as_rgb_array(img)
+        self._x01: Optional[torch.Tensor] = None
+        self._quick: Optional[torch.Tensor] = None
+        self._tta2: Optional[torch.Tensor] = None
+        self._memo: Dict[Tuple[str, int, int], torch.Tensor] = {}
+
+    def _full01(self) -> torch.Tensor:
+        if self._x01 is None:
+            # 가장 작은 크롭(0.85)도 IMG_SIZE 이상이 되는 선까지만 정수배 box 축소 (대용량 사진 float 버퍼 방지)
+            self._x01 = _tensor01(_box_reduce(self.img, int(np.ceil(IMG_SIZE / 0.85))))
+        return self._x01
+
+    def quick(self) -> torch.Tensor:
+        """[원본, 좌우반전] 2뷰"""
+        if self._quick is None:
+            v = _resize_norm(self._full01())
+            self._quick = torch.cat([v, torch.flip(v, dims=[3])], dim=0)
+        return self._quick
+
+    def tta2(self) -> torch.Tensor:
+        """center 0.90 + 네 모서리 0.85 크롭 + 각 좌우반전 = 10뷰"""
+        if self._tta2 is None:
+            x = self._full01(); h, w = x.shape[-2:]
+            s = int(min(w,h)*0.90); left=(w-s)//2; top=(h-s)//2
+            s2 = int(min(w,h)*0.85)
+            center = _resize_norm(x[..., top:top+s, left:left+s])
+            corners = torch.cat([
+                x[..., 0:s2, 0:s2], x[..., 0:s2, w-s2:w],
+                x[..., h-s2:h, 0:s2], x[..., h-s2:h, w-s2:w],
+            ], dim=0)
+            crops = torch.cat([center, _resize_norm(corners)], dim=0)
+            self._tta2 = torch.cat([crops, torch.flip(crops, dims=[3])], dim=0)
+        return self._tta2
+
+    def mean_probs(self, kind: str, model, T_vec) -> torch.Tensor:
+        key = (kind, id(model), id(T_vec))
+        if key not in self._memo:
+            x = self.quick() if kind == "quick" else self.tta2()
+            self._memo[key] = infer_tensor(model, x, T_vec, return_logits=False)["probs"].mean(dim=0)
+        return self._memo[key]
 
 @torch.inference_mode()
-def tta2_predict(mn, rn, img_pil, Tmn_vec, Trn_vec):
-    views = _tta2_views(img_pil)
-    out_mn = infer_batch(mn, views, Tmn_vec, return_logits=False)
-    out_rn = infer_batch(rn, views, Trn_vec, return_logits=False)
-    pm = out_mn["probs"].mean(dim=0); pr = out_rn["probs"].mean(dim=0)
+def tta2_predict(mn, rn, img_pil, Tmn_vec, Trn_vec, views: Optional[TTAViews] = None):
+    views = views or TTAViews(img_pil)
+    pm = views.mean_probs("tta2", mn, Tmn_vec); pr = views.mean_probs("tta2", rn, Trn_vec)
     def _cm(pv):
         top2 = pv.topk(2); return float(top2.values[0]), float(top2.values[0]-top2.values[1]), int(top2.indices[0])
     cm, mm, km = _cm(pm); cr, mr, kr = _cm(pr)
     return pm, pr, cm, cr, mm, mr, km, kr
 
 @torch.inference_mode()
-def tta_quick_predict(mn, rn, img_pil, Tmn_vec, Trn_vec):
-    v1 = img_pil
-    v2 = img_pil.transpose(Image.FLIP_LEFT_RIGHT)
-    out_mn = infer_batch(mn, [v1, v2], Tmn_vec, return_logits=False)
-    out_rn = infer_batch(rn, [v1, v2], Trn_vec, return_logits=False)
-    pm = out_mn["probs"].mean(dim=0); pr = out_rn["probs"].mean(dim=0)
+def tta_quick_predict(mn, rn, img_pil, Tmn_vec, Trn_vec, views: Optional[TTAViews] = None):
+    views = views or TTAViews(img_pil)
+    pm = views.mean_probs("quick", mn, Tmn_vec); pr = views.mean_probs("quick", rn, Trn_vec)
     tm = pm.topk(2); tr = pr.topk(2)
     cm = float(tm.values[0]); mm = float(tm.values[0] - tm.values[1])
     cr = float(tr.values[0]); mr = float(tr.values[0] - tr.values[1])
@@ -423,28 +664,59 @@ def tta_quick_predict(mn, rn, img_pil, Tmn_vec, Trn_vec):
 def is_rice_label(lbl: str) -> bool:
     return lbl.startswith("Rice___")
 
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000.0
+
+_RANDOM_INIT_LOCK = threading.Lock()
+
+def _random_model(arch, num_classes: int, name: str):
+    """이름별 고정 시드의 무작위 초기화 모델 (병렬 로드 중에도 전역 RNG 시드가 섞이지 않도록 잠금)"""
+    with _RANDOM_INIT_LOCK:
+        torch.manual_seed(zlib.crc32(name.encode("utf-8")))
+        m = arch(num_classes=num_classes)
+    print(f"[LeafEnsemble] ⚠️ {name}: 체크포인트 없음 → 무작위 가중치 (벤치마크 전용)")
+    return m.eval()
+
 # ===================== MODEL WRAPPER =====================
 class LeafEnsemble:
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None, cascade: Optional[bool] = None,
+                 allow_random: Optional[bool] = None):
         self.device = DEVICE
+        # allow_random: None 이면 ALLOW_RANDOM_WEIGHTS 환경변수 따름
+        allow_random = ALLOW_RANDOM_WEIGHTS if allow_random is None else allow_random
+        self.backend = (backend or INFER_BACKEND).lower()
+        # cascade: None 이면 CASCADE_MODE 환경변수 따름. 설정 파일은 인스턴스마다 다시 읽음 (핫 리로드)
+        self.cascade: Optional[Dict] = load_cascade_cfg() if (CASCADE_MODE if cascade is None else cascade) else None
+        # 이 인스턴스가 읽는 파일/설정 지문 — 로드 전에 찍어 둠 (로드 중 파일이 바뀌면 다음 지문이 달라져 다시 로드됨)
+        version_blob = _version_blob(self.cascade)
         # classes
         self.classes = _load_classes_from_class_to_idx(CLASS_TO_IDX_JSON)
         self.num_classes = len(self.classes)
 
-        # models
-        self.mn = torchvision.models.mobilenet_v2(num_classes=self.num_classes)
-        self.rn = torchvision.models.resnet50(num_classes=self.num_classes)
-        self.mn.load_state_dict(torch.load(str(CKPT_MN), map_location="cpu"))
-        self.rn.load_state_dict(torch.load(str(CKPT_RN), map_location="cpu"))
-        self.mn.to(self.device).eval(); self.rn.to(self.device).eval()
-
-        self.rn_rice = None
-        if CKPT_RN_RICE_EXPERT.is_file():
-            self.rn_rice = torchvision.models.resnet50(num_classes=self.num_classes)
-            state = torch.load(str(CKPT_RN_RICE_EXPERT), map_location="cpu")
-            if isinstance(state, dict) and "state_dict" in state: state = state["state_dict"]
-            self.rn_rice.load_state_dict(state)
-            self.rn_rice.to(self.device).eval()
+        # models — MN / RN / rice expert 체크포인트를 병렬 로드 (torch.load 는 I/O·역직렬화 중 GIL 해제)
+        # WEIGHTS_MMAP 이면 변환본을 mmap 해 워커 간 공유, 이후 INFER_BACKEND 에 따라 int8 / TorchScript / ONNX 로 변환
+        def _load(name, arch, ckpt: Path):
+            if allow_random and not ckpt.is_file():
+                return _random_model(arch, self.num_classes, name).to(self.device), "random"
+            m = build_model(arch, self.num_classes, ckpt, WEIGHTS_DIR, WEIGHTS_MMAP)
+            return prepare_backend(m, name, ckpt, WEIGHTS_DIR, IMG_SIZE, self.device,
+                                   self.backend, self.calibration_batches)
+
+        jobs = {"mn": (torchvision.models.mobilenet_v2, CKPT_MN), "rn": (torchvision.models.resnet50, CKPT_RN)}
+        if CKPT_RN_RICE_EXPERT.is_file() or allow_random:
+            jobs["rn_rice"] = (torchvision.models.resnet50, CKPT_RN_RICE_EXPERT)
+        self.load_ms: Dict[str, float] = {}
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="ckpt-load") as ex:
+            futs = {k: ex.submit(_timed, _load, k, *v) for k, v in jobs.items()}
+            loaded, self.backends = {}, {}
+            for k, f in futs.items():
+                (loaded[k], self.backends[k]), self.load_ms[k] = f.result()
+        self.mn, self.rn = loaded["mn"], loaded["rn"]
+        self.rn_rice = loaded.get("rn_rice")
+        # 버전에는 요청 백엔드가 아니라 실제로 준비된 백엔드(폴백 포함)를 반영
+        self.version = model_version(backends=self.backends, blob=version_blob)
 
         # T vec
         try:
@@ -464,16 +736,156 @@ class LeafEnsemble:
 
         if not hasattr(self, "_class_guard"):
             self._class_guard = None
+        self._rule_engine = None
+
+    @torch.inference_mode()
+    def warmup(self, n: int = 2) -> float:
+        """
+        고정 더미 이미지 n장으로 predict_many 1회 (forward 백엔드 초기화 / 규칙 표 컴파일 / TTA 경로).
+        가드 주입 후 호출. 소요 ms 반환
+        """
+        t0 = time.perf_counter()
+        colors = [(60, 140, 40), (120, 100, 80), (40, 170, 190)]
+        self.predict_many([np.full((IMG_SIZE, IMG_SIZE, 3), colors[i % len(colors)], dtype=np.uint8)
+                           for i in range(max(1, n))])
+        return (time.perf_counter() - t0) * 1000.0
+
+    @staticmethod
+    def calibration_batches(batch_size: int = 16):
+        """정적 int8 보정용 정규화 텐서 배치 (QUANT_CALIB_DIR, 서빙 전처리와 동일)"""
+        ims = calibration_images()
+        for i in range(0, len(ims), batch_size):
+            yield torch.cat([input_tensor(im) for im in ims[i:i+batch_size]])
+
+    @torch.inference_mode()
+    def forward_base(self, images: List) -> List[Tuple[Dict, Optional[Dict]]]:
+        """
+        MN/RN 기본 추론을 N장 배치로 1회씩 실행하고 이미지별 (out_mn, out_rn)으로 분할.
+        분할된 결과는 predict_one(im, base=...)에 그대로 넘길 수 있음.
+        cascade 모드면 MN 이 확실한 후보는 RN 배치에서 빼고 out_rn=None (신호 확인은 predict_one 에서)
+        """
+        images = [as_rgb_array(im) for im in images]
+        n = len(images)
+        out_mn = infer_batch(self.mn, images, self.Tmn_vec)
+        mn_parts = [_slice_out(out_mn, i, n) for i in range(n)]
+        need = [i for i in range(n) if not (self.cascade is not None and self._cascade_candidate(mn_parts[i]))]
+        rn_parts: List[Optional[Dict]] = [None] * n
+        if need:
+            out_rn = infer_batch(self.rn, [images[i] for i in need], self.Trn_vec)
+            for j, i in enumerate(need):
+                rn_parts[i] = _slice_out(out_rn, j, len(need))
+        return list(zip(mn_parts, rn_parts))
+
+    @torch.inference_mode()
+    def predict_many(self, images: List) -> List[Dict]:
+        """기본 추론은 배치로, 규칙 평가는 규칙 표로 N장 한 번에 (RULE_ENGINE=scalar 이면 이미지별 predict_one)"""
+        images = [as_rgb_array(im) for im in images]
+        if RULE_ENGINE != "scalar":
+            return self.predict_batch(images)
+        bases = self.forward_base(images)
+        return [self.predict_one(im, base=b) for im, b in zip(images, bases)]
+
+    def rule_engine(self):
+        """v4.6.6 규칙 표를 이 모델의 클래스 목록으로 컴파일한 평가기 (첫 사용 시 1회)"""
+        if self._rule_engine is None:
+            try:
+                from .rule_engine import RuleEngine
+            except ImportError:
+                from rule_engine import RuleEngine
+            self._rule_engine = RuleEngine(self)
+        return self._rule_engine
+
+    @torch.inference_mode()
+    def predict_batch(self, images: List, bases: Optional[List[Tuple[Dict, Optional[Dict]]]] = None,
+                      timings: Optional[List[Timings]] = None,
+                      signals: Optional[List["ImageSignals"]] = None) -> List[Dict]:
+        """
+        predict_one 을 N장에 적용한 것과 같은 결과 (Model/golden_rules.py 로 검증).
+        게이트/veto/엔트로피/CONSENSUS/RNHIGH/가드 규칙은 rule_engine 이 배열 단위로 한 번에 평가하고,
+        rice expert / TTA 는 조건에 걸린 이미지에만 실행.
+        bases: forward_base() 결과 (없으면 여기서). cascade 로 RN 이 빠진 이미지 중 certain 이 아닌 것은 RN 을 모아 1회 배치
+        timings: 이미지별 Timings (없으면 새로 생성) → meta.timings. signals: 미리 계산한 ImageSignals
+        """
+        images = [as_rgb_array(im) for im in images]
+        n = len(images)
+        if n == 0:
+            return []
+        tms = list(timings) if timings is not None else [Timings() for _ in range(n)]
+        before = [dict(tm.spans) for tm in tms]
+        bases = list(bases) if bases is not None else self.forward_base(images)
+        sigs = list(signals) if signals is not None else [None] * n
+        for i, (out_mn, out_rn) in enumerate(bases):
+            tms[i].add("mn_forward", out_mn["time"] * 1000.0)
+            if out_rn is not None:
+                tms[i].add("rn_forward", out_rn["time"] * 1000.0)
+            if sigs[i] is None:
+                with tms[i].span("signals"):
+                    sigs[i] = compute_signals(images[i])
+
+        results: List[Optional[Dict]] = [None] * n
+        need_rn = []
+        for i, (out_mn, out_rn) in enumerate(bases):
+            if out_rn is None:
+                if self.cascade is not None and self._cascade_certain(out_mn, sigs[i]):
+                    results[i] = self._pack_mn_only(out_mn, sigs[i])
+                else:
+                    need_rn.append(i)
+        if need_rn:
+            out_rn = infer_batch(self.rn, [images[i] for i in need_rn], self.Trn_vec)
+            for j, i in enumerate(need_rn):
+                part = _slice_out(out_rn, j, len(need_rn))
+                bases[i] = (bases[i][0], part)
+                tms[i].add("rn_forward", part["time"] * 1000.0)
+
+        todo = [i for i in range(n) if results[i] is None]
+        if todo:
+            outs = self.rule_engine().evaluate([images[i] for i in todo], [bases[i] for i in todo],
+                                               [sigs[i] for i in todo], [tms[i] for i in todo])
+            for i, out in zip(todo, outs):
+                results[i] = out
+        for out, tm, b in zip(results, tms, before):
+            # model_total: 이 이미지 몫의 단계 합 (배치 forward·규칙 평가는 N등분)
+            tm.add("model_total", sum(v - b.get(k, 0.0) for k, v in tm.spans.items()))
+            out.setdefault("meta", {})["timings"] = tm.as_dict()
+        return results
 
     @torch.inference_mode()
-    def predict_one(self, im: Image.Image) -> Dict:
+    def predict_one(self, im, base: Optional[Tuple[Dict, Dict]] = None, timings: Optional[Timings] = None) -> Dict:
         """
         코랩 규칙을 단일 이미지 서빙에 맞게 적용.
+        im: decode_rgb() 의 uint8 HWC RGB 배열 (PIL 도 허용 — 1회 배열 변환 후 모든 단계가 공유)
         반환 포맷은 backend/services/classifier.py 가 기대하는 구조를 따름.
+        base: forward_base()로 미리 계산한 (out_mn, out_rn). 없으면 여기서 추론.
+        cascade 모드: MN + 이미지 신호가 "certain" 영역이면 RN/TTA 없이 반환 (meta.path="mn_only")
+        timings: 단계별 ms 를 기록할 Timings (호출자와 공유, 없으면 새로 생성) → meta.timings
         """
-        # ---------- 1) 기본 추론 ----------
-        out_mn = infer_batch(self.mn, [im], self.Tmn_vec)
-        out_rn = infer_batch(self.rn, [im], self.Trn_vec)
+        tm = timings if timings is not None else Timings()
+        with tm.span("model_total"):
+            out = self._predict_one(im, base, tm)
+        out.setdefault("meta", {})["timings"] = tm.as_dict()
+        return out
+
+    def _predict_one(self, im, base: Optional[Tuple[Dict, Dict]], tm: Timings,
+                     sig: Optional["ImageSignals"] = None) -> Dict:
+        # ---------- 1) 기본 추론 (MN 먼저) ----------
+        im = as_rgb_array(im)
+        if base is None:
+            with tm.span("mn_forward"):
+                out_mn, out_rn = infer_batch(self.mn, [im], self.Tmn_vec), None
+        else:
+            # forward_base 배치 결과: 배치 forward 시간의 이미지별 몫
+            out_mn, out_rn = base
+            tm.add("mn_forward", out_mn["time"] * 1000.0)
+            if out_rn is not None:
+                tm.add("rn_forward", out_rn["time"] * 1000.0)
+        if sig is None:
+            with tm.span("signals"):
+                sig = compute_signals(im)
+        if out_rn is None:
+            if self.cascade is not None and self._cascade_certain(out_mn, sig):
+                return self._pack_mn_only(out_mn, sig)
+            with tm.span("rn_forward"):
+                out_rn = infer_batch(self.rn, [im], self.Trn_vec)
         pm0, pr0 = out_mn["probs"][0], out_rn["probs"][0]
         cm0, cr0 = float(out_mn["conf"][0]), float(out_rn["conf"][0])
         mm0, mr0 = float(out_mn["margin"][0]), float(out_rn["margin"][0])
@@ -481,13 +893,17 @@ class LeafEnsemble:
         lbl_mn0, lbl_rn0 = self.classes[km0], self.classes[kr0]
 
         # ---------- 2) 이미지 메트릭 ----------
-        (leaf_area, exg_mean, gy, bbox, exg_mean_box,
-         red_frac_box, mask_largest, edge_den_box, lab_a, lab_b, aspect) = leaf_metrics(im)
-        sat = saturation_ratio(im); hi = highlight_ratio(im)
+        leaf_area, exg_mean, gy = sig.leaf_area, sig.exg_mean, sig.gy
+        exg_mean_box, red_frac_box, edge_den_box = sig.exg_mean_box, sig.red_frac_box, sig.edge_den_box
+        lab_a, lab_b, aspect = sig.lab_a, sig.lab_b, sig.aspect
+        sat, hi = sig.sat, sig.hi
         p_avg0 = 0.5*(pm0+pr0)
 
         # water veto
-        water_frac = water_like_ratio(im, h_lo=RICE["water_veto_h_lo"], h_hi=RICE["water_veto_h_hi"], s_lo=RICE["water_veto_s_lo"])
+        water_frac = sig.water_frac
+
+        # TTA 뷰 텐서는 필요할 때 1회만 생성 (rice expert / 엔트로피 TTA 공유)
+        views = TTAViews(im)
 
         # leaf 판단
         is_leaf = (leaf_area >= LEAF_GATE["area_min"]) and (exg_mean >= LEAF_GATE["exg_min"])
@@ -579,7 +995,8 @@ class LeafEnsemble:
         # 전문가 적용(부분치환 대신 안전한 soft blend)
         pr_used = pr0.clone()
         if trigger_rice_expert:
-            pmE, prE, cmE, crE, mmE, mrE, kmE, krE = tta2_predict(self.mn, self.rn_rice, im, self.Tmn_vec, self.Trn_vec)
+            with tm.span("rice_expert"):
+                pmE, prE, cmE, crE, mmE, mrE, kmE, krE = tta2_predict(self.mn, self.rn_rice, im, self.Tmn_vec, self.Trn_vec, views=views)
             alpha = RICE["blend_alpha"]
             pr_used = (1.0 - alpha) * pr0 + alpha * prE
             pr_used = pr_used / pr_used.sum()
@@ -629,14 +1046,16 @@ class LeafEnsemble:
         H_cur = entropy(p_avg_used)
         if H_cur > H_th_eff:
             if H_cur < 1.20 * H_th_eff:
-                pmQ, prQ, cmQ, crQ, mmQ, mrQ = tta_quick_predict(self.mn, self.rn, im, self.Tmn_vec, self.Trn_vec)
+                with tm.span("tta_quick"):
+                    pmQ, prQ, cmQ, crQ, mmQ, mrQ = tta_quick_predict(self.mn, self.rn, im, self.Tmn_vec, self.Trn_vec, views=views)
                 if entropy(0.5*(pmQ+prQ)) <= H_th_eff:
                     pm0, pr = pmQ, prQ
                     cm0, cr, mm0, mr = cmQ, crQ, mmQ, mrQ
                     lbl_mn0 = self.classes[int(pm0.argmax())]
                     lbl_rn  = self.classes[int(pr.argmax())]
                 else:
-                    pm2, pr2, cm2, cr2, mm2, mr2, _, _ = tta2_predict(self.mn, self.rn, im, self.Tmn_vec, self.Trn_vec)
+                    with tm.span("tta2"):
+                        pm2, pr2, cm2, cr2, mm2, mr2, _, _ = tta2_predict(self.mn, self.rn, im, self.Tmn_vec, self.Trn_vec, views=views)
                     if entropy(0.5*(pm2+pr2)) <= H_th_eff:
                         pm0, pr = pm2, pr2
                         cm0, cr, mm0, mr = cm2, cr2, mm2, mr2
@@ -685,12 +1104,13 @@ class LeafEnsemble:
         ke = int(torch.argmax(pe)); pred_lbl = self.classes[ke]; conf_e = float(pe[ke])
 
         # 가드에 올바른 파라미터 전달
-        is_unknown, reason, info = self._class_guard(
-            mn_label=lbl_mn0, mn_conf=cm0, 
-            rn_label=lbl_rn, rn_conf=cr, 
-            ens_label=pred_lbl, ens_conf=conf_e,
-            picked_model="Ensemble", picked_label=pred_lbl, picked_conf=conf_e
-        )
+        with tm.span("guard"):
+            is_unknown, reason, info = self._class_guard(
+                mn_label=lbl_mn0, mn_conf=cm0, 
+                rn_label=lbl_rn, rn_conf=cr, 
+                ens_label=pred_lbl, ens_conf=conf_e,
+                picked_model="Ensemble", picked_label=pred_lbl, picked_conf=conf_e
+            )
 
         deny = (lbl_rn in OVERRIDE.get("guard_override_deny", []))
         cfg  = GUARD_CFG.get(lbl_rn, {})
@@ -715,6 +1135,60 @@ class LeafEnsemble:
         return self._pack_final(final_lbl, final_conf, im, out_mn, out_rn, pm0, pr, reason=None,
                                 extra=dict(leaf=leaf_area, gy=gy, sat=sat, hi=hi, cm=cm0, cr=cr, mm=mm0, mr=mr))
 
+    # --------- cascade ----------
+    def _cascade_candidate(self, out_mn: Dict) -> bool:
+        """MN 출력만으로 본 certain 영역 (conf/margin/entropy/제외 클래스)"""
+        c = self.cascade
+        pm = out_mn["probs"][0]
+        lbl = self.classes[int(out_mn["idx"][0])]
+        if lbl in c["exclude_classes"] or (c["exclude_rice"] and is_rice_label(lbl)):
+            return False
+        return (float(out_mn["conf"][0]) >= c["conf_min"] and float(out_mn["margin"][0]) >= c["margin_min"]
+                and entropy(pm) <= c["entropy_max"])
+
+    def _cascade_certain(self, out_mn: Dict, sig: "ImageSignals") -> bool:
+        """
+        후보 조건 + 이미지 신호상 분명한 잎 (leaf 게이트·water veto 대상 아님) + 클래스 가드 통과.
+        가드가 MN 판정을 거부하면 MN 단독으로 끝내지 않고 전체 경로(RN·가드·GuardOverride)에서 결정
+        """
+        if not self._cascade_candidate(out_mn):
+            return False
+        c = self.cascade
+        is_leaf = (sig.leaf_area >= LEAF_GATE["area_min"]) and (sig.exg_mean >= LEAF_GATE["exg_min"])
+        rice_suspect = self._rice_in_topk(out_mn["probs"][0], k=3)
+        if not (is_leaf and sig.leaf_area >= c["leaf_min"] and sig.gy >= c["gy_min"]
+                and not (sig.water_frac >= RICE["water_veto_frac"] and rice_suspect)):
+            return False
+        if self._class_guard is not None:
+            lbl, cm = self.classes[int(out_mn["idx"][0])], float(out_mn["conf"][0])
+            is_unknown, _, _ = self._class_guard(
+                mn_label=lbl, mn_conf=cm,
+                rn_label=lbl, rn_conf=cm,
+                ens_label=lbl, ens_conf=cm,
+                picked_model="MobileNetV2", picked_label=lbl, picked_conf=cm
+            )
+            if is_unknown:
+                return False
+        return True
+
+    def _pack_mn_only(self, out_mn, sig: "ImageSignals"):
+        p_mn = out_mn["probs"][0]
+        label, conf = self.classes[int(p_mn.argmax())], float(p_mn.max())
+        return {
+            "mobilenet": {"label": label, "confidence": conf},
+            "resnet50":  {"label": None, "confidence": None, "skipped": True},
+            "ensemble":  {"label": label, "confidence": conf, "weights": {"mn": 1.0, "rn": 0.0}},
+            "picked":    {"model": "MobileNetV2", "label": label, "confidence": conf},
+            "meta": {
+                "entropy": {"mobilenet": entropy(p_mn), "resnet50": None, "ensemble": entropy(p_mn)},
+                "inference_ms": out_mn["time"] * 1000.0,
+                "reason": "Cascade[MN_certain]",
+                "path": "mn_only",
+                "signals": dict(leaf=sig.leaf_area, gy=sig.gy, sat=sig.sat, hi=sig.hi,
+                                cm=conf, mm=float(out_mn["margin"][0])),
+            }
+        }
+
     # --------- helpers for serving packs ----------
     def _pack_final(self, label, conf, im, out_mn, out_rn, pm, pr, reason=None, extra=None):
         p_mn = out_mn["probs"][0]; p_rn = out_rn["probs"][0]
@@ -731,6 +1205,7 @@ class LeafEnsemble:
                 },
                 "inference_ms": (out_mn["time"] + out_rn["time"]) * 1000.0,
                 "reason": reason,
+                "path": "full",
                 "signals": extra or {}
             }
         }
@@ -750,6 +1225,7 @@ class LeafEnsemble:
                 },
                 "inference_ms": (out_mn["time"] + out_rn["time"]) * 1000.0,
                 "reason": reason,
+                "path": "full",
                 "signals": {
                     "leaf": raw.get("leaf_area", None),
                     "gy": raw.get("gy", None),
@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+"""
+v4.6.6 규칙 벡터화 평가기 (LeafEnsemble.predict_batch)
+- 게이트/veto/완화/CONSENSUS/RNHIGH/가드 규칙을 선언형 표(Rule 목록)로 정의
+- 조건식은 이미지별 신호 배열(길이 N)에 대한 NumPy 연산으로 컴파일 → N장을 한 번에 판정, 텐서→float 변환은 배열 단위 1회
+- 모델 호출이 필요한 단계(rice expert / TTA quick / TTA2)는 해당 이미지에만 실행하고, 그 사이 단계만 표를 나눔
+- 결과는 predict_one 과 동일해야 함 → Model/golden_rules.py 로 검증
+"""
+
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+try:
+    from .leaf_ensemble import (CLASS_ENTROPY_RELAX, CONSENSUS, ENTROPY, GUARD_CFG, LEAF_GATE,
+                                NECROSIS, OVERRIDE, RELAX_RULES, RICE, RNHIGH, RN_PREF, ImageSignals,
+                                TTAViews, ensemble_probs, entropy, is_rice_label, tta2_predict, tta_quick_predict)
+    from .timings import Timings
+except ImportError:
+    from leaf_ensemble import (CLASS_ENTROPY_RELAX, CONSENSUS, ENTROPY, GUARD_CFG, LEAF_GATE,
+                               NECROSIS, OVERRIDE, RELAX_RULES, RICE, RNHIGH, RN_PREF, ImageSignals,
+                               TTAViews, ensemble_probs, entropy, is_rice_label, tta2_predict, tta_quick_predict)
+    from timings import Timings
+
+Env = Dict[str, Any]
+Fn = Callable[[Env], Any]
+
+
+# ===================== 조건식 DSL =====================
+class _Ctx:
+    """컴파일 문맥: 클래스 목록 (클래스별 표 → 클래스 인덱스로 조회하는 배열)"""
+
+    def __init__(self, classes: Sequence[str]):
+        self.classes = list(classes)
+
+
+class Expr:
+    def compile(self, ctx: _Ctx) -> Fn:
+        raise NotImplementedError
+
+    def __and__(self, o): return _Op(np.logical_and, self, o)
+    def __rand__(self, o): return _Op(np.logical_and, o, self)
+    def __or__(self, o): return _Op(np.logical_or, self, o)
+    def __ror__(self, o): return _Op(np.logical_or, o, self)
+    def __invert__(self): return _Op(np.logical_not, self)
+    def __ge__(self, o): return _Op(np.greater_equal, self, o)
+    def __gt__(self, o): return _Op(np.greater, self, o)
+    def __le__(self, o): return _Op(np.less_equal, self, o)
+    def __lt__(self, o): return _Op(np.less, self, o)
+    def __add__(self, o): return _Op(np.add, self, o)
+    def __radd__(self, o): return _Op(np.add, o, self)
+    def __sub__(self, o): return _Op(np.subtract, self, o)
+    def __rsub__(self, o): return _Op(np.subtract, o, self)
+    def __mul__(self, o): return _Op(np.multiply, self, o)
+    def __rmul__(self, o): return _Op(np.multiply, o, self)
+
+    def isin(self, names) -> "Expr":
+        """클래스 인덱스 신호가 names 중 하나인지"""
+        return _InClass(self, lambda c: c in names)
+
+    def where(self, pred: Callable[[str], bool]) -> "Expr":
+        """클래스 인덱스 신호의 클래스명이 pred 를 만족하는지"""
+        return _InClass(self, pred)
+
+
+def _lift(x) -> Expr:
+    return x if isinstance(x, Expr) else _Const(x)
+
+
+class _Const(Expr):
+    def __init__(self, v):
+        self.v = v
+
+    def compile(self, ctx):
+        v = self.v
+        return lambda env: v
+
+
+class _Sig(Expr):
+    def __init__(self, name: str):
+        self.name = name
+
+    def compile(self, ctx):
+        name = self.name
+        return lambda env: env[name]
+
+
+class _Op(Expr):
+    def __init__(self, fn, *args):
+        self.fn, self.args = fn, [_lift(a) for a in args]
+
+    def compile(self, ctx):
+        fn = self.fn
+        fs = [a.compile(ctx) for a in self.args]
+        if len(fs) == 1:
+            f0 = fs[0]
+            return lambda env: fn(f0(env))
+        f0, f1 = fs
+        return lambda env: fn(f0(env), f1(env))
+
+
+class _InClass(Expr):
+    def __init__(self, label: Expr, pred: Callable[[str], bool]):
+        self.label, self.pred = label, pred
+
+    def compile(self, ctx):
+        mask = np.array([bool(self.pred(c)) for c in ctx.classes], dtype=bool)
+        f = self.label.compile(ctx)
+        return lambda env: mask[f(env)]
+
+
+class ByClass(Expr):
+    """
+    클래스별 표 조회: table[클래스명][key] (key=None 이면 table[클래스명]) 를 label 인덱스로.
+    표에 없으면 default
+    """
+
+    def __init__(self, table: Dict, key: Optional[str], label: Expr, default):
+        self.table, self.key, self.label, self.default = table, key, label, default
+
+    def compile(self, ctx):
+        def val(c):
+            ent = self.table.get(c)
+            if ent is None:
+                return self.default
+            return ent if self.key is None else ent.get(self.key, self.default)
+        arr = np.array([val(c) for c in ctx.classes])
+        f = self.label.compile(ctx)
+        return lambda env: arr[f(env)]
+
+
+def has_key(table: Dict, key: str, label: Expr) -> Expr:
+    return label.where(lambda c: key in table.get(c, {}))
+
+
+class _Signals:
+    def __getattr__(self, name: str) -> Expr:
+        return _Sig(name)
+
+
+S = _Signals()
+ALWAYS = _Const(True)
+
+
+# ===================== 규칙 표 =====================
+@dataclass(frozen=True)
+class Rule:
+    """
+    action:
+      let     env[target] = value            (파생 신호/마스크 정의)
+      or      env[target] |= when            (is_leaf 구제 등)
+      max     env[target] = max(env[target], value)  when 인 이미지만 (엔트로피 임계 완화)
+      unknown when 인 미결정 이미지를 Unknown 으로 확정 (reason, pr_used)
+      final   when 인 미결정 이미지를 label/conf 신호 값으로 확정
+    reason: 문자열 또는 (env, i) → 문자열
+    """
+    name: str
+    action: str
+    when: Expr = ALWAYS
+    target: Optional[str] = None
+    value: Any = None
+    reason: Any = None
+    label: Optional[str] = None
+    conf: Optional[str] = None
+    pr_used: bool = False
+
+
+def _rescue_leafish() -> Expr:
+    return (S.leaf >= 0.12) & (S.gy >= 0.15) & (S.edge >= 0.02) & (S.exg_box >= -0.05)
+
+
+_HEALTHY = {"Peach___healthy", "Apple___healthy", "Grape___healthy",
+            "Soybean___healthy", "Blueberry___healthy", "Pepper,_bell___healthy"}
+
+
+def _gate_rules() -> List[Rule]:
+    """1단계 (기본 추론 직후): leaf 판단 + 구제 + veto + rice expert 트리거"""
+    lg, nc, rc = LEAF_GATE, NECROSIS, RICE
+    rice_rn0 = S.kr0.where(is_rice_label)
+    rules = [
+        Rule("is_leaf", "let", target="is_leaf", value=(S.leaf >= lg["area_min"]) & (S.exg >= lg["exg_min"])),
+        Rule("rn_strong0", "let", target="rn_strong0",
+             value=(S.cr0 >= RN_PREF["conf_min"]) & (S.mr0 >= RN_PREF["margin_min"])),
+        Rule("red_dominant", "let", target="red_dominant", value=(S.red_box > 0.30) & (S.exg_box < -0.10)),
+        Rule("RN_rescue", "or", target="is_leaf",
+             when=~S.is_leaf & S.rn_strong0 & (S.gy >= lg["rescue_gy_min"]) & (S.sat >= lg["rescue_sat_min"])
+             & (S.leaf >= 0.02) & (S.edge >= 0.020) & (S.exg_box >= -0.05) & ~S.red_dominant),
+    ]
+    if nc["use"]:
+        rules.append(Rule(
+            "Necrosis", "or", target="is_leaf",
+            when=~S.is_leaf & S.kr0.isin(set(nc["class_whitelist"]))
+            & (S.sat <= nc["sat_max"]) & (S.gy <= nc["gy_max"])
+            & (S.cr0 >= nc["rn_conf_min"]) & (S.mr0 >= nc["rn_margin_min"])
+            & ((S.edge >= nc["edge_tau"])
+               | ((nc["lab_a_min"] <= S.lab_a) & (S.lab_a <= nc["lab_a_max"])
+                  & (nc["lab_b_min"] <= S.lab_b) & (S.lab_b <= nc["lab_b_max"])))))
+    rn_overrule = (S.cr0 >= 0.93) & (S.mr0 >= 0.45) & _rescue_leafish() & ~S.red_dominant
+    rules += [
+        Rule("Guard[Strawberry_OOD_Veto]", "unknown", reason="Guard[Strawberry_OOD_Veto]",
+             when=S.kr0.isin({"Strawberry___Leaf_scorch"}) & ~rn_overrule
+             & (~S.is_leaf | (S.leaf < 0.15) | (S.gy < 0.15))),
+        Rule("Powdery", "or", target="is_leaf",
+             when=~S.is_leaf & S.kr0.isin({"Cherry___Powdery_mildew"}) & (S.cr0 >= 0.90) & (S.mr0 >= 0.30)
+             & (S.edge >= 0.020) & (S.aspect <= 6.0)),
+        Rule("HealthySmallLeaf", "or", target="is_leaf",
+             when=~S.is_leaf & (S.kr0.isin(_HEALTHY) | S.km0.isin(_HEALTHY)) & (S.cr0 >= 0.96) & (S.mr0 >= 0.40)
+             & (S.leaf >= 0.015) & (S.gy >= 0.06) & (S.sat >= 0.12) & (S.edge >= 0.020) & (S.exg_box >= -0.02)),
+        Rule("Global[NoLeafVeto]", "unknown", reason="Global[NoLeafVeto]",
+             when=~S.is_leaf & ((S.leaf < 0.05) | (S.gy < 0.05) | (S.sat < 0.10))),
+        Rule("Global[WaterVeto]", "unknown", reason=lambda env, i: f"Global[WaterVeto wf={env['water'][i]:.2f}]",
+             when=(S.water >= rc["water_veto_frac"]) & (rice_rn0 | S.rice_pm3 | S.rice_pe3)),
+        Rule("rice_expert", "let", target="rice_expert", value=S.has_expert & (
+            (S.is_leaf & (S.leaf >= rc["gate_leaf_min"]) & (S.gy >= rc["gate_gy_min"])
+             & (S.H_avg0 <= rc["gate_entropy_max"]) & (rice_rn0 | S.rice_pe2) & S.rice_pm3
+             & (S.water < rc["water_veto_frac"]))
+            | (S.is_leaf & (S.leaf >= rc["gate_alt_leaf_min"]) & (S.gy >= rc["gate_gy_min"])
+               & (S.aspect >= rc["gate_alt_aspect_min"]) & (S.mr0 <= rc["gate_alt_mr_max"])
+               & (S.cr0 <= rc["gate_alt_cr_max"]) & (S.H_avg0 <= rc["gate_entropy_max"])
+               & (rice_rn0 | S.rice_pe3) & S.rice_pm3 & (S.water < rc["water_veto_frac"])))),
+    ]
+    return rules
+
+
+def _relax_ok() -> Expr:
+    """RELAX_RULES[lbl_rn] 의 조건 (표에 없는 키는 검사 생략)"""
+    rr = RELAX_RULES
+    ok = S.kr.isin(set(rr)) & S.kr.isin(set(CLASS_ENTROPY_RELAX))
+    ok = ok & (~S.kr.where(lambda c: rr.get(c, {}).get("require_leaf", False)) | S.is_leaf)
+    for key, sig, ge in (("rn_conf_min", S.cr, True), ("rn_margin_min", S.mr, True),
+                         ("leaf_min", S.leaf, True), ("gy_min", S.gy, True), ("hi_max", S.hi, False)):
+        thr = ByClass(rr, key, S.kr, 0.0)
+        ok = ok & (~has_key(rr, key, S.kr) | ((sig >= thr) if ge else (sig <= thr)))
+    return ok
+
+
+def _post_expert_rules() -> List[Rule]:
+    """2단계 (rice expert 반영 후): Orange veto, RN leaf-override, 엔트로피 임계 + TTA 대상"""
+    lo = OVERRIDE["leaf_big_rn_mid"]
+    return [
+        Rule("Guard[Orange_Grass_Veto_v3]", "unknown", reason="Guard[Orange_Grass_Veto_v3]", pr_used=True,
+             when=S.kr.isin({"Orange___Haunglongbing_(Citrus_greening)"})
+             & (S.sat >= 0.65) & (0.12 <= S.gy) & (S.gy <= 0.24) & (S.leaf <= 0.15)),
+        Rule("RN_leaf_override", "final", reason="RN_leaf_override", label="kr", conf="cr",
+             when=S.is_leaf & (S.leaf >= lo["leaf_min"]) & (S.cr >= lo["rn_min"]) & (S.mr >= lo["rn_margin_min"])),
+        Rule("H_th", "let", target="H_th", value=S.ones * 1.50),
+        Rule("relax_leaf_rn_strong", "max", target="H_th", value=ENTROPY["relax_when_leaf_rn_strong"],
+             when=S.is_leaf & S.rn_strong0),
+        Rule("relax_bigleaf", "max", target="H_th", value=ENTROPY["relax_when_bigleaf_rn_mid"],
+             when=S.is_leaf & (S.leaf >= lo["leaf_min"])),
+        Rule("relax_class", "max", target="H_th", value=ByClass(CLASS_ENTROPY_RELAX, None, S.kr, 0.0),
+             when=_relax_ok()),
+        Rule("need_tta", "let", target="need_tta", value=(S.H_cur > S.H_th) & (S.H_cur < 1.20 * S.H_th)),
+    ]
+
+
+def _final_rules() -> List[Rule]:
+    """3단계 (TTA 반영 후): HighEntropy, CONSENSUS, RNHIGH, MN 우세 보정 마스크"""
+    cs, rh = CONSENSUS, RNHIGH
+    return [
+        Rule("HighEntropy", "unknown", pr_used=True, when=S.tta_failed,
+             reason=lambda env, i: f"HighEntropy({env['H_cur'][i]:.2f}>{env['H_th'][i]:.2f})"),
+        Rule("CONSENSUS", "final", reason="CONSENSUS", label="k_pm", conf="mean_conf",
+             when=S.is_leaf & S.same_class & (S.mean_conf >= cs["mean_conf_min"])
+             & (S.min_margin >= cs["min_margin_min"]) & (S.H2 <= cs["entropy_cap"]) & (S.gy >= cs["gy_min"])
+             & (S.edge >= cs["edge_min"]) & (S.aspect <= cs["max_aspect"])),
+        Rule("RNHIGH", "final", reason="RNHIGH", label="kr", conf="cr",
+             when=~S.kr.where(is_rice_label) & S.is_leaf & (S.leaf >= rh["leaf_min"]) & (S.gy >= rh["gy_min"])
+             & (S.sat >= rh["sat_min"]) & (S.edge >= rh["edge_min"])
+             & (S.same_class | (rh["same_or_abs"] & (S.cr >= rh["cr_abs"]) & (S.mr >= rh["mr_abs"])))
+             & (S.H2 <= rh["entropy_cap"])),
+        Rule("mn_dominant", "let", target="mn_dominant",
+             value=S.is_leaf & S.k_pe_base.where(is_rice_label) & ~S.km.where(is_rice_label)
+             & (S.cm0 >= S.cr + 0.15) & (S.mm0 >= 0.25) & (S.H2 >= 1.60)),
+    ]
+
+
+def _guard_rules() -> List[Rule]:
+    """4단계 (클래스 가드 판정 후): GuardOverride / 가드 Unknown / 앙상블 최종"""
+    go = OVERRIDE["guard_override"]
+    hard = (S.kr.where(lambda c: GUARD_CFG.get(c, {}).get("require_leaf", False)
+                       and GUARD_CFG.get(c, {}).get("hard_no_leaf", False))
+            & ((S.leaf < ByClass(GUARD_CFG, "hard_leaf_min", S.kr, 0.0))
+               | (S.gy < ByClass(GUARD_CFG, "hard_gy_min", S.kr, 0.0))))
+    return [
+        Rule("GuardOverride", "final", reason="GuardOverride", label="kr", conf="cr",
+             when=S.guard_unknown & S.is_leaf & (S.cr >= go["rn_min"]) & (S.mr >= go["rn_margin_min"])
+             & ~S.kr.isin(set(OVERRIDE.get("guard_override_deny", [])))
+             & (S.leaf >= go.get("leaf_min_override", 0.10)) & (S.gy >= go.get("gy_min_override", 0.08))
+             & ~hard & ~((S.red_box > 0.25) & (S.exg_box < -0.10))),
+        Rule("Guard", "unknown", pr_used=True, when=S.guard_unknown,
+             reason=lambda env, i: env["guard_reason"][i]),
+        Rule("Ensemble", "final", reason=None, label="ke", conf="conf_e"),
+    ]
+
+
+@dataclass
+class _Compiled:
+    rule: Rule
+    when: Fn
+    value: Optional[Fn]
+
+
+def compile_rules(rules: List[Rule], classes: Sequence[str]) -> List[_Compiled]:
+    ctx = _Ctx(classes)
+    return [_Compiled(r, r.when.compile(ctx), _lift(r.value).compile(ctx) if r.value is not None else None)
+            for r in rules]
+
+
+# ===================== 배열 헬퍼 =====================
+# 원소별 연산(가중합/비교/topk)은 [N, C] 배치로, 행 합(reduction)이 들어가는 엔트로피·정규화는 predict_one 과
+# 같은 1-D 함수를 행마다 호출 — 합산 순서가 달라져 마지막 비트(→ 임계 비교, 출력 신뢰도)가 바뀌지 않도록
+def _f64(t: torch.Tensor) -> np.ndarray:
+    return t.detach().to("cpu", torch.float64).numpy()
+
+
+def _i64(t: torch.Tensor) -> np.ndarray:
+    return t.detach().to("cpu", torch.int64).numpy()
+
+
+def row_entropy(P: torch.Tensor) -> np.ndarray:
+    return np.array([entropy(p) for p in P], dtype=np.float64)
+
+
+def ensemble_rows(PM: torch.Tensor, PR: torch.Tensor) -> torch.Tensor:
+    return torch.stack([ensemble_probs(pm, pr) for pm, pr in zip(PM, PR)])
+
+
+def normalize_rows(P: torch.Tensor) -> torch.Tensor:
+    return torch.stack([p / p.sum() for p in P])
+
+
+def _topk_has(P: torch.Tensor, k: int, mask: np.ndarray) -> np.ndarray:
+    idx = _i64(P.topk(min(k, P.shape[1]), dim=1).indices)
+    return mask[idx].any(axis=1)
+
+
+_SIG_FIELDS = (("leaf", "leaf_area"), ("exg", "exg_mean"), ("gy", "gy"), ("exg_box", "exg_mean_box"),
+               ("red_box", "red_frac_box"), ("edge", "edge_den_box"), ("lab_a", "lab_a"), ("lab_b", "lab_b"),
+               ("aspect", "aspect"), ("sat", "sat"), ("hi", "hi"), ("water", "water_frac"))
+
+
+def signal_arrays(sigs: Sequence[ImageSignals]) -> Env:
+    return {k: np.array([float(getattr(s, attr)) for s in sigs], dtype=np.float64) for k, attr in _SIG_FIELDS}
+
+
+# ===================== 평가기 =====================
+class _Decision:
+    __slots__ = ("rule", "env", "reason")
+
+    def __init__(self, rule: Rule, env: Env, reason: Optional[str]):
+        self.rule, self.env, self.reason = rule, env, reason
+
+
+class RuleEngine:
+    """
+    LeafEnsemble 1개에 대한 컴파일된 규칙 표. evaluate() 는 이미지 N장의 기본 추론 결과 + 신호로 predict_one 과 같은 dict 목록 반환
+    """
+
+    def __init__(self, model):
+        self.model = model
+        classes = model.classes
+        self.rice_mask = np.array([is_rice_label(c) for c in classes], dtype=bool)
+        self.stages = {
+            "gate": compile_rules(_gate_rules(), classes),
+            "post_expert": compile_rules(_post_expert_rules(), classes),
+            "final": compile_rules(_final_rules(), classes),
+            "guard": compile_rules(_guard_rules(), classes),
+        }
+
+    # ---------- 표 실행 ----------
+    @staticmethod
+    def _run(table: List[_Compiled], env: Env, done: np.ndarray, decisions: List[Optional[_Decision]]) -> None:
+        n = done.shape[0]
+        for c in table:
+            r = c.rule
+            if r.action == "let":
+                env[r.target] = np.broadcast_to(c.value(env), (n,)).copy()
+                continue
+            m = np.broadcast_to(c.when(env), (n,))
+            if r.action == "or":
+                env[r.target] = env[r.target] | m
+            elif r.action == "max":
+                cur = env[r.target]
+                env[r.target] = np.where(m, np.maximum(cur, c.value(env)), cur)
+            else:  # unknown / final: 첫 번째로 걸린 규칙이 결정
+                for i in np.flatnonzero(m & ~done):
+                    reason = r.reason(env, i) if callable(r.reason) else r.reason
+                    decisions[i] = _Decision(r, env, reason)
+                    done[i] = True
+
+    # ---------- 가드 ----------
+    def _guard(self, env: Env, live: np.ndarray) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        클래스 가드 판정 (mn=cm0, rn=cr, ens/picked=conf_e). 임계값만으로 판정하는 가드(vectorizable)는 배열로,
+        Unknown 사유 문자열은 해당 이미지만 가드를 호출해 동일한 문구로
+        """
+        g = self.model._class_guard
+        classes = self.model.classes
+        n = live.shape[0]
+        unknown = np.zeros(n, dtype=bool)
+        reasons: List[Optional[str]] = [None] * n
+
+        def call(i):
+            lbl_mn, lbl_rn, lbl_e = classes[env["km"][i]], classes[env["kr"][i]], classes[env["ke"][i]]
+            return g(mn_label=lbl_mn, mn_conf=float(env["cm0"][i]), rn_label=lbl_rn, rn_conf=float(env["cr"][i]),
+                     ens_label=lbl_e, ens_conf=float(env["conf_e"][i]),
+                     picked_model="Ensemble", picked_label=lbl_e, picked_conf=float(env["conf_e"][i]))
+
+        cfg = getattr(g, "cfg", None)
+        if getattr(g, "vectorizable", False) and cfg is not None:
+            def sc(x):
+                x = np.where(np.isfinite(x), x, 0.0)
+                return np.clip(x, 0.0, 1.0)
+            mn, rn, pk = sc(env["cm0"]), sc(env["cr"]), sc(env["conf_e"])
+            po, gm, dm = cfg.pick_override, cfg.gate_min, cfg.delta_max
+            override = (mn >= po) | (rn >= po) | (pk >= po)
+            cand = live & ~override & (((mn <= gm) & (rn <= gm)) | (np.abs(mn - rn) >= dm))
+        else:
+            cand = live
+        for i in np.flatnonzero(cand):
+            is_unknown, reason, _ = call(i)
+            unknown[i] = bool(is_unknown)
+            reasons[i] = reason
+        return unknown, reasons
+
+    # ---------- 전체 ----------
+    def evaluate(self, images: List[np.ndarray], bases: List[Tuple[Dict, Dict]],
+                 sigs: List[ImageSignals], timings: List[Timings]) -> List[Dict]:
+        m = self.model
+        n = len(images)
+        t0 = time.perf_counter()
+        model_ms = np.zeros(n)
+        done = np.zeros(n, dtype=bool)
+        decisions: List[Optional[_Decision]] = [None] * n
+        views: List[Optional[TTAViews]] = [None] * n
+
+        def view(i):
+            if views[i] is None:
+                views[i] = TTAViews(images[i])
+            return views[i]
+
+        def timed(i, name, fn, *args, **kw):
+            t = time.perf_counter()
+            with timings[i].span(name):
+                out = fn(*args, **kw)
+            model_ms[i] += (time.perf_counter() - t) * 1000.0
+            return out
+
+        # ---------- 0) 기본 추론 결과 → 배열 ----------
+        PM0 = torch.cat([b[0]["probs"] for b in bases])
+        PR0 = torch.cat([b[1]["probs"] for b in bases])
+        env: Env = signal_arrays(sigs)
+        env.update(
+            ones=np.ones(n),
+            cm0=_f64(torch.cat([b[0]["conf"] for b in bases])), cr0=_f64(torch.cat([b[1]["conf"] for b in bases])),
+            mm0=_f64(torch.cat([b[0]["margin"] for b in bases])), mr0=_f64(torch.cat([b[1]["margin"] for b in bases])),
+            km0=_i64(torch.cat([b[0]["idx"] for b in bases])), kr0=_i64(torch.cat([b[1]["idx"] for b in bases])),
+            has_expert=m.rn_rice is not None,
+        )
+        PE0 = ensemble_rows(PM0, PR0)
+        env.update(
+            pm=PM0, pr=PR0,
+            H_avg0=row_entropy(0.5 * (PM0 + PR0)),
+            rice_pm3=_topk_has(PM0, 3, self.rice_mask),
+            rice_pe3=_topk_has(PE0, 3, self.rice_mask),
+            rice_pe2=_topk_has(PE0, 2, self.rice_mask),
+        )
+        self._run(self.stages["gate"], env, done, decisions)
+
+        # ---------- 1) rice expert (soft blend) — 트리거된 이미지만 ----------
+        PR = PR0.clone()
+        alpha = RICE["blend_alpha"]
+        for i in np.flatnonzero(env["rice_expert"] & ~done):
+            _, prE, *_ = timed(i, "rice_expert", tta2_predict, m.mn, m.rn_rice, images[i], m.Tmn_vec, m.Trn_vec,
+                               views=view(i))
+            pr_used = (1.0 - alpha) * PR0[i] + alpha * prE
+            PR[i] = pr_used / pr_used.sum()
+        v2, i2 = PR.topk(2, dim=1)
+        env = dict(env)
+        env.update(pr=PR, cr=_f64(v2[:, 0]), mr=_f64(v2[:, 0] - v2[:, 1]), kr=_i64(i2[:, 0]), km=env["km0"],
+                   cm0=env["cm0"], mm0=env["mm0"])
+        env["H_cur"] = row_entropy(0.5 * (PM0 + PR))
+        self._run(self.stages["post_expert"], env, done, decisions)
+
+        # ---------- 2) 엔트로피 TTA (quick → TTA2) — 임계 초과 구간 이미지만 ----------
+        PM, PR2 = PM0.clone(), PR.clone()
+        cm, cr, mm, mr = env["cm0"].copy(), env["cr"].copy(), env["mm0"].copy(), env["mr"].copy()
+        km, kr = env["km"].copy(), env["kr"].copy()
+        failed = np.zeros(n, dtype=bool)
+        for i in np.flatnonzero(env["need_tta"] & ~done):
+            h = env["H_th"][i]
+            pmQ, prQ, cmQ, crQ, mmQ, mrQ = timed(i, "tta_quick", tta_quick_predict, m.mn, m.rn, images[i],
+                                                 m.Tmn_vec, m.Trn_vec, views=view(i))
+            if entropy(0.5 * (pmQ + prQ)) > h:
+                pmQ, prQ, cmQ, crQ, mmQ, mrQ, _, _ = timed(i, "tta2", tta2_predict, m.mn, m.rn, images[i],
+                                                           m.Tmn_vec, m.Trn_vec, views=view(i))
+                if entropy(0.5 * (pmQ + prQ)) > h:
+                    failed[i] = True
+                    continue
+            PM[i], PR2[i] = pmQ, prQ
+            cm[i], cr[i], mm[i], mr[i] = cmQ, crQ, mmQ, mrQ
+            km[i], kr[i] = int(pmQ.argmax()), int(prQ.argmax())
+        env = dict(env)
+        k_pm = _i64(PM.argmax(dim=1))
+        env.update(pm=PM, pr=PR2, cm0=cm, cr=cr, mm0=mm, mr=mr, km=km, kr=kr, tta_failed=failed,
+                   k_pm=k_pm, same_class=k_pm == _i64(PR2.argmax(dim=1)),
+                   mean_conf=0.5 * (cm + cr), min_margin=np.minimum(mm, mr),
+                   H2=row_entropy(0.5 * (PM + PR2)))
+        PE_base = ensemble_rows(PM, PR2)
+        env["k_pe_base"] = _i64(PE_base.argmax(dim=1))
+        self._run(self.stages["final"], env, done, decisions)
+
+        # ---------- 3) MN 우세 보정 + 클래스 가드 ----------
+        pe_mn = normalize_rows(PM * 0.60 + PR2 * 0.40)
+        PE = torch.where(torch.from_numpy(env["mn_dominant"]).to(PM.device)[:, None], pe_mn, PE_base)
+        ke = _i64(PE.argmax(dim=1))
+        env["ke"] = ke
+        env["conf_e"] = _f64(PE.gather(1, torch.from_numpy(ke).to(PE.device)[:, None])[:, 0])
+        live = ~done
+        t_guard = time.perf_counter()
+        env["guard_unknown"], env["guard_reason"] = self._guard(env, live)
+        guard_ms = (time.perf_counter() - t_guard) * 1000.0 / max(1, int(live.sum()))
+        self._run(self.stages["guard"], env, done, decisions)
+
+        # ---------- 4) 결과 dict (predict_one 과 같은 포맷) ----------
+        rules_ms = max(0.0, (time.perf_counter() - t0) * 1000.0 - float(model_ms.sum()))
+        out = []
+        for i, d in enumerate(decisions):
+            timings[i].add("rules", rules_ms / max(1, n))
+            if live[i]:
+                timings[i].add("guard", guard_ms)
+            out.append(self._pack(i, d, images[i], bases[i], sigs[i]))
+        return out
+
+    def _pack(self, i: int, d: _Decision, im, base: Tuple[Dict, Dict], sig: ImageSignals) -> Dict:
+        m, e, r = self.model, d.env, d.rule
+        out_mn, out_rn = base
+        if r.action == "unknown":
+            raw = dict(leaf_area=sig.leaf_area, gy=sig.gy, sat=sig.sat, hi=sig.hi)
+            return m._pack_unknown(im_path=None, reason=d.reason, raw=raw, out_mn=out_mn, out_rn=out_rn,
+                                   pr_used=e["pr"][i] if r.pr_used else None)
+        label, conf = m.classes[int(e[r.label][i])], float(e[r.conf][i])
+        extra = dict(leaf=sig.leaf_area, gy=sig.gy, sat=sig.sat, hi=sig.hi,
+                     cm=float(e["cm0"][i]), cr=float(e["cr"][i]), mm=float(e["mm0"][i]), mr=float(e["mr"][i]))
+        return m._pack_final(label, conf, im, out_mn, out_rn, e["pm"][i], e["pr"][i], reason=d.reason, extra=extra)
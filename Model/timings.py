@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+요청 1건의 단계별 소요 시간(span) 기록 — predict_one / Classifier / RAG / DB 저장이 같은 객체를 공유.
+결과는 detailed_prediction.meta.timings (ms) 와 Backend /metrics 히스토그램으로 노출
+"""
+
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class Timings:
+    """이름 → 누적 ms. 같은 이름을 여러 번 측정하면 합산 (예: TTA 뷰 재사용 경로)"""
+
+    __slots__ = ("spans",)
+
+    def __init__(self, spans: Optional[Dict[str, float]] = None):
+        self.spans: Dict[str, float] = dict(spans or {})
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000.0)
+
+    def add(self, name: str, ms: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + float(ms)
+
+    def update(self, other: Dict[str, float]) -> None:
+        for k, v in (other or {}).items():
+            self.add(k, v)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {k: round(v, 3) for k, v in self.spans.items()}
+
+    def __repr__(self):
+        return f"Timings({self.as_dict()})"
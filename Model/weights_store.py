@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+워커 간 가중치 공유용 mmap 로더 (WEIGHTS_MMAP)
+- 0 (기본)        : 기존처럼 torch.load → 워커마다 가중치 사본(private RSS)
+- 1 / safetensors : 체크포인트를 1회 safetensors 로 변환(EXPORT_DIR) 후 읽기 전용 mmap,
+                    torch.frombuffer 로 파일 페이지를 그대로 텐서로 사용 → 모든 워커가 page cache 공유
+- torch           : torch.save 재저장본을 torch.load(mmap=True) 로 로드 (동일 효과, torch 포맷 유지)
+
+모델은 meta 디바이스에서 만들고 load_state_dict(assign=True) 로 mmap 텐서를 그대로 파라미터로 붙인다
+(랜덤 초기화 버퍼 할당·복사 없음). CPU + INFER_BACKEND=eager 에서만 공유 효과가 있다
+(GPU 이동·int8/TorchScript/ONNX 변환은 새 메모리를 할당).
+
+사전 변환 (여러 워커 동시 기동 전 권장):
+    python -m Model.weights_store --convert
+"""
+
+from __future__ import annotations
+import argparse, contextlib, hashlib, itertools, json, mmap, os, warnings
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import torch
+import torch.nn as nn
+
+try:
+    import fcntl
+    _HAS_FCNTL = True
+except ImportError:  # Windows
+    _HAS_FCNTL = False
+
+WEIGHTS_MMAP = os.getenv("WEIGHTS_MMAP", "0").strip().lower()
+if WEIGHTS_MMAP in ("1", "true", "on", "yes"):
+    WEIGHTS_MMAP = "safetensors"
+elif WEIGHTS_MMAP in ("0", "false", "off", "no", ""):
+    WEIGHTS_MMAP = "off"
+
+_ST_DTYPES = {
+    torch.float32: "F32", torch.float16: "F16", torch.bfloat16: "BF16", torch.float64: "F64",
+    torch.int64: "I64", torch.int32: "I32", torch.int16: "I16", torch.int8: "I8",
+    torch.uint8: "U8", torch.bool: "BOOL",
+}
+_ST_DTYPES_INV = {v: k for k, v in _ST_DTYPES.items()}
+
+
+def read_checkpoint(ckpt: Path) -> Dict[str, torch.Tensor]:
+    """기존 .pth 로드 ("state_dict" 래핑 해제)"""
+    state = torch.load(str(ckpt), map_location="cpu")
+    if isinstance(state, dict) and "state_dict" in state:
+        state = state["state_dict"]
+    return state
+
+
+# ===================== safetensors (의존성 없는 최소 구현) =====================
+def save_safetensors(state: Dict[str, torch.Tensor], path: Path):
+    """
+    표준 safetensors 레이아웃으로 저장 (다른 도구로도 읽힘).
+    원소 크기 큰 dtype 부터 배치 → 헤더를 8바이트 정렬하면 모든 텐서 오프셋이 자기 원소 크기에 정렬됨
+    """
+    items = sorted(state.items(), key=lambda kv: -kv[1].element_size())
+    header, offset, blobs = {}, 0, []
+    for name, t in items:
+        t = t.detach().cpu().contiguous()
+        nbytes = t.numel() * t.element_size()
+        header[name] = {"dtype": _ST_DTYPES[t.dtype], "shape": list(t.shape), "data_offsets": [offset, offset + nbytes]}
+        blobs.append(t)
+        offset += nbytes
+    hdr = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    hdr += b" " * (-(8 + len(hdr)) % 8)
+    with open(path, "wb") as f:
+        f.write(len(hdr).to_bytes(8, "little"))
+        f.write(hdr)
+        for t in blobs:
+            f.write(t.reshape(-1).view(torch.uint8).numpy().tobytes())
+
+
+def mmap_safetensors(path: Path) -> Dict[str, torch.Tensor]:
+    """읽기 전용 mmap 위 텐서 (복사 없음, 프로세스 간 page cache 공유)"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    hlen = int.from_bytes(mm[:8], "little")
+    header = json.loads(mm[8:8 + hlen])
+    base = 8 + hlen
+    out = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # non-writable buffer 경고 (추론 전용이라 쓰기 없음)
+        for name, meta in header.items():
+            if name == "__metadata__":
+                continue
+            dt = _ST_DTYPES_INV[meta["dtype"]]
+            b, e = meta["data_offsets"]
+            count = (e - b) // torch.empty((), dtype=dt).element_size()
+            t = torch.frombuffer(mm, dtype=dt, count=count, offset=base + b) if count else torch.empty(0, dtype=dt)
+            out[name] = t.reshape(meta["shape"])
+    return out
+
+
+# ===================== 변환 캐시 =====================
+def _export_dir(weights_dir: Path) -> Path:
+    return Path(os.getenv("EXPORT_DIR", Path(weights_dir) / ".export")).resolve()
+
+
+def mapped_path(ckpt: Path, weights_dir: Path, mode: str = WEIGHTS_MMAP) -> Path:
+    try:
+        st = Path(ckpt).stat(); stamp = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        stamp = [None, None]
+    key = hashlib.sha1(json.dumps([str(ckpt), *stamp, mode]).encode()).hexdigest()[:12]
+    ext = "safetensors" if mode == "safetensors" else "mmap.pt"
+    return _export_dir(weights_dir) / f"{Path(ckpt).parent.name}-{Path(ckpt).stem}-{key}.{ext}"
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path):
+    """동시에 뜬 워커들이 같은 체크포인트를 중복 변환하지 않도록 (POSIX advisory lock)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not _HAS_FCNTL:
+        yield; return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_mapped(ckpt: Path, weights_dir: Path, mode: str = WEIGHTS_MMAP) -> Path:
+    path = mapped_path(ckpt, weights_dir, mode)
+    if path.is_file():
+        return path
+    with _file_lock(path.with_suffix(".lock")):
+        if not path.is_file():
+            state = read_checkpoint(ckpt)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            if mode == "safetensors":
+                save_safetensors(state, tmp)
+            else:
+                torch.save(state, str(tmp))
+            os.replace(tmp, path)
+            print(f"[weights_store] converted {ckpt} → {path.name}")
+    return path
+
+
+def load_state(ckpt: Path, weights_dir: Path, mode: str = WEIGHTS_MMAP) -> Dict[str, torch.Tensor]:
+    if mode == "off":
+        return read_checkpoint(ckpt)
+    path = ensure_mapped(ckpt, weights_dir, mode)
+    if mode == "safetensors":
+        return mmap_safetensors(path)
+    return torch.load(str(path), map_location="cpu", mmap=True, weights_only=True)
+
+
+def build_model(arch, num_classes: int, ckpt: Path, weights_dir: Path, mode: str = WEIGHTS_MMAP) -> nn.Module:
+    """
+    체크포인트를 로드한 eval 모델. mmap 모드면 meta 디바이스 생성 + assign=True 로
+    파라미터가 mmap 텐서를 직접 참조 (워커별 가중치 사본 없음)
+    """
+    state = load_state(ckpt, weights_dir, mode)
+    if mode == "off":
+        m = arch(num_classes=num_classes)
+        m.load_state_dict(state)
+        return m.eval()
+    with torch.device("meta"):
+        m = arch(num_classes=num_classes)
+    m.load_state_dict(state, assign=True)
+    leftover = [n for n, t in itertools.chain(m.named_parameters(), m.named_buffers()) if t.is_meta]
+    if leftover:
+        raise RuntimeError(f"체크포인트에 없는 텐서: {leftover[:5]}")
+    return m.eval()
+
+
+# ===================== 측정 =====================
+def memory_stats() -> Dict[str, Optional[float]]:
+    """현재 프로세스 메모리 (MB). Linux: smaps_rollup 의 Rss/Pss/Shared/Private"""
+    out: Dict[str, Optional[float]] = {"rss": None, "pss": None, "shared": None, "private": None}
+    try:
+        fields = {}
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+        out["rss"] = fields.get("Rss")
+        out["pss"] = fields.get("Pss")
+        out["shared"] = fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0)
+        out["private"] = fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    except OSError:
+        try:
+            import psutil
+            out["rss"] = psutil.Process().memory_info().rss / 2**20
+        except Exception:
+            pass
+    return out
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    ap = argparse.ArgumentParser(description="mmap 가중치 사전 변환")
+    ap.add_argument("--convert", action="store_true", help="MN/RN/rice expert 체크포인트를 mmap 포맷으로 변환")
+    ap.add_argument("--mode", choices=["safetensors", "torch"], default=WEIGHTS_MMAP if WEIGHTS_MMAP != "off" else "safetensors")
+    args = ap.parse_args(argv)
+    if not args.convert:
+        ap.print_help(); return
+    try:
+        from .leaf_ensemble import CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT, WEIGHTS_DIR
+    except ImportError:
+        from leaf_ensemble import CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT, WEIGHTS_DIR
+    for ckpt in (CKPT_MN, CKPT_RN, CKPT_RN_RICE_EXPERT):
+        if ckpt.is_file():
+            print(ensure_mapped(ckpt, WEIGHTS_DIR, args.mode))
+
+
+if __name__ == "__main__":
+    main()